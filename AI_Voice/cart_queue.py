@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+# ----------------------------
+# Durable Cart Event Queue
+# ----------------------------
+class CartQueue:
+    """
+    Disk-backed stand-in for the Redis Streams backbone in
+    Guide_1_System_Architecture.md (SQLite, WAL).
+
+    The webhook handler append()s each cart-abandoned event and returns.
+    Consumers claim() a batch, dial, and ack() each event once it is dialed.
+    Events survive a restart. An event claimed but neither acked nor
+    renew()ed within `lease` seconds (its consumer died) is handed out
+    again; that is XADD / XREADGROUP / XACK / XCLAIM / XAUTOCLAIM with one
+    consumer group. Every method is thread-safe.
+    """
+
+    def __init__(self, path=None, lease=None):
+        self.path = path or os.getenv("CART_QUEUE", "cart_queue.db")
+        self.lease = lease or float(os.getenv("CART_QUEUE_LEASE", "60"))
+        self.appended = 0
+        self.acked = 0
+        self.redelivered = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS cart_events (
+                event_id INTEGER PRIMARY KEY,
+                payload TEXT NOT NULL,
+                received_at REAL NOT NULL,
+                claimed_at REAL,
+                deliveries INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # Serves both claim() scans: unclaimed in arrival order, then oldest leases
+        self._db.execute("CREATE INDEX IF NOT EXISTS cart_events_claimed ON cart_events (claimed_at, event_id)")
+        self._depth = self._db.execute("SELECT COUNT(*) FROM cart_events").fetchone()[0]
+
+    def append(self, payload, received_at=None):
+        """Persist one event (a JSON-able dict); returns its id once it is on disk."""
+        with self._lock:
+            event_id = self._db.execute(
+                "INSERT INTO cart_events (payload, received_at) VALUES (?, ?)",
+                (json.dumps(payload, ensure_ascii=False), received_at or time.time())
+            ).lastrowid
+            self._depth += 1
+            self.appended += 1
+        return event_id
+
+    def claim(self, count):
+        """
+        Up to `count` events as (event_id, payload, received_at, deliveries):
+        new ones first, then those whose lease expired.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            ids = [row[0] for row in self._db.execute(
+                "SELECT event_id FROM cart_events WHERE claimed_at IS NULL ORDER BY event_id LIMIT ?", (count,)
+            )]
+            if len(ids) < count:
+                expired = self._db.execute(
+                    "SELECT event_id FROM cart_events WHERE claimed_at < ? ORDER BY claimed_at LIMIT ?",
+                    (now - self.lease, count - len(ids))
+                ).fetchall()
+                self.redelivered += len(expired)
+                ids += [row[0] for row in expired]
+            rows = self._db.execute(f"""
+                UPDATE cart_events SET claimed_at = ?, deliveries = deliveries + 1
+                WHERE event_id IN ({", ".join("?" * len(ids))})
+                RETURNING event_id, payload, received_at, deliveries
+            """, (now, *ids)).fetchall() if ids else []
+            self._db.execute("COMMIT")
+        rows.sort()
+        return [(event_id, json.loads(payload), received_at, deliveries)
+                for event_id, payload, received_at, deliveries in rows]
+
+    def renew(self, event_ids):
+        """Restart the lease of events still being worked on, so they are not handed out again."""
+        if not event_ids:
+            return
+        ids = list(event_ids)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE cart_events SET claimed_at = ? WHERE event_id IN ({', '.join('?' * len(ids))})",
+                (time.time(), *ids)
+            )
+
+    def ack(self, event_ids):
+        with self._lock:
+            self._db.execute("BEGIN")
+            deleted = self._db.executemany(
+                "DELETE FROM cart_events WHERE event_id = ?", [(event_id,) for event_id in event_ids]
+            ).rowcount
+            self._db.execute("COMMIT")
+            self._depth -= deleted
+            self.acked += deleted
+
+    def depth(self):
+        """Events appended and not yet acked (claimed or not), as seen by this process."""
+        return self._depth
+
+    def stats(self):
+        return {
+            "depth": self._depth,
+            "appended": self.appended,
+            "acked": self.acked,
+            "redelivered": self.redelivered,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,76 +1,650 @@
-import os
-from fastapi import FastAPI
-from groq import Groq
-from twilio.rest import Client
-from dotenv import load_dotenv
-
-load_dotenv()
-
-app = FastAPI()
-
-# ----------------------------
-# Fake Abandoned Cart Data
-# ----------------------------
-FAKE_CART = {
-    "customer_name": "Rahul Sharma",
-    "phone": "+917499902809",  # <-- your testing number
-    "items": ["Wireless Headphones", "Bluetooth Speaker"],
-    "cart_value": 4098,
-    "discount_code": "SAVE10"
-}
-
-# ----------------------------
-# AI Script Generator
-# ----------------------------
-def generate_script(cart):
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-    prompt = f"""
-    Create a polite 20-second call script.
-
-    Customer: {cart['customer_name']}
-    Items: {', '.join(cart['items'])}
-    Cart Value: ₹{cart['cart_value']}
-    Discount Code: {cart['discount_code']}
-
-    Script should be friendly and simple.
-    """
-
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    # Correct way to access message content
-    return response.choices[0].message.content
-
-# ----------------------------
-# Twilio Call
-# ----------------------------
-def call_customer_twilio(message, phone):
-    client = Client(
-        os.getenv("TWILIO_ACCOUNT_SID"),
-        os.getenv("TWILIO_AUTH_TOKEN")
-    )
-
-    call = client.calls.create(
-        to=phone,
-        from_=os.getenv("TWILIO_NUMBER"),
-        twiml=f"<Response><Say>{message}</Say></Response>"
-    )
-
-    return call.sid
-
-# ----------------------------
-# API Endpoint
-# ----------------------------
-@app.get("/call-customer")
-def call_customer():
-    script = generate_script(FAKE_CART)
-    sid = call_customer_twilio(script, FAKE_CART["phone"])
-
-    return {
-        "status": "call started",
-        "call_sid": sid,
-        "script": script
-    }
+import os
+import re
+import sys
+import hmac
+import hashlib
+import time
+import uuid
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from statistics import median
+from typing import List
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+from fastapi import FastAPI, HTTPException, Request, Response, Security
+from fastapi.exceptions import RequestValidationError
+from fastapi.security import APIKeyHeader
+from pydantic import BaseModel, ValidationError
+from groq import AsyncGroq
+from twilio.rest import Client
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.request_validator import RequestValidator
+from dotenv import load_dotenv
+from script_cache import ScriptCache
+from script_templates import TemplateLibrary
+from cart_queue import CartQueue
+from product_index import ProductIndex, RAG_MIN_SCORE
+
+# The call-log helpers live with the campaign scripts
+CAMPAIGN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "VAPI_AI_AGENT_CALL_FROM_CSV")
+sys.path.append(CAMPAIGN_DIR)
+from call_outcomes import FINAL_STATUSES, CallOutcomeStore, parse_twilio, parse_vapi
+from call_store import CallStore, vapi_transcript
+from line_pool import LinePool
+from metrics import REGISTRY, counter, gauge, histogram, log, stage
+
+load_dotenv()
+
+# ----------------------------
+# Shared API Clients
+# ----------------------------
+# Created once per process and reused, so every request shares the same
+# connection pools instead of paying a new TLS handshake. Both are async,
+# so a slow LLM or Twilio response never ties up a server thread.
+clients = {}
+
+def get_groq():
+    if "groq" not in clients:
+        clients["groq"] = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+    return clients["groq"]
+
+def get_twilio():
+    # The async HTTP client needs a running event loop, so call this from async code
+    if "twilio" not in clients:
+        clients["twilio"] = Client(
+            os.getenv("TWILIO_ACCOUNT_SID"),
+            os.getenv("TWILIO_AUTH_TOKEN"),
+            http_client=AsyncTwilioHttpClient()
+        )
+    return clients["twilio"]
+
+# Bounded outbound pools: at most this many requests in flight per provider
+outbound = {
+    "groq": asyncio.Semaphore(int(os.getenv("GROQ_CONCURRENCY", "16"))),
+    "twilio": asyncio.Semaphore(int(os.getenv("TWILIO_CONCURRENCY", "16")))
+}
+
+# Caller IDs: the Twilio numbers of PHONE_LINES (or TWILIO_NUMBER), each call from the
+# least-loaded one with room; with LINE_HOLD_SECONDS set, a line is held until
+# Twilio's final status callback (see line_pool.py). PHONE_LINES may hold only
+# Vapi lines (for the campaign scripts); then there is no Twilio pool.
+phone_lines = None
+if os.getenv("PHONE_LINES") or os.getenv("TWILIO_NUMBER"):
+    try:
+        phone_lines = LinePool.from_env(providers=("twilio",))
+    except ValueError:
+        log("no_twilio_lines", "⚠️ PHONE_LINES has no Twilio line and TWILIO_NUMBER is unset; "
+            "calls will fail until one is configured")
+
+# Provider latency, served with everything else on /metrics
+GROQ_SECONDS = stage("groq")
+TWILIO_SECONDS = stage("twilio")
+
+@asynccontextmanager
+async def lifespan(app):
+    get_groq()
+    get_twilio()
+    applier = asyncio.create_task(apply_outcomes())
+    consumers = [asyncio.create_task(consume_carts()) for _ in range(CART_CONSUMERS)]
+    yield
+    for task in consumers:
+        task.cancel()
+    applier.cancel()
+    drain_outcomes()
+    cart_queue.close()
+    if product_index:
+        product_index.close()
+    await clients.pop("groq").close()
+    await clients.pop("twilio").http_client.close()
+
+app = FastAPI(lifespan=lifespan)
+
+# Generated scripts keyed by cart shape (items, value, discount code, language)
+script_cache = ScriptCache(
+    maxsize=int(os.getenv("SCRIPT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SCRIPT_CACHE_TTL", "3600"))
+)
+
+# Pre-generated scripts per language and cart band (build with script_templates.py);
+# the LLM is only called for carts no template covers
+script_templates = TemplateLibrary.load(os.getenv("SCRIPT_TEMPLATES", "script_templates.json"))
+
+# Product knowledge base (build with product_index.py): facts about the cart's
+# items go into the prompt; lookups are cached per item, and hits scoring
+# under RAG_MIN_SCORE are left out so an unknown item adds no facts
+product_index = ProductIndex(os.getenv("PRODUCT_INDEX")) if os.getenv("PRODUCT_INDEX") else None
+RAG_LOOKUP = stage("rag_lookup")
+
+# ----------------------------
+# Fake Abandoned Cart Data
+# ----------------------------
+FAKE_CART = {
+    "customer_name": "Rahul Sharma",
+    "phone": "+917499902809",  # <-- your testing number
+    "items": ["Wireless Headphones", "Bluetooth Speaker"],
+    "cart_value": 4098,
+    "discount_code": "SAVE10"
+}
+
+# Request body for the batch endpoint
+class Cart(BaseModel):
+    customer_name: str
+    phone: str
+    items: List[str]
+    cart_value: float
+    discount_code: str = ""
+    language: str = "en"
+
+# ----------------------------
+# AI Script Generator
+# ----------------------------
+def product_facts(items):
+    if product_index is None or not items:
+        return ""
+    with RAG_LOOKUP.time():
+        found = product_index.facts(items, min_score=RAG_MIN_SCORE)
+    lines = [f"    - {fact}" for facts in found for fact in facts]
+    return "\n\n    Product Facts (use only these, don't invent others):\n" + "\n".join(lines) if lines else ""
+
+def build_prompt(cart):
+    return f"""
+    Create a polite 20-second call script.
+
+    Customer: {cart['customer_name']}
+    Items: {', '.join(cart['items'])}
+    Cart Value: ₹{cart['cart_value']}
+    Discount Code: {cart['discount_code']}{product_facts(cart['items'])}
+
+    Script should be friendly and simple.
+    """
+
+def ready_script(cart):
+    # Template first, then a previously generated script; None means ask the LLM
+    script = script_templates.render(cart)
+    if script is not None:
+        return script, "template"
+    cached = script_cache.get(cart)
+    if cached is not None:
+        return cached, "cache"
+    return None, "llm"
+
+async def generate_script(cart):
+    script, source = ready_script(cart)
+    if script is not None:
+        return script, source
+
+    async with outbound["groq"]:
+        with GROQ_SECONDS.time():
+            response = await get_groq().chat.completions.create(
+                model="llama-3.1-8b-instant",
+                messages=[{"role": "user", "content": build_prompt(cart)}]
+            )
+
+    # Correct way to access message content
+    script = response.choices[0].message.content
+    script_cache.put(cart, script)
+    return script, "llm"
+
+# ----------------------------
+# Twilio Call
+# ----------------------------
+def twiml_say(message, redirect=None):
+    twiml = f"<Say>{escape(message)}</Say>" if message else ""
+    if redirect:
+        twiml += f'<Redirect method="POST">{escape(redirect)}</Redirect>'
+    return f"<Response>{twiml}</Response>"
+
+async def call_customer_twilio(message, phone, redirect=None):
+    async def dial(line):
+        async with outbound["twilio"]:
+            with TWILIO_SECONDS.time():
+                return await get_twilio().calls.create_async(
+                    to=phone,
+                    from_=line.number if line else os.getenv("TWILIO_NUMBER"),
+                    twiml=twiml_say(message, redirect),
+                    **({"status_callback": f"{PUBLIC_BASE_URL}/webhooks/twilio"} if PUBLIC_BASE_URL else {})
+                )
+
+    call = await (phone_lines.call(phone, dial) if phone_lines else dial(None))
+    return call.sid
+
+async def recover_cart(cart):
+    started = time.perf_counter()
+    script, source = await generate_script(cart)
+    generated = time.perf_counter()
+    sid = await call_customer_twilio(script, cart["phone"])
+    timing = record_timing(
+        "full",
+        ttft_ms=(generated - started) * 1000,
+        time_to_dial_ms=(time.perf_counter() - started) * 1000
+    )
+    return {
+        "status": "call started",
+        "call_sid": sid,
+        "script": script,
+        "script_source": source,
+        "timing": timing
+    }
+
+# ----------------------------
+# Streaming Script + Early Dial
+# ----------------------------
+# The call is placed as soon as the first sentence has streamed in. Its TwiML
+# says that sentence and then <Redirect>s to /twiml/rest/<token>, which
+# answers with the rest of the script once generation has finished. By the
+# time the customer picks up, the rest is normally ready. If the stream fails
+# once the call is being placed, the call goes ahead with a fallback rest
+# (fallback_rest) instead of failing, so the cart is never dialed twice.
+
+SENTENCE_END = re.compile(r"[.!?](?=\s)")
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
+SCRIPT_STREAMING = os.getenv("SCRIPT_STREAMING", "0") == "1"
+
+# token -> Future with the rest of the script, fetched once by Twilio
+pending_scripts = {}
+
+# Per-call latency samples (time-to-first-token, time-to-dial) for /stats,
+# and the same as histograms over the whole process lifetime for /metrics
+call_timings = deque(maxlen=1000)
+TTFT_SECONDS = histogram("ttft_seconds", "Time to the script's first token", ("mode",))
+TIME_TO_DIAL_SECONDS = histogram("time_to_dial_seconds", "Request start to Twilio call created", ("mode",))
+
+def record_timing(mode, ttft_ms, time_to_dial_ms):
+    timing = {
+        "mode": mode,
+        "ttft_ms": round(ttft_ms, 1),
+        "time_to_dial_ms": round(time_to_dial_ms, 1)
+    }
+    call_timings.append(timing)
+    TTFT_SECONDS.labels(mode).observe(ttft_ms / 1000)
+    TIME_TO_DIAL_SECONDS.labels(mode).observe(time_to_dial_ms / 1000)
+    return timing
+
+def timing_summary():
+    summary = {}
+    for mode in ("full", "streaming"):
+        samples = [t for t in call_timings if t["mode"] == mode]
+        if samples:
+            summary[mode] = {
+                "calls": len(samples),
+                "p50_ttft_ms": median(t["ttft_ms"] for t in samples),
+                "p50_time_to_dial_ms": median(t["time_to_dial_ms"] for t in samples)
+            }
+    return summary
+
+def fallback_rest(cart):
+    code = f" Use code {cart['discount_code']} for a discount." if cart.get("discount_code") else ""
+    return f"Your cart is saved, so you can complete your order any time.{code} Thank you!"
+
+async def recover_cart_streaming(cart):
+    if not PUBLIC_BASE_URL:
+        raise RuntimeError("Streaming mode needs PUBLIC_BASE_URL so Twilio can fetch the rest of the script")
+
+    ready, source = ready_script(cart)
+    if ready is not None:
+        started = time.perf_counter()
+        sid = await call_customer_twilio(ready, cart["phone"])
+        timing = record_timing("streaming", 0.0, (time.perf_counter() - started) * 1000)
+        return {"status": "call started", "call_sid": sid, "script": ready,
+                "script_source": source, "timing": timing}
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    marks = {}
+    token = uuid.uuid4().hex
+    rest = loop.create_future()
+    pending_scripts[token] = rest
+    loop.call_later(600, pending_scripts.pop, token, None)
+
+    async def dial(opening):
+        sid = await call_customer_twilio(
+            opening, cart["phone"], redirect=f"{PUBLIC_BASE_URL}/twiml/rest/{token}"
+        )
+        marks["dial"] = time.perf_counter()
+        return sid
+
+    text = ""
+    opening = None
+    dialing = None
+    source = "llm"
+    try:
+        try:
+            async with outbound["groq"]:
+                with GROQ_SECONDS.time():
+                    stream = await get_groq().chat.completions.create(
+                        model="llama-3.1-8b-instant",
+                        messages=[{"role": "user", "content": build_prompt(cart)}],
+                        stream=True
+                    )
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if not delta:
+                            continue
+                        marks.setdefault("first_token", time.perf_counter())
+                        text += delta
+                        if dialing is None:
+                            match = SENTENCE_END.search(text)
+                            if match:
+                                opening = text[:match.end()]
+                                dialing = asyncio.create_task(dial(opening))
+
+            if not text:
+                raise RuntimeError("Groq returned an empty script")
+        except Exception as e:
+            if dialing is None:
+                raise  # nobody was dialed: the caller may retry
+            log("script_stream_failed", f"⚠️ Script stream for {cart['phone']} failed after dialing; "
+                f"finishing the call with the fallback script: {e}", phone=cart["phone"], error=str(e))
+            source = "fallback"
+            text = f"{opening} {fallback_rest(cart)}"
+        if dialing is None:
+            # No sentence break: the whole (short) script is the opening line
+            opening = text
+            dialing = asyncio.create_task(dial(opening))
+        rest.set_result(text[len(opening):].strip())
+        sid = await dialing
+    except BaseException:
+        # Cancelled: don't leave a call being placed behind us
+        if dialing is not None and not dialing.done():
+            dialing.cancel()
+        raise
+    finally:
+        if not rest.done():
+            rest.set_result("")
+
+    if source == "llm":
+        script_cache.put(cart, text)
+    timing = record_timing(
+        "streaming",
+        ttft_ms=(marks.get("first_token", started) - started) * 1000,
+        time_to_dial_ms=(marks["dial"] - started) * 1000
+    )
+    return {"status": "call started", "call_sid": sid, "script": text,
+            "script_source": source, "timing": timing}
+
+# ----------------------------
+# Webhook Authentication
+# ----------------------------
+# Callbacks rewrite call-log rows, so each must prove where it came from:
+# Twilio signs its requests with the account's auth token (X-Twilio-Signature
+# over the URL it called and the form fields), Vapi sends the server secret
+# set on the assistant (X-Vapi-Secret, here VAPI_SERVER_SECRET). Without a
+# token or secret configured, every callback of that provider is refused.
+#
+# Endpoints that place calls are guarded the same way: the store platform
+# signs each cart-abandoned webhook (X-Cart-Signature: hex HMAC-SHA256 of the
+# body keyed with CART_WEBHOOK_SECRET, optionally "sha256="-prefixed), and
+# /call-customers callers send CALL_API_KEY as X-Api-Key (checked as a route
+# dependency, so before the body is validated).
+VAPI_SERVER_SECRET = os.getenv("VAPI_SERVER_SECRET", "")
+CART_WEBHOOK_SECRET = os.getenv("CART_WEBHOOK_SECRET", "")
+CALL_API_KEY = os.getenv("CALL_API_KEY", "")
+twilio_validator = RequestValidator(os.getenv("TWILIO_AUTH_TOKEN")) if os.getenv("TWILIO_AUTH_TOKEN") else None
+WEBHOOKS_REJECTED = counter("webhooks_rejected_total", "Callbacks refused for a missing or bad signature",
+                            ("provider",))
+
+def secret_matches(given, secret):
+    return bool(secret) and hmac.compare_digest((given or "").encode(), secret.encode())
+
+def signed_url(request):
+    # The URL Twilio signed: the public one when we sit behind a proxy
+    if not PUBLIC_BASE_URL:
+        return str(request.url)
+    query = f"?{request.url.query}" if request.url.query else ""
+    return f"{PUBLIC_BASE_URL}{request.url.path}{query}"
+
+def body_signed(body, signature, secret):
+    if not secret:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return secret_matches((signature or "").removeprefix("sha256="), expected)
+
+call_api_key = APIKeyHeader(name="X-Api-Key", auto_error=False)
+
+def require_call_api_key(key: str = Security(call_api_key)):
+    if not secret_matches(key, CALL_API_KEY):
+        raise HTTPException(status_code=401)
+
+def twilio_signed(request, form):
+    return twilio_validator is not None and twilio_validator.validate(
+        signed_url(request), form, request.headers.get("X-Twilio-Signature", "")
+    )
+
+# ----------------------------
+# Call Outcome Webhooks
+# ----------------------------
+# Vapi end-of-call reports and Twilio status callbacks fill in the call-log
+# columns that were "Pending" when the call was placed. Callbacks are queued
+# and applied in batches: one overlay append + fsync per batch, looked up by
+# call_id, so the CSV itself is never rewritten (see call_outcomes.py).
+outcome_store = CallOutcomeStore(
+    os.getenv("CALL_LOG_PATH", os.path.join(CAMPAIGN_DIR, "call_logs_detailed.csv"))
+)
+# With CALL_STORE set, outcomes (and Vapi transcripts) also go to the SQLite call store
+call_store = CallStore(os.getenv("CALL_STORE")) if os.getenv("CALL_STORE") else None
+outcome_queue = asyncio.Queue()
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "500"))
+WEBHOOK_BATCH_INTERVAL = float(os.getenv("WEBHOOK_BATCH_INTERVAL", "0.25"))
+WEBHOOKS = counter("webhooks_total", "Call outcome callbacks received", ("provider",))
+OUTCOMES_APPLIED = counter("call_outcomes_applied_total", "Call outcomes written to the overlay")
+OUTCOME_QUEUE = gauge("call_outcomes_queued", "Call outcomes waiting for the next batch")
+
+def take_batch():
+    batch = []
+    while len(batch) < WEBHOOK_BATCH_SIZE and not outcome_queue.empty():
+        batch.append(outcome_queue.get_nowait())
+    return batch
+
+def apply_batch(batch):
+    outcome_store.apply(batch)
+    if call_store:
+        call_store.apply(batch)
+
+async def apply_outcomes():
+    while True:
+        first = await outcome_queue.get()
+        await asyncio.sleep(WEBHOOK_BATCH_INTERVAL)  # let the batch fill up
+        batch = [first] + take_batch()
+        try:
+            await asyncio.to_thread(apply_batch, batch)
+            OUTCOMES_APPLIED.inc(len(batch))
+        except Exception as e:
+            log("call_outcomes_failed", f"❌ Failed to apply {len(batch)} call outcomes: {e}",
+                batch=len(batch), error=str(e))
+
+def drain_outcomes():
+    # On shutdown, apply whatever is still queued
+    while not outcome_queue.empty():
+        apply_batch(take_batch())
+    if call_store:
+        call_store.close()
+
+@app.post("/webhooks/vapi")
+async def vapi_webhook(request: Request):
+    if not secret_matches(request.headers.get("X-Vapi-Secret"), VAPI_SERVER_SECRET):
+        WEBHOOKS_REJECTED.labels("vapi").inc()
+        return Response(status_code=401)
+    payload = await request.json()
+    update = parse_vapi(payload)
+    WEBHOOKS.labels("vapi").inc()
+    if update:
+        outcome_queue.put_nowait(update)
+    transcript = vapi_transcript(payload) if call_store else None
+    if transcript:
+        await asyncio.to_thread(call_store.save_transcripts, [transcript])
+    return {"received": True}
+
+@app.post("/webhooks/twilio")
+async def twilio_webhook(request: Request):
+    form = {k: v[0] for k, v in parse_qs((await request.body()).decode(), keep_blank_values=True).items()}
+    if not twilio_signed(request, form):
+        WEBHOOKS_REJECTED.labels("twilio").inc()
+        return Response(status_code=403)
+    update = parse_twilio(form)
+    WEBHOOKS.labels("twilio").inc()
+    if update:
+        outcome_queue.put_nowait(update)
+    if phone_lines and form.get("CallStatus") in FINAL_STATUSES:
+        phone_lines.ended(form.get("CallSid"))
+    return Response(status_code=204)
+
+# ----------------------------
+# Cart-Abandoned Webhooks
+# ----------------------------
+# The store platform POSTs each abandoned cart to /webhooks/cart-abandoned.
+# The handler validates it, appends it to the durable queue (cart_queue.py,
+# ~50µs) and answers 202. CART_CONSUMERS consumer tasks claim up to
+# CART_BATCH events at a time and run the same generate-and-dial path as
+# /call-customer, waking as soon as an event lands rather than polling.
+#
+# Backpressure: a consumer claims its next batch only once the current one
+# is dialed (and the outbound semaphores bound provider load), so a burst
+# waits on disk, not in memory. Past CART_QUEUE_MAX waiting events the
+# handler answers 429 + Retry-After and the sender backs off.
+#
+# Each event is acked as soon as its call is placed, and the leases of the
+# batch's events still being dialed are renewed every third of
+# CART_QUEUE_LEASE, so a slow batch is never handed to another consumer and
+# dialed twice. If dialing fails the event is left on the queue and retried
+# when its lease expires, up to CART_MAX_DELIVERIES times; events of a
+# crashed process are retried the same way after a restart.
+cart_queue = CartQueue()
+CART_CONSUMERS = int(os.getenv("CART_CONSUMERS", "4"))
+CART_BATCH = int(os.getenv("CART_BATCH", "16"))
+CART_QUEUE_MAX = int(os.getenv("CART_QUEUE_MAX", "10000"))
+CART_MAX_DELIVERIES = int(os.getenv("CART_MAX_DELIVERIES", "3"))
+cart_arrived = asyncio.Event()
+CART_EVENTS = counter("cart_events_total", "Cart-abandoned events by outcome", ("outcome",))
+CART_QUEUE_DEPTH = gauge("cart_queue_depth", "Cart events waiting or being dialed")
+WEBHOOK_TO_DIAL_SECONDS = histogram("webhook_to_dial_seconds", "Cart webhook received to Twilio call created")
+
+@app.post("/webhooks/cart-abandoned", status_code=202)
+async def cart_abandoned(request: Request):
+    body = await request.body()
+    if not body_signed(body, request.headers.get("X-Cart-Signature"), CART_WEBHOOK_SECRET):
+        WEBHOOKS_REJECTED.labels("cart").inc()
+        return Response(status_code=401)
+    try:
+        cart = Cart.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    if cart_queue.depth() >= CART_QUEUE_MAX:
+        CART_EVENTS.labels("rejected").inc()
+        return Response(status_code=429, headers={"Retry-After": "1"})
+    event_id = cart_queue.append(cart.model_dump())
+    cart_arrived.set()
+    CART_EVENTS.labels("queued").inc()
+    return {"queued": event_id}
+
+async def dial_event(cart, received_at):
+    recover = recover_cart_streaming if SCRIPT_STREAMING else recover_cart
+    started = time.time()
+    result = await recover(cart)
+    # received_at is wall-clock (it may come from before a restart)
+    WEBHOOK_TO_DIAL_SECONDS.observe(started - received_at + result["timing"]["time_to_dial_ms"] / 1000)
+    return result
+
+async def consume_carts():
+    while True:
+        cart_arrived.clear()
+        batch = cart_queue.claim(CART_BATCH)
+        if not batch:
+            try:
+                # Also wakes up now and then for events whose lease ran out
+                await asyncio.wait_for(cart_arrived.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        dialing = {event_id for event_id, *_ in batch}
+        renewing = asyncio.create_task(renew_leases(dialing))
+        try:
+            await asyncio.gather(*(dial_and_ack(dialing, *event) for event in batch))
+        finally:
+            renewing.cancel()
+
+async def dial_and_ack(dialing, event_id, cart, received_at, deliveries):
+    try:
+        await dial_event(cart, received_at)
+    except Exception as e:
+        CART_EVENTS.labels("failed").inc()
+        log("cart_event_failed", f"❌ Cart event {event_id} for {cart['phone']} failed: {e}",
+            event_id=event_id, phone=cart["phone"], deliveries=deliveries, error=str(e))
+        dialing.discard(event_id)  # let the lease run out so it is retried
+        if deliveries < CART_MAX_DELIVERIES:
+            return
+    else:
+        CART_EVENTS.labels("dialed").inc()
+        dialing.discard(event_id)
+    cart_queue.ack([event_id])
+
+async def renew_leases(dialing):
+    while True:
+        await asyncio.sleep(cart_queue.lease / 3)
+        cart_queue.renew(dialing)
+
+# ----------------------------
+# API Endpoint
+# ----------------------------
+@app.get("/call-customer")
+async def call_customer(stream: bool = SCRIPT_STREAMING):
+    recover = recover_cart_streaming if stream else recover_cart
+    return await recover(FAKE_CART)
+
+@app.post("/call-customers", dependencies=[Security(require_call_api_key)])
+async def call_customers(carts: List[Cart], stream: bool = SCRIPT_STREAMING):
+    # Fan out concurrently; the outbound semaphores keep provider load bounded
+    recover = recover_cart_streaming if stream else recover_cart
+    results = await asyncio.gather(
+        *(recover(cart.model_dump()) for cart in carts),
+        return_exceptions=True
+    )
+    calls = [
+        {"phone": cart.phone, "status": "failed", "error": str(result)}
+        if isinstance(result, Exception) else {"phone": cart.phone, **result}
+        for cart, result in zip(carts, results)
+    ]
+    sources = [call["script_source"] for call in calls if "script_source" in call]
+    templated = sources.count("template")
+    summary = {
+        "carts": len(carts),
+        "template_hits": templated,
+        "template_hit_rate": templated / len(sources) if sources else 0.0,
+        "llm_calls": sources.count("llm"),
+        "llm_calls_saved": len(sources) - sources.count("llm")
+    }
+    log("campaign_done",
+        f"✓ Campaign: {summary['carts']} carts | template hit rate {summary['template_hit_rate']:.0%} | "
+        f"LLM calls saved {summary['llm_calls_saved']}",
+        **summary)
+    return {"summary": summary, "calls": calls}
+
+@app.post("/twiml/rest/{token}")
+async def twiml_rest(token: str):
+    # Twilio follows the <Redirect> here after saying the opening line
+    rest = pending_scripts.pop(token, None)
+    try:
+        text = await asyncio.wait_for(asyncio.shield(rest), timeout=15) if rest else ""
+    except asyncio.TimeoutError:
+        text = ""
+    return Response(content=twiml_say(text), media_type="application/xml")
+
+@app.get("/stats")
+async def stats():
+    return {
+        "script_templates": script_templates.stats(),
+        "script_cache": script_cache.stats(),
+        "call_timings": timing_summary(),
+        "call_outcomes": {**outcome_store.stats(), "queued": outcome_queue.qsize()},
+        "cart_queue": cart_queue.stats(),
+        "product_index": product_index.stats() if product_index else None,
+        "phone_lines": phone_lines.stats() if phone_lines else None
+    }
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text format: stage latencies, provider errors, webhook counts, ...
+    OUTCOME_QUEUE.set(outcome_queue.qsize())
+    CART_QUEUE_DEPTH.set(cart_queue.depth())
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,324 @@
+import csv
+import json
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+# ----------------------------
+# Product Knowledge Index
+# ----------------------------
+# The "Product Knowledge Base" of Guide_1: product facts retrieved for the
+# items in a cart and added to the LLM prompt, so the script talks about the
+# actual products instead of only their names.
+#
+#   python product_index.py build catalog.csv product_index/
+#   python product_index.py query product_index/ "Wireless earbuds" "Yoga mat"
+#   PRODUCT_INDEX=product_index/ uvicorn main:app
+#
+# catalog.csv has sku, name, category, price and facts columns. The index is
+# an inverted-file (IVF) layout of unit-length float32 embeddings:
+#   centroids.npy     LISTS spherical k-means centroids (~sqrt(products))
+#   vectors.f32       every product's embedding, grouped by nearest centroid,
+#                     memory-mapped so only the lists a query touches are read
+#   lists.npy         start row of each list in vectors.f32 (+ the end)
+#   snippets.txt      "name: facts (price)" per row, same order
+#   offsets.npy       byte offset of each snippet (+ the end)
+# A query is scored against the centroids, then exactly (cosine = dot
+# product) against the rows of its PROBES nearest lists; queries in one
+# search() share a matrix product per list. Results are cached per item.
+# facts() drops hits scoring under RAG_MIN_SCORE, so an item the catalog
+# does not carry gets no facts rather than some unrelated product's.
+
+EMBED_DIM = int(os.getenv("PRODUCT_EMBED_DIM", "128"))
+LISTS = int(os.getenv("PRODUCT_INDEX_LISTS", "0"))  # 0 = about sqrt(products)
+PROBES = int(os.getenv("PRODUCT_INDEX_PROBES", "8"))
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "2"))
+# Cosine floor for a fact to reach the prompt; with the hash embedder real
+# matches score ~0.7+ and unrelated products ~0.3-0.45
+RAG_MIN_SCORE = float(os.getenv("RAG_MIN_SCORE", "0.55"))
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "4096"))
+
+WORD = re.compile(r"\w+")
+
+
+# ----------------------------
+# Embeddings
+# ----------------------------
+class HashEmbedder:
+    """
+    Deterministic local stand-in for an embedding model: words and character
+    trigrams hashed (crc32) into `dim` signed buckets, then L2-normalized.
+    Texts sharing words or spellings land close together, with no model
+    download or API call. Anything with the same `embed(texts) -> (n, dim)
+    float32` method can replace it.
+    """
+
+    def __init__(self, dim=EMBED_DIM):
+        self.dim = dim
+        self.name = f"hash-{dim}"
+        self._buckets = {}  # token -> (bucket, sign); product vocabularies are small
+
+    def _features(self, text):
+        words = WORD.findall(text.lower())
+        tokens = list(words)
+        for word in words:
+            padded = f" {word} "
+            tokens.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        buckets = self._buckets
+        for token in tokens:
+            feature = buckets.get(token)
+            if feature is None:
+                h = zlib.crc32(token.encode())
+                feature = buckets[token] = (h % self.dim, 1.0 if h >> 31 else -1.0)
+            yield feature
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, sign in self._features(text):
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+def snippet(row):
+    price = f" ({row['price']})" if row.get("price") else ""
+    facts = f": {row['facts']}" if row.get("facts") else ""
+    return f"{row['name']}{facts}{price}"
+
+
+def kmeans(vectors, lists, iterations=8, seed=7):
+    """Spherical k-means centroids (unit length) of a sample of unit vectors."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # An empty list restarts from a random sample point
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+# ----------------------------
+# Index Build
+# ----------------------------
+def read_catalog(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def build_index(catalog, out_dir, embedder=None, lists=LISTS, chunk=65536, train_size=None, seed=7):
+    """
+    Embed every product in `catalog` (a CSV path or an iterable of dicts)
+    and write the index to `out_dir`; returns its row count.
+    """
+    embedder = embedder or HashEmbedder()
+    rows = read_catalog(catalog) if isinstance(catalog, str) else iter(catalog)
+    os.makedirs(out_dir, exist_ok=True)
+    raw_path = os.path.join(out_dir, "vectors.raw")
+
+    # 1. Embed in chunks into a scratch file, keeping the snippets
+    snippets = []
+    with open(raw_path, "wb") as raw:
+        while True:
+            batch = [row for _, row in zip(range(chunk), rows)]
+            if not batch:
+                break
+            texts = [f"{row['name']} {row.get('category', '')}" for row in batch]
+            raw.write(embedder.embed(texts).tobytes())
+            snippets.extend(snippet(row) for row in batch)
+    count = len(snippets)
+    if not count:
+        os.remove(raw_path)
+        raise ValueError("the catalog is empty")
+    vectors = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(count, embedder.dim))
+
+    # 2. Centroids from a sample, then every row's nearest centroid
+    lists = max(1, min(lists or round(count ** 0.5), count // 4 or 1))
+    rng = np.random.default_rng(seed)
+    sample_size = min(count, train_size or lists * 64)
+    sample = np.asarray(vectors[np.sort(rng.choice(count, sample_size, replace=False))])
+    centroids = kmeans(sample, lists, seed=seed)
+    assign = np.concatenate([
+        np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1) for start in range(0, count, chunk)
+    ])
+
+    # 3. Rows grouped by list, so each list is one contiguous slice
+    order = np.argsort(assign, kind="stable")
+    bounds = np.searchsorted(assign[order], np.arange(lists + 1))
+    grouped = np.memmap(os.path.join(out_dir, "vectors.f32"), dtype=np.float32, mode="w+",
+                        shape=(count, embedder.dim))
+    for start in range(0, count, chunk):
+        grouped[start:start + chunk] = vectors[order[start:start + chunk]]
+    grouped.flush()
+    del grouped, vectors
+    os.remove(raw_path)
+
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    with open(os.path.join(out_dir, "snippets.txt"), "wb") as f:
+        position = 0
+        for i, row in enumerate(order):
+            data = snippets[row].encode("utf-8")
+            f.write(data)
+            position += len(data)
+            offsets[i + 1] = position
+
+    np.save(os.path.join(out_dir, "centroids.npy"), centroids)
+    np.save(os.path.join(out_dir, "lists.npy"), bounds.astype(np.int64))
+    np.save(os.path.join(out_dir, "offsets.npy"), offsets)
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"count": count, "dim": embedder.dim, "lists": lists, "embedder": embedder.name}, f)
+    return count
+
+
+# ----------------------------
+# Index Search
+# ----------------------------
+class ProductIndex:
+    """
+    Read-only view of an index built by build_index().
+
+    search(texts, k) returns, per text, the k best (score, snippet) pairs;
+    facts(items) is the cached per-item lookup the prompt builder uses.
+    """
+
+    def __init__(self, path, embedder=None, probes=PROBES, cache_size=RAG_CACHE_SIZE):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.embedder = embedder or HashEmbedder(self.meta["dim"])
+        if self.embedder.dim != self.meta["dim"]:
+            raise ValueError(f"{path} holds {self.meta['dim']}-dim vectors, the embedder makes {self.embedder.dim}")
+        self.probes = max(1, min(probes, self.meta["lists"]))
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.lists = np.load(os.path.join(path, "lists.npy"))
+        self.vectors = np.memmap(os.path.join(path, "vectors.f32"), dtype=np.float32, mode="r",
+                                 shape=(self.meta["count"], self.meta["dim"]))
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self._snippets = open(os.path.join(path, "snippets.txt"), "rb")
+
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def search_rows(self, queries, k, probes=None):
+        """(rows, scores), each (len(queries), k), best first, for unit query vectors."""
+        probes = min(probes or self.probes, len(self.centroids))
+        nearest = np.argpartition(-(queries @ self.centroids.T), probes - 1, axis=1)[:, :probes]
+
+        candidates = [[] for _ in queries]
+        # One product per probed list, covering every query that probes it
+        for list_id in np.unique(nearest):
+            asking = np.flatnonzero((nearest == list_id).any(axis=1))
+            start, end = self.lists[list_id], self.lists[list_id + 1]
+            if start == end:
+                continue
+            scores = self.vectors[start:end] @ queries[asking].T
+            for column, query in enumerate(asking):
+                candidates[query].append((start, scores[:, column]))
+
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        best = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for query, parts in enumerate(candidates):
+            if not parts:
+                continue
+            scores = np.concatenate([s for _, s in parts])
+            index = np.concatenate([np.arange(start, start + len(s)) for start, s in parts])
+            top = min(k, len(scores))
+            pick = np.argpartition(-scores, top - 1)[:top] if top < len(scores) else np.arange(len(scores))
+            pick = pick[np.argsort(-scores[pick], kind="stable")]
+            rows[query, :top] = index[pick]
+            best[query, :top] = scores[pick]
+        return rows, best
+
+    def snippet(self, row):
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return os.pread(self._snippets.fileno(), end - start, start).decode("utf-8")
+
+    def search(self, texts, k=RAG_TOP_K, probes=None):
+        rows, scores = self.search_rows(self.embedder.embed(texts), k, probes)
+        return [
+            [(float(score), self.snippet(row)) for row, score in zip(r, s) if row >= 0]
+            for r, s in zip(rows, scores)
+        ]
+
+    def facts(self, items, k=RAG_TOP_K, min_score=RAG_MIN_SCORE):
+        """
+        Product facts for each cart item, [snippet, ...] per item, keeping
+        only hits scoring at least `min_score`; cached by item text.
+        """
+        keys = [item.strip().lower() for item in items]
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    found[key] = self._cache[key]
+                    self.hits += 1
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing:
+            results = self.search(missing, k)
+            with self._lock:
+                for key, hits in zip(missing, results):
+                    found[key] = self._cache[key] = hits
+                    self.misses += 1
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [[text for score, text in found[key] if score >= min_score] for key in keys]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "products": len(self),
+            "cache_size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._snippets.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build or query the product knowledge index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build")
+    build.add_argument("catalog")
+    build.add_argument("out", nargs="?", default="product_index")
+    build.add_argument("--lists", type=int, default=LISTS)
+    query = commands.add_parser("query")
+    query.add_argument("index")
+    query.add_argument("text", nargs="+")
+    query.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_index(args.catalog, args.out, lists=args.lists)
+        print(f"✓ Indexed {count} products into {args.out} in {time.perf_counter() - start:.1f}s")
+    else:
+        index = ProductIndex(args.index)
+        for text, hits in zip(args.text, index.search(args.text, args.k)):
+            print(f"🔎 {text}")
+            for score, found in hits:
+                print(f"   {score:.3f}  {found}")
@@ -0,0 +1,105 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Stand-ins for the customer's name inside cached scripts
+NAME_SLOT = "{customer_name}"
+FIRST_NAME_SLOT = "{first_name}"
+
+
+# ----------------------------
+# Cart Fingerprint
+# ----------------------------
+def cart_fingerprint(cart):
+    """Normalized cache key: same items, value, discount code and language → same script."""
+    items = tuple(sorted(item.strip().lower() for item in cart["items"]))
+    return (
+        items,
+        round(float(cart["cart_value"]), 2),
+        str(cart.get("discount_code") or "").strip().upper(),
+        str(cart.get("language") or "en").strip().lower(),
+    )
+
+
+def _word(text):
+    # Whole-word match, also for names that start or end with a non-word character ("Dr.")
+    return re.compile(rf"(?<!\w){re.escape(text)}(?!\w)")
+
+
+def strip_name(script, name):
+    """
+    The script with the customer's name swapped for placeholders, or None
+    when it can't be shared: no name, the name isn't in the script, or a
+    part of it is left over (a surname, "Mr. Sharma") after the swap.
+    """
+    parts = name.split()
+    if not parts:
+        return None
+    template, named = _word(" ".join(parts)).subn(NAME_SLOT, script)
+    if len(parts) > 1:
+        template, first = _word(parts[0]).subn(FIRST_NAME_SLOT, template)
+        named += first
+    if not named or any(_word(part).search(template) for part in parts):
+        return None
+    return template
+
+
+def fill_name(template, name):
+    first = name.split()[0] if name.strip() else name
+    return template.replace(NAME_SLOT, name).replace(FIRST_NAME_SLOT, first)
+
+
+# ----------------------------
+# LRU + TTL Script Cache
+# ----------------------------
+class ScriptCache:
+    """
+    Thread-safe LRU cache of generated call scripts with a per-entry TTL.
+
+    Scripts are stored with the customer's name swapped for placeholders, so
+    one generated script serves every customer with the same cart shape; a
+    script strip_name can't make name-free is not stored.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cart):
+        key = cart_fingerprint(cart)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            template = entry[0]
+        return fill_name(template, cart["customer_name"])
+
+    def put(self, cart, script):
+        key = cart_fingerprint(cart)
+        template = strip_name(script, cart["customer_name"])
+        if template is None:
+            return
+        with self._lock:
+            self._entries[key] = (template, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
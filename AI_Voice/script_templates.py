@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import zlib
+from string import Formatter
+
+# Slots a template may use; everything else in a template is literal text
+SLOTS = ("customer_name", "first_name", "items", "cart_value", "discount_code")
+
+# Cart value bands (₹): templates are written per band so the tone fits the cart
+CART_BANDS = (("low", 1000), ("mid", 5000), ("high", float("inf")))
+
+
+def cart_band(cart_value):
+    for band, upper in CART_BANDS:
+        if float(cart_value) < upper:
+            return band
+    return CART_BANDS[-1][0]
+
+
+def template_key(cart):
+    has_discount = "discount" if cart.get("discount_code") else "plain"
+    return f"{cart.get('language') or 'en'}|{cart_band(cart['cart_value'])}|{has_discount}"
+
+
+# ----------------------------
+# Compiled Template
+# ----------------------------
+class CompiledTemplate:
+    """A template pre-split into literal text and slot names, so rendering is a single join."""
+
+    __slots__ = ("text", "parts")
+
+    def __init__(self, text):
+        self.text = text
+        parts = []
+        for literal, field, spec, conversion in Formatter().parse(text):
+            if literal:
+                parts.append((True, literal))
+            if field is not None:
+                if field not in SLOTS or spec or conversion:
+                    raise ValueError(f"Unsupported slot {{{field}}} in template: {text!r}")
+                parts.append((False, field))
+        self.parts = tuple(parts)
+
+    def render(self, slots):
+        return "".join(value if literal else slots[value] for literal, value in self.parts)
+
+
+def format_value(value):
+    value = float(value)
+    return f"₹{value:.0f}" if value.is_integer() else f"₹{value:.2f}"
+
+
+def cart_slots(cart):
+    name = cart["customer_name"].strip()
+    return {
+        "customer_name": name,
+        "first_name": name.split()[0] if name else name,
+        "items": ", ".join(cart["items"]),
+        "cart_value": format_value(cart["cart_value"]),
+        "discount_code": cart.get("discount_code") or "",
+    }
+
+
+# ----------------------------
+# Template Library
+# ----------------------------
+class TemplateLibrary:
+    """
+    Precompiled call-script templates keyed by "language|band|discount".
+
+    render(cart) fills the slots with string joins and returns None when no
+    template covers the cart, in which case the caller falls back to the LLM.
+    """
+
+    def __init__(self, templates=None):
+        self.templates = {
+            key: [CompiledTemplate(text) for text in texts]
+            for key, texts in (templates or {}).items() if texts
+        }
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({k: [t.text for t in v] for k, v in self.templates.items()}, f, indent=2, ensure_ascii=False)
+
+    def render(self, cart):
+        candidates = self.templates.get(template_key(cart))
+        with self._lock:
+            if not candidates:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Same customer always gets the same variant
+        template = candidates[zlib.crc32(cart["phone"].encode()) % len(candidates)]
+        return template.render(cart_slots(cart))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "templates": sum(len(v) for v in self.templates.values()),
+            "keys": len(self.templates),
+            "hits": self.hits,
+            "llm_fallbacks": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "llm_calls_saved": self.hits,
+        }
+
+
+# ----------------------------
+# Offline Library Builder
+# ----------------------------
+BUILD_PROMPT = """
+You write short, polite 20-second phone scripts that recover abandoned shopping carts.
+
+Write {variants} different scripts for every key listed below. A key is
+"language|cart band|discount": language is an ISO code (write the script in
+that language), the band is the cart size (low < ₹1000, mid < ₹5000, high
+above), and "discount" means the script must mention the discount code
+while "plain" means it must not.
+
+Use these placeholders exactly, with curly braces, and no others:
+{{first_name}} {{customer_name}} {{items}} {{cart_value}} {{discount_code}}
+
+Keys: {keys}
+
+Reply with only a JSON object mapping each key to a list of scripts.
+"""
+
+
+def build_library(client, languages, variants=3, model="llama-3.1-8b-instant"):
+    """Generate every language × band × discount template in one LLM request."""
+    keys = [
+        f"{language}|{band}|{discount}"
+        for language in languages
+        for band, _ in CART_BANDS
+        for discount in ("discount", "plain")
+    ]
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": BUILD_PROMPT.format(variants=variants, keys=", ".join(keys))}],
+        response_format={"type": "json_object"},
+    )
+    generated = json.loads(response.choices[0].message.content)
+
+    templates = {}
+    for key in keys:
+        valid = []
+        for text in generated.get(key, []):
+            try:
+                CompiledTemplate(text)
+            except (ValueError, KeyError):
+                continue
+            if key.endswith("|discount") and "{discount_code}" not in text:
+                continue
+            valid.append(text)
+        templates[key] = valid
+    return TemplateLibrary(templates)
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from groq import Groq
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Build the call-script template library with one LLM batch")
+    parser.add_argument("--languages", nargs="+", default=["en"])
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--out", default=os.getenv("SCRIPT_TEMPLATES", "script_templates.json"))
+    args = parser.parse_args()
+
+    library = build_library(Groq(api_key=os.getenv("GROQ_API_KEY")), args.languages, args.variants)
+    library.save(args.out)
+    print(f"✓ Saved {library.stats()['templates']} templates for {library.stats()['keys']} keys to {args.out}")
@@ -0,0 +1,99 @@
+from call_log_parquet import PARTITION_FIELD, _require_pyarrow
+
+
+# ----------------------------
+# Call Log Analytics
+# ----------------------------
+# Rollups over the Parquet call-log store. Each query reads only the columns
+# it needs, and date ranges prune whole call_date partitions before any file
+# is opened.
+
+def open_dataset(root):
+    pa = _require_pyarrow()
+    partitioning = pa.dataset.partitioning(pa.schema([(PARTITION_FIELD, pa.string())]), flavor="hive")
+    return pa.dataset.dataset(root, format="parquet", partitioning=partitioning)
+
+
+def _filter(since=None, until=None, where=None):
+    pa = _require_pyarrow()
+    field = pa.dataset.field
+    expr = None
+    conditions = []
+    if since:
+        conditions.append(field(PARTITION_FIELD) >= since)
+    if until:
+        conditions.append(field(PARTITION_FIELD) <= until)
+    for column, value in (where or {}).items():
+        conditions.append(field(column) == value)
+    for condition in conditions:
+        expr = condition if expr is None else expr & condition
+    return expr
+
+
+def conversion_rate_by(root, column, since=None, until=None, where=None):
+    """Calls, conversions and conversion rate grouped by `column` (e.g. time_of_day)."""
+    table = open_dataset(root).to_table(
+        columns=[column, "purchase_completed"], filter=_filter(since, until, where)
+    )
+    grouped = table.group_by(column).aggregate([
+        ([], "count_all"),
+        ("purchase_completed", "sum"),
+    ])
+    rows = []
+    for row in grouped.to_pylist():
+        calls = row["count_all"]
+        conversions = row["purchase_completed_sum"] or 0
+        rows.append({
+            column: row[column],
+            "calls": calls,
+            "conversions": conversions,
+            "conversion_rate": conversions / calls if calls else 0.0,
+        })
+    rows.sort(key=lambda r: -r["calls"])
+    return rows
+
+
+def objection_breakdown(root, since=None, until=None, where=None):
+    """How often each primary_objection comes up, with its conversion rate."""
+    return conversion_rate_by(root, "primary_objection", since, until, where)
+
+
+def daily_summary(root, since=None, until=None):
+    """Per call_date: calls placed, answered, converted and average duration."""
+    table = open_dataset(root).to_table(
+        columns=[PARTITION_FIELD, "call_answered", "purchase_completed", "call_duration_seconds"],
+        filter=_filter(since, until),
+    )
+    grouped = table.group_by(PARTITION_FIELD).aggregate([
+        ([], "count_all"),
+        ("call_answered", "sum"),
+        ("purchase_completed", "sum"),
+        ("call_duration_seconds", "mean"),
+    ])
+    rows = [
+        {
+            PARTITION_FIELD: row[PARTITION_FIELD],
+            "calls": row["count_all"],
+            "answered": row["call_answered_sum"] or 0,
+            "conversions": row["purchase_completed_sum"] or 0,
+            "avg_duration_seconds": row["call_duration_seconds_mean"],
+        }
+        for row in grouped.to_pylist()
+    ]
+    rows.sort(key=lambda r: r[PARTITION_FIELD])
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rollups over the Parquet call log")
+    parser.add_argument("root", help="Parquet store written by ParquetCallLogSink")
+    parser.add_argument("--by", default="time_of_day", help="column to group conversion rate by")
+    parser.add_argument("--since", help="first call_date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last call_date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    print(f"📊 Conversion rate by {args.by}")
+    for row in conversion_rate_by(args.root, args.by, args.since, args.until):
+        print(f"   {str(row[args.by]):<30} {row['calls']:>10,} calls  {row['conversion_rate']:6.1%}")
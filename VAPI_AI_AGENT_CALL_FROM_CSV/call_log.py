@@ -0,0 +1,195 @@
+import atexit
+import csv
+import os
+import threading
+from dataclasses import field, make_dataclass
+from operator import attrgetter
+
+
+# ----------------------------
+# Log Schemas
+# ----------------------------
+CALL_LOG_FIELDS = (
+    "timestamp", "name", "number", "items", "total", "reason", "language",
+    "status", "call_id", "call_duration", "call_ended_reason",
+)
+
+DETAILED_LOG_FIELDS = (
+    # Basic Info
+    "timestamp", "call_date", "call_time", "customer_name", "customer_phone",
+    # Cart Info
+    "cart_items", "cart_total", "cart_quantity", "cart_abandoned_date", "days_since_abandonment",
+    # Call Status
+    "call_id", "call_status", "call_initiated", "call_answered", "call_duration_seconds", "call_ended_reason",
+    # Customer Response
+    "customer_sentiment", "customer_interest_level", "customer_engagement_score",
+    # Objections & Reasons
+    "primary_objection", "secondary_objection", "objection_details", "price_concern",
+    "quality_concern", "timing_concern", "technical_issue", "competitor_mention",
+    "changed_mind", "not_interested", "just_browsing",
+    # Conversion Info
+    "conversion_result", "purchase_completed", "purchase_amount", "discount_offered",
+    "discount_accepted", "discount_amount",
+    # AI Performance
+    "ai_technique_used", "objection_handled_successfully", "rapport_established",
+    "follow_up_scheduled", "follow_up_date",
+    # Customer Behavior
+    "callback_requested", "voicemail_left", "hung_up_early", "call_back_attempts", "previous_contact_count",
+    # Additional Data
+    "customer_language", "customer_location", "customer_timezone", "time_of_day", "day_of_week",
+    # Notes & Learning
+    "call_notes", "ai_learnings", "improvement_suggestions", "script_effectiveness_rating",
+)
+
+
+# ----------------------------
+# Detailed Call Record
+# ----------------------------
+# What a detailed-log row holds until the call's outcome arrives (by webhook,
+# see call_outcomes.py). Fields not listed here start empty.
+PENDING_CALL = {
+    "cart_quantity": "1", "cart_abandoned_date": "Unknown", "days_since_abandonment": "Unknown",
+    "call_id": "unknown", "call_status": "initiated", "call_initiated": "Yes", "call_answered": "Pending",
+    "call_duration_seconds": "0", "call_ended_reason": "in_progress",
+    "customer_sentiment": "Pending", "customer_interest_level": "Pending", "customer_engagement_score": "Pending",
+    "primary_objection": "Pending", "secondary_objection": "None", "objection_details": "Pending",
+    "price_concern": "No", "quality_concern": "No", "timing_concern": "No", "technical_issue": "No",
+    "competitor_mention": "No", "changed_mind": "No", "not_interested": "No", "just_browsing": "No",
+    "conversion_result": "Pending", "purchase_completed": "No", "purchase_amount": "0",
+    "discount_offered": "No", "discount_accepted": "No", "discount_amount": "0",
+    "ai_technique_used": "Barnum Effect, Reciprocity", "objection_handled_successfully": "Pending",
+    "rapport_established": "Pending", "follow_up_scheduled": "No", "follow_up_date": "None",
+    "callback_requested": "No", "voicemail_left": "No", "hung_up_early": "No",
+    "call_back_attempts": "1", "previous_contact_count": "0", "customer_location": "Unknown",
+    "ai_learnings": "To be updated after call completion", "improvement_suggestions": "To be analyzed",
+    "script_effectiveness_rating": "Pending",
+}
+
+# How a call that could not be placed differs from a pending one
+FAILED_CALL = {
+    "cart_quantity": "Unknown", "call_id": "N/A", "call_status": "failed", "call_answered": "No",
+    "customer_sentiment": "Unknown", "customer_interest_level": "Unknown", "customer_engagement_score": "0",
+    "primary_objection": "Technical Error", "technical_issue": "Yes", "conversion_result": "Failed",
+    "ai_technique_used": "None - Call Failed", "objection_handled_successfully": "No",
+    "rapport_established": "No", "ai_learnings": "System error - needs investigation",
+    "improvement_suggestions": "Fix technical issues", "script_effectiveness_rating": "0",
+}
+
+
+_detailed_row = attrgetter(*DETAILED_LOG_FIELDS)
+
+
+def _row(self):
+    """Every column in schema order, as a tuple."""
+    return _detailed_row(self)
+
+
+def _mark_failed(self, error):
+    """Turn this record into one for a call that raised `error` before it was placed."""
+    for name, value in FAILED_CALL.items():
+        setattr(self, name, value)
+    self.call_ended_reason = f"Error: {error}"
+    self.objection_details = str(error)
+    self.call_notes = f"Call failed: {error}"
+    return self
+
+
+# One slotted object per call instead of a dict per row: no per-row hash
+# table, defaults are shared class attributes of the generated __init__, and
+# row() reads every column in schema order in one C call.
+CallRecord = make_dataclass(
+    "CallRecord",
+    [(name, object, field(default=PENDING_CALL.get(name, ""))) for name in DETAILED_LOG_FIELDS],
+    slots=True,
+    namespace={
+        "fields": DETAILED_LOG_FIELDS,
+        "row": _row,
+        "mark_failed": _mark_failed,
+    },
+)
+CallRecord.__doc__ = "A detailed call-log row (one attribute per DETAILED_LOG_FIELDS column)."
+
+
+# ----------------------------
+# Buffered CSV Log Sink
+# ----------------------------
+class CallLogSink:
+    """
+    Append-only CSV log with a fixed schema.
+
+    Rows are quoted by csv.writer and buffered in memory. The buffer is written
+    and fsynced once it holds `flush_rows` rows or `flush_interval` seconds
+    have passed, so a crash loses at most one flush window. The file stays
+    open for the whole run and every method is thread-safe.
+    """
+
+    def __init__(self, path, fields, flush_rows=None, flush_interval=None):
+        self.path = path
+        self.fields = tuple(fields)
+        self.flush_rows = flush_rows or int(os.getenv("LOG_FLUSH_ROWS", "100"))
+        self.flush_interval = flush_interval or float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+        self.rows_written = 0
+
+        self._field_set = frozenset(self.fields)
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if is_new:
+            self._writer.writerow(self.fields)
+            self._file.flush()
+
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def write(self, record):
+        # A dict of column -> value, or a CallRecord for the detailed log
+        if isinstance(record, CallRecord):
+            if self.fields != CallRecord.fields:
+                raise ValueError(f"{self.path} does not use the detailed log schema")
+            row = record.row()
+        else:
+            unknown = record.keys() - self._field_set
+            if unknown:
+                raise ValueError(f"Fields not in {self.path} schema: {', '.join(sorted(unknown))}")
+            row = [record.get(field, "") for field in self.fields]
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_rows:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_locked(self):
+        if not self._buffer or self._file.closed:
+            return
+        self._writer.writerows(self._buffer)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.rows_written += len(self._buffer)
+        self._buffer.clear()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
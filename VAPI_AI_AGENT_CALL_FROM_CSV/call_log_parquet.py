@@ -0,0 +1,217 @@
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from call_log import DETAILED_LOG_FIELDS, CallRecord
+
+
+# ----------------------------
+# Typed Columns
+# ----------------------------
+# The CSV log stores everything as text ("Yes"/"No", "0", "$450"). In Parquet
+# these become real types; values such as "Pending" or "Unknown" become nulls.
+
+BOOL_FIELDS = frozenset({
+    "call_initiated", "call_answered", "price_concern", "quality_concern",
+    "timing_concern", "technical_issue", "competitor_mention", "changed_mind",
+    "not_interested", "just_browsing", "purchase_completed", "discount_offered",
+    "discount_accepted", "objection_handled_successfully", "rapport_established",
+    "follow_up_scheduled", "callback_requested", "voicemail_left", "hung_up_early",
+})
+
+INT_FIELDS = frozenset({
+    "cart_quantity", "days_since_abandonment", "call_duration_seconds",
+    "customer_engagement_score", "call_back_attempts", "previous_contact_count",
+    "script_effectiveness_rating",
+})
+
+FLOAT_FIELDS = frozenset({"cart_total", "purchase_amount", "discount_amount"})
+
+# Hive-style partition column: <root>/call_date=YYYY-MM-DD/part-*.parquet
+PARTITION_FIELD = "call_date"
+
+
+def to_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("yes", "true", "1"):
+        return True
+    if text in ("no", "false", "0"):
+        return False
+    return None
+
+
+def to_int(value):
+    try:
+        return int(float(str(value).strip()))
+    except ValueError:
+        return None
+
+
+def to_float(value):
+    # "$450", "₹4,098" and "12.5" all become floats
+    text = "".join(c for c in str(value) if c.isdigit() or c in ".-")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def to_timestamp(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The Parquet call log needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def parquet_schema(fields=DETAILED_LOG_FIELDS):
+    pa = _require_pyarrow()
+    columns = []
+    for field in fields:
+        if field == "timestamp":
+            columns.append((field, pa.timestamp("us")))
+        elif field in BOOL_FIELDS:
+            columns.append((field, pa.bool_()))
+        elif field in INT_FIELDS:
+            columns.append((field, pa.int32()))
+        elif field in FLOAT_FIELDS:
+            columns.append((field, pa.float64()))
+        else:
+            columns.append((field, pa.string()))
+    return pa.schema(columns)
+
+
+def _converter(field):
+    if field == "timestamp":
+        return to_timestamp
+    if field in BOOL_FIELDS:
+        return to_bool
+    if field in INT_FIELDS:
+        return to_int
+    if field in FLOAT_FIELDS:
+        return to_float
+    return lambda v: None if v is None else str(v)
+
+
+# ----------------------------
+# Parquet Log Sink
+# ----------------------------
+class ParquetCallLogSink:
+    """
+    Columnar counterpart of CallLogSink for the detailed log.
+
+    Rows are buffered and every `flush_rows` rows are written as one Parquet
+    file per call_date partition under `root`. Same write/flush/close
+    interface as CallLogSink, and equally safe to share between dial workers.
+    """
+
+    def __init__(self, root, fields=DETAILED_LOG_FIELDS, flush_rows=None):
+        pa = _require_pyarrow()
+        self.root = root
+        self.fields = tuple(fields)
+        self.schema = parquet_schema(self.fields)
+        self.partitioning = pa.dataset.partitioning(
+            pa.schema([(PARTITION_FIELD, pa.string())]), flavor="hive"
+        )
+        self.flush_rows = flush_rows or int(os.getenv("PARQUET_FLUSH_ROWS", "10000"))
+        self.rows_written = 0
+
+        self._field_set = frozenset(self.fields)
+        self._converters = [_converter(f) for f in self.fields]
+        self._buffer = []
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def write(self, record):
+        # Buffered as a tuple in schema order, whether given a dict or a CallRecord
+        if isinstance(record, CallRecord):
+            if self.fields != CallRecord.fields:
+                raise ValueError("This Parquet store does not use the detailed log schema")
+            row = record.row()
+        else:
+            unknown = record.keys() - self._field_set
+            if unknown:
+                raise ValueError(f"Fields not in Parquet schema: {', '.join(sorted(unknown))}")
+            row = tuple(record.get(field) for field in self.fields)
+
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_rows:
+                self._flush_locked()
+
+    def write_columns(self, columns):
+        """Write a batch given as {field: list of raw values} in one go."""
+        pa = _require_pyarrow()
+        arrays = [
+            pa.array([convert(v) for v in columns[field]], type=self.schema.field(field).type)
+            for field, convert in zip(self.fields, self._converters)
+        ]
+        self._write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        self.write_columns(dict(zip(self.fields, zip(*rows))))
+
+    def _write_table(self, table):
+        pa = _require_pyarrow()
+        pa.dataset.write_dataset(
+            table,
+            self.root,
+            format="parquet",
+            partitioning=self.partitioning,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        self.rows_written += table.num_rows
+
+
+def convert_csv(csv_path, root, chunk_rows=100_000):
+    """One-off import of an existing call_logs_detailed.csv into a Parquet store."""
+    import csv
+
+    sink = ParquetCallLogSink(root, flush_rows=chunk_rows)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            sink.write({k: v for k, v in record.items() if k in sink._field_set})
+    sink.close()
+    return sink.rows_written
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python call_log_parquet.py call_logs_detailed.csv call_logs_parquet/")
+        sys.exit(1)
+
+    count = convert_csv(sys.argv[1], sys.argv[2])
+    print(f"✓ Converted {count} calls into {sys.argv[2]}")
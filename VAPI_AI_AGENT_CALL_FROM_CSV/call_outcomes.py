@@ -0,0 +1,245 @@
+import csv
+import json
+import os
+import threading
+from datetime import datetime
+
+from call_log import DETAILED_LOG_FIELDS
+from cart_reader import read_records
+
+FINAL_STATUSES = {"ended", "completed", "busy", "no-answer", "failed", "canceled"}
+
+
+# ----------------------------
+# Call Outcome Store
+# ----------------------------
+class CallOutcomeStore:
+    """
+    Applies end-of-call outcomes to an append-only call log without rewriting it.
+
+    Updates are appended to an overlay file next to the log (one JSON line
+    per call_id update) and merged into an in-memory dict, so applying a
+    batch costs O(batch) whatever the size of the log. A second index maps
+    call_id to the byte offset of its row, so get() seeks straight to it.
+    compact() folds the overlay back into the CSV offline.
+    """
+
+    def __init__(self, log_path, fields=DETAILED_LOG_FIELDS, overlay_path=None):
+        self.log_path = log_path
+        self.fields = tuple(fields)
+        self.overlay_path = overlay_path or os.path.splitext(log_path)[0] + "_outcomes.jsonl"
+        self.offsets = {}
+        self.outcomes = {}
+        self.updates_applied = 0
+        self.unmatched = 0
+
+        self._field_set = frozenset(self.fields)
+        self._call_id_col = self.fields.index("call_id")
+        self._scanned_to = 0
+        self._lock = threading.Lock()
+        self._load_overlay()
+
+    def _load_overlay(self):
+        if not os.path.exists(self.overlay_path):
+            return
+        with open(self.overlay_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    update = json.loads(line)
+                    self.outcomes.setdefault(update["call_id"], {}).update(update["fields"])
+
+    def _scan_log(self):
+        # The log is append-only, so only rows written since the last scan are new
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._scanned_to)
+            records = read_records(f)
+            if self._scanned_to == 0:
+                next(records, None)  # header
+            last = None
+            for offset, row in records:
+                if last and len(last[1]) > self._call_id_col:
+                    self.offsets[last[1][self._call_id_col]] = last[0]
+                last = (offset, row)
+            end = f.tell()
+            if last is None:
+                self._scanned_to = end
+                return
+            # A row without its newline is still being written; rescan it next time
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                self._scanned_to = last[0]
+                return
+            if len(last[1]) > self._call_id_col:
+                self.offsets[last[1][self._call_id_col]] = last[0]
+            self._scanned_to = end
+
+    def apply(self, updates):
+        """Record a batch of (call_id, fields) updates with one append and one fsync."""
+        updates = list(updates)
+        for _, fields in updates:
+            unknown = fields.keys() - self._field_set
+            if unknown:
+                raise ValueError(f"Unknown call log fields: {', '.join(sorted(unknown))}")
+
+        lines = []
+        with self._lock:
+            for call_id, fields in updates:
+                if call_id not in self.offsets:
+                    self._scan_log()
+                    if call_id not in self.offsets:
+                        self.unmatched += 1
+                outcome = self.outcomes.setdefault(call_id, {})
+                if outcome.get("call_status") in FINAL_STATUSES and fields.get("call_status") not in FINAL_STATUSES:
+                    # Callbacks can arrive out of order; a late status-update must not reopen the call
+                    fields = {k: v for k, v in fields.items() if k != "call_status"}
+                outcome.update(fields)
+                lines.append(json.dumps({"call_id": call_id, "fields": fields}, ensure_ascii=False))
+            if not lines:
+                return 0
+            with open(self.overlay_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.updates_applied += len(lines)
+        return len(lines)
+
+    def get(self, call_id):
+        """The logged row for call_id with its outcome applied, or None if it was never logged."""
+        with self._lock:
+            if call_id not in self.offsets:
+                self._scan_log()
+            offset = self.offsets.get(call_id)
+            outcome = dict(self.outcomes.get(call_id, {}))
+        if offset is None:
+            return None
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            _, row = next(read_records(f))
+        record = dict(zip(self.fields, row))
+        record.update(outcome)
+        return record
+
+    def compact(self):
+        """Rewrite the log with every outcome merged in, then start a fresh overlay."""
+        with self._lock:
+            tmp_path = self.log_path + ".tmp"
+            with open(self.log_path, "rb") as src, open(tmp_path, "w", newline="", encoding="utf-8") as dst:
+                writer = csv.writer(dst)
+                records = read_records(src)
+                _, header = next(records, (None, list(self.fields)))
+                writer.writerow(header)
+                for _, row in records:
+                    outcome = self.outcomes.get(row[self._call_id_col]) if len(row) > self._call_id_col else None
+                    if outcome:
+                        record = dict(zip(header, row))
+                        record.update(outcome)
+                        row = [record.get(name, "") for name in header]
+                    writer.writerow(row)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp_path, self.log_path)
+            if os.path.exists(self.overlay_path):
+                os.remove(self.overlay_path)
+            self.outcomes.clear()
+            self.offsets.clear()
+            self._scanned_to = 0
+
+    def stats(self):
+        return {
+            "updates_applied": self.updates_applied,
+            "calls_with_outcome": len(self.outcomes),
+            "unmatched": self.unmatched,
+        }
+
+
+# ----------------------------
+# Provider Callback Parsers
+# ----------------------------
+# Each returns (call_id, fields) in call-log column names, or None for
+# callbacks that carry no outcome.
+
+NOT_ANSWERED = {"customer-did-not-answer", "customer-busy", "voicemail", "no-answer", "busy", "failed", "canceled"}
+
+
+def yes_no(value):
+    return "Yes" if value else "No"
+
+
+def as_cell(value):
+    if isinstance(value, bool):
+        return yes_no(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def parse_vapi(payload):
+    message = payload.get("message", payload)
+    call_id = (message.get("call") or {}).get("id")
+    if not call_id:
+        return None
+
+    if message.get("type") == "status-update":
+        fields = {"call_status": message.get("status", "")}
+        if message.get("status") == "in-progress":
+            fields["call_answered"] = "Yes"
+        return call_id, fields
+
+    if message.get("type") != "end-of-call-report":
+        return None
+
+    reason = message.get("endedReason", "")
+    duration = message.get("durationSeconds")
+    if duration is None and message.get("startedAt") and message.get("endedAt"):
+        started = datetime.fromisoformat(message["startedAt"].replace("Z", "+00:00"))
+        ended = datetime.fromisoformat(message["endedAt"].replace("Z", "+00:00"))
+        duration = (ended - started).total_seconds()
+    duration = int(round(duration or 0))
+
+    fields = {
+        "call_status": "ended",
+        "call_ended_reason": reason,
+        "call_duration_seconds": str(duration),
+        "call_answered": yes_no(reason not in NOT_ANSWERED),
+        "voicemail_left": yes_no(reason == "voicemail"),
+        "hung_up_early": yes_no(reason == "customer-ended-call" and duration < 15),
+    }
+    analysis = message.get("analysis") or {}
+    if analysis.get("summary"):
+        fields["call_notes"] = analysis["summary"]
+    if analysis.get("successEvaluation") is not None:
+        fields["script_effectiveness_rating"] = str(analysis["successEvaluation"])
+    # The assistant's structured-data plan uses call-log column names directly
+    for name, value in (analysis.get("structuredData") or {}).items():
+        if name in DETAILED_LOG_FIELDS:
+            fields[name] = as_cell(value)
+    return call_id, fields
+
+
+def parse_twilio(form):
+    call_id = form.get("CallSid")
+    status = form.get("CallStatus", "")
+    if not call_id or not status:
+        return None
+    answered_by = form.get("AnsweredBy", "")
+    fields = {"call_status": status, "call_ended_reason": status}
+    if status in ("completed", "busy", "no-answer", "failed", "canceled"):
+        fields["call_answered"] = yes_no(status == "completed" and not answered_by.startswith("machine"))
+        fields["voicemail_left"] = yes_no(answered_by.startswith("machine"))
+        fields["call_duration_seconds"] = form.get("CallDuration", "0")
+    return call_id, fields
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fold webhook outcomes back into the call log")
+    parser.add_argument("log", nargs="?", default="call_logs_detailed.csv")
+    args = parser.parse_args()
+
+    store = CallOutcomeStore(args.log)
+    pending = len(store.outcomes)
+    store.compact()
+    print(f"✓ Applied outcomes for {pending} calls to {args.log}")
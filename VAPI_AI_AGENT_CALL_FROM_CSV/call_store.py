@@ -0,0 +1,407 @@
+import atexit
+import csv
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from call_log import CALL_LOG_FIELDS, DETAILED_LOG_FIELDS, CallRecord
+from call_log_parquet import to_float
+
+
+# ----------------------------
+# Relational Schema
+# ----------------------------
+# The tables of Guide_2_Database_Schema.md:
+#
+#   merchant ─< store ─< customer ─< cart ─< cart_item
+#                            │         │
+#                            └─< interaction >─┘ ─── conversation (transcript)
+#                                    ├── incentive
+#                                    └── order_log
+#
+# An interaction is one call: every detailed-log column except those that
+# describe the customer (name, language, location, time zone) or the cart
+# (items, total, abandoned date), which live once in customer / cart. The
+# phone is kept on the interaction too, so "every call to this number" is one
+# index range. Transcripts sit in their own table so scans over interactions
+# never read them. incentive and order_log rows are derived from the
+# discount_* / purchase_* columns whenever a call says one happened.
+#
+# The call_log view joins it all back into the 55 detailed-log columns.
+
+CUSTOMER_COLUMNS = {
+    "customer_name": "name", "customer_language": "language",
+    "customer_location": "location", "customer_timezone": "timezone",
+}
+CART_COLUMNS = {"cart_items": "items", "cart_total": "total_text", "cart_abandoned_date": "abandoned_date"}
+INTERACTION_FIELDS = tuple(f for f in DETAILED_LOG_FIELDS if f not in CUSTOMER_COLUMNS and f not in CART_COLUMNS)
+
+# call_logs.csv columns → detailed-log columns
+SIMPLE_LOG_COLUMNS = {
+    "timestamp": "timestamp", "name": "customer_name", "number": "customer_phone",
+    "items": "cart_items", "total": "cart_total", "language": "customer_language",
+    "status": "call_status", "call_id": "call_id", "call_duration": "call_duration_seconds",
+    "call_ended_reason": "call_ended_reason",
+}
+
+SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS merchant (
+        merchant_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS store (
+        store_id INTEGER PRIMARY KEY,
+        merchant_id INTEGER NOT NULL REFERENCES merchant,
+        name TEXT NOT NULL,
+        UNIQUE (merchant_id, name)
+    );
+    CREATE TABLE IF NOT EXISTS customer (
+        customer_id INTEGER PRIMARY KEY,
+        store_id INTEGER NOT NULL REFERENCES store,
+        phone TEXT NOT NULL,
+        name TEXT, language TEXT, location TEXT, timezone TEXT,
+        lifetime_value REAL NOT NULL DEFAULT 0,
+        created_at TEXT,
+        UNIQUE (store_id, phone)
+    );
+    CREATE TABLE IF NOT EXISTS cart (
+        cart_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL REFERENCES customer,
+        items TEXT, total_text TEXT, total REAL, reason TEXT, abandoned_date TEXT,
+        created_at TEXT,
+        UNIQUE (customer_id, items, total_text)
+    );
+    CREATE TABLE IF NOT EXISTS cart_item (
+        cart_id INTEGER NOT NULL REFERENCES cart,
+        position INTEGER NOT NULL,
+        name TEXT, quantity INTEGER,
+        PRIMARY KEY (cart_id, position)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS interaction (
+        interaction_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL REFERENCES customer,
+        cart_id INTEGER REFERENCES cart,
+        {", ".join(f"{f} TEXT" for f in INTERACTION_FIELDS)},
+        UNIQUE (customer_phone, timestamp)
+    );
+    CREATE INDEX IF NOT EXISTS interaction_call_id ON interaction (call_id);
+    CREATE INDEX IF NOT EXISTS interaction_call_date ON interaction (call_date);
+    CREATE INDEX IF NOT EXISTS interaction_customer ON interaction (customer_id);
+    CREATE TABLE IF NOT EXISTS conversation (
+        interaction_id INTEGER PRIMARY KEY REFERENCES interaction,
+        transcript TEXT, summary TEXT, updated_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS incentive (
+        interaction_id INTEGER PRIMARY KEY REFERENCES interaction,
+        kind TEXT NOT NULL, amount REAL, accepted INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS order_log (
+        order_id INTEGER PRIMARY KEY,
+        interaction_id INTEGER NOT NULL UNIQUE REFERENCES interaction,
+        customer_id INTEGER NOT NULL REFERENCES customer,
+        cart_id INTEGER REFERENCES cart,
+        amount REAL, recovered INTEGER NOT NULL DEFAULT 1, created_at TEXT
+    );
+    CREATE VIEW IF NOT EXISTS call_log AS SELECT {", ".join(
+        f"u.{CUSTOMER_COLUMNS[f]} AS {f}" if f in CUSTOMER_COLUMNS
+        else f"k.{CART_COLUMNS[f]} AS {f}" if f in CART_COLUMNS
+        else f"i.{f}" for f in DETAILED_LOG_FIELDS
+    )}
+    FROM interaction i JOIN customer u USING (customer_id) LEFT JOIN cart k USING (cart_id);
+"""
+
+CUSTOMER_ID = "(SELECT customer_id FROM customer WHERE store_id = ? AND phone = ?)"
+CART_ID = f"(SELECT cart_id FROM cart WHERE customer_id = {CUSTOMER_ID} AND items = ? AND total_text = ?)"
+
+UPSERT_CUSTOMER = """
+    INSERT INTO customer (store_id, phone, name, language, location, timezone, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (store_id, phone) DO UPDATE SET
+        name = excluded.name, language = excluded.language,
+        location = excluded.location, timezone = excluded.timezone
+"""
+INSERT_CART = f"""
+    INSERT OR IGNORE INTO cart (customer_id, items, total_text, total, reason, abandoned_date, created_at)
+    VALUES ({CUSTOMER_ID}, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_CART_ITEM = f"INSERT OR IGNORE INTO cart_item VALUES ({CART_ID}, ?, ?, ?)"
+INSERT_INTERACTION = f"""
+    INSERT OR IGNORE INTO interaction (customer_id, cart_id, {", ".join(INTERACTION_FIELDS)})
+    VALUES ({CUSTOMER_ID}, {CART_ID}, {", ".join("?" * len(INTERACTION_FIELDS))})
+"""
+
+# Incentives and recovered orders for the interactions matching {where}
+DERIVE = (
+    """INSERT OR IGNORE INTO incentive
+       SELECT interaction_id, 'discount', discount_amount, discount_accepted = 'Yes'
+       FROM interaction WHERE discount_offered = 'Yes' AND {where}""",
+    """INSERT OR IGNORE INTO order_log (interaction_id, customer_id, cart_id, amount, created_at)
+       SELECT interaction_id, customer_id, cart_id, purchase_amount, timestamp
+       FROM interaction WHERE purchase_completed = 'Yes' AND {where}""",
+    """UPDATE customer SET lifetime_value = (
+           SELECT COALESCE(SUM(amount), 0) FROM order_log o WHERE o.customer_id = customer.customer_id
+       ) WHERE customer_id IN (SELECT customer_id FROM interaction WHERE purchase_completed = 'Yes' AND {where})""",
+)
+
+ITEM_QUANTITY = re.compile(r"^(.*?)\s*x\s*(\d+)$", re.IGNORECASE)
+
+
+def cart_items(items):
+    """'Shoes x2, cat food' → [('Shoes', 2), ('cat food', 1)]"""
+    parsed = []
+    for part in str(items or "").split(","):
+        part = part.strip()
+        if part:
+            match = ITEM_QUANTITY.match(part)
+            parsed.append((match.group(1), int(match.group(2))) if match else (part, 1))
+    return parsed
+
+
+# ----------------------------
+# Call Store
+# ----------------------------
+class CallStore:
+    """
+    SQLite (WAL) store for calls, using the Guide_2 schema above.
+
+    Same write/flush/close interface as CallLogSink, and as safe to share
+    between dial workers: rows are buffered and every `flush_rows` rows or
+    `flush_interval` seconds written in one transaction, one executemany per
+    table. Lookups by phone, call_id or call date are index lookups:
+    interactions_for(phone) takes a fraction of a millisecond however many
+    calls are stored.
+    """
+
+    def __init__(self, path=None, merchant=None, store=None, flush_rows=None, flush_interval=None):
+        self.path = path or os.getenv("CALL_STORE", "call_store.db")
+        self.flush_rows = flush_rows or int(os.getenv("CALL_STORE_FLUSH_ROWS", "500"))
+        self.flush_interval = flush_interval or float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+        self.rows_written = 0
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+        merchant = merchant or os.getenv("MERCHANT_NAME", "default")
+        store = store or os.getenv("STORE_NAME", "default")
+        self._db.execute("INSERT OR IGNORE INTO merchant (name) VALUES (?)", (merchant,))
+        self._db.execute(
+            "INSERT OR IGNORE INTO store (merchant_id, name) SELECT merchant_id, ? FROM merchant WHERE name = ?",
+            (store, merchant)
+        )
+        self.store_id = self._db.execute(
+            "SELECT store_id FROM store JOIN merchant USING (merchant_id) WHERE merchant.name = ? AND store.name = ?",
+            (merchant, store)
+        ).fetchone()[0]
+        self._db.commit()
+
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # ---- writes ----
+
+    def write(self, record, reason=""):
+        """Buffer one call: a CallRecord, or a dict in the detailed or the call_logs.csv schema."""
+        if isinstance(record, CallRecord):
+            row = dict(zip(DETAILED_LOG_FIELDS, record.row()))
+        elif "customer_phone" in record:
+            row = dict(record)
+        else:
+            reason = reason or record.get("reason", "")
+            row = {SIMPLE_LOG_COLUMNS[k]: v for k, v in record.items() if k in SIMPLE_LOG_COLUMNS}
+            # call_logs.csv has no call_date / call_time columns
+            timestamp = str(row.get("timestamp", ""))
+            row["call_date"], row["call_time"] = timestamp[:10], timestamp[11:19]
+        row["reason"] = reason
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_rows:
+                self._flush_locked()
+
+    def apply(self, updates):
+        """Apply a batch of (call_id, fields) outcome updates (see call_outcomes.parse_vapi)."""
+        columns = {}
+        for call_id, fields in updates:
+            for name, value in fields.items():
+                if name in INTERACTION_FIELDS and name != "call_id":
+                    columns.setdefault(name, []).append((str(value), call_id))
+        call_ids = [(call_id,) for call_id, _ in updates]
+        with self._lock:
+            self._flush_locked()
+            with self._db:
+                for name, params in columns.items():
+                    self._db.executemany(f"UPDATE interaction SET {name} = ? WHERE call_id = ?", params)
+                self._db.execute("CREATE TEMP TABLE IF NOT EXISTS updated (call_id TEXT PRIMARY KEY)")
+                self._db.execute("DELETE FROM updated")
+                self._db.executemany("INSERT OR IGNORE INTO updated VALUES (?)", call_ids)
+                self._derive("call_id IN (SELECT call_id FROM temp.updated)")
+
+    def save_transcripts(self, transcripts):
+        """Store (call_id, transcript, summary) triples, replacing earlier ones for the same call."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._flush_locked()
+            with self._db:
+                self._db.executemany("""
+                    INSERT OR REPLACE INTO conversation
+                    SELECT interaction_id, ?, ?, ? FROM interaction WHERE call_id = ?
+                """, [(transcript, summary, now, call_id) for call_id, transcript, summary in transcripts])
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        store, now = self.store_id, datetime.now().isoformat()
+        customers, carts, items, interactions = [], [], [], []
+        for row in rows:
+            get = row.get
+            phone = str(get("customer_phone", "")).strip()
+            items_text, total_text = get("cart_items", ""), get("cart_total", "")
+            customers.append((store, phone, get("customer_name", ""), get("customer_language", ""),
+                              get("customer_location", ""), get("customer_timezone", ""), now))
+            carts.append((store, phone, items_text, total_text, to_float(total_text),
+                          get("reason", ""), get("cart_abandoned_date", ""), now))
+            items.extend((store, phone, items_text, total_text, position, name, quantity)
+                         for position, (name, quantity) in enumerate(cart_items(items_text)))
+            interactions.append((store, phone, store, phone, items_text, total_text,
+                                 *(str(get(f, "")) for f in INTERACTION_FIELDS)))
+
+        with self._db:
+            last = self._db.execute("SELECT COALESCE(MAX(interaction_id), 0) FROM interaction").fetchone()[0]
+            self._db.executemany(UPSERT_CUSTOMER, customers)
+            self._db.executemany(INSERT_CART, carts)
+            self._db.executemany(INSERT_CART_ITEM, items)
+            self._db.executemany(INSERT_INTERACTION, interactions)
+            self._derive(f"interaction_id > {int(last)}")
+        self.rows_written += len(rows)
+
+    def _derive(self, where):
+        for statement in DERIVE:
+            self._db.execute(statement.format(where=where))
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    # ---- reads (see flushed rows) ----
+
+    def _query(self, sql, params):
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def interactions_for(self, phone):
+        """Every call to `phone`, oldest first, as detailed-log rows."""
+        return self._query("SELECT * FROM call_log WHERE customer_phone = ? ORDER BY timestamp", (phone,))
+
+    def interaction(self, call_id):
+        rows = self._query("SELECT * FROM call_log WHERE call_id = ?", (call_id,))
+        return rows[0] if rows else None
+
+    def calls_on(self, call_date):
+        return self._query("SELECT * FROM call_log WHERE call_date = ? ORDER BY timestamp", (call_date,))
+
+    def transcript(self, call_id):
+        rows = self._query("""
+            SELECT transcript, summary FROM conversation JOIN interaction USING (interaction_id)
+            WHERE call_id = ?
+        """, (call_id,))
+        return rows[0] if rows else None
+
+    def transcripts(self, pending_only=True, page_rows=1000):
+        """Stream (call_id, transcript) pairs a page at a time; by default only calls not analyzed yet."""
+        where = "AND i.customer_sentiment IN ('Pending', '')" if pending_only else ""
+        last = 0
+        while True:
+            rows = self._query(f"""
+                SELECT c.interaction_id, i.call_id, c.transcript
+                FROM conversation c JOIN interaction i USING (interaction_id)
+                WHERE c.interaction_id > ? AND c.transcript != '' {where}
+                ORDER BY c.interaction_id LIMIT ?
+            """, (last, page_rows))
+            for row in rows:
+                yield row["call_id"], row["transcript"]
+            if len(rows) < page_rows:
+                return
+            last = rows[-1]["interaction_id"]
+
+    def customer(self, phone):
+        rows = self._query("SELECT * FROM customer WHERE store_id = ? AND phone = ?", (self.store_id, phone))
+        return rows[0] if rows else None
+
+
+def vapi_transcript(payload):
+    """(call_id, transcript, summary) from a Vapi end-of-call report, else None."""
+    message = payload.get("message", payload)
+    if message.get("type") != "end-of-call-report":
+        return None
+    call_id = (message.get("call") or {}).get("id")
+    transcript = message.get("transcript") or (message.get("artifact") or {}).get("transcript")
+    if not call_id or not transcript:
+        return None
+    summary = message.get("summary") or (message.get("analysis") or {}).get("summary") or ""
+    return call_id, transcript, summary
+
+
+def import_csv(store, log_path):
+    """One-off import of call_logs.csv or call_logs_detailed.csv; importing a file twice adds nothing."""
+    count = 0
+    with open(log_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or not ({"customer_phone", "number"} & set(reader.fieldnames)):
+            raise ValueError(f"{log_path} is not a call log (no customer_phone or number column)")
+        for row in reader:
+            if not (row.get("customer_phone") or row.get("number") or "").strip():
+                continue
+            if "number" in row:
+                store.write({k: v for k, v in row.items() if k in CALL_LOG_FIELDS})
+            else:
+                store.write({k: v for k, v in row.items() if k in DETAILED_LOG_FIELDS})
+            count += 1
+    store.flush()
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import call logs into the call store, or look up a customer")
+    parser.add_argument("logs", nargs="*", default=["call_logs.csv", "call_logs_detailed.csv"])
+    parser.add_argument("--lookup", metavar="PHONE", help="print every call to this number instead")
+    args = parser.parse_args()
+
+    store = CallStore()
+    if args.lookup:
+        for call in store.interactions_for(args.lookup):
+            print(f"📞 {call['timestamp']} | {call['call_id']} | {call['call_status']} | {call['call_ended_reason']}")
+    else:
+        for log_path in args.logs:
+            if os.path.exists(log_path):
+                print(f"✓ Imported {import_csv(store, log_path)} calls from {log_path} into {store.path}")
+    store.close()
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from dialer import TokenBucket
+from metrics import counter, gauge, log, stage
+
+
+# ----------------------------
+# Error Classification
+# ----------------------------
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+TRANSIENT_STATUSES = {408, 425, 500, 502, 503, 504}
+
+PROVIDER_CALL = stage("provider_call")
+PROVIDER_ERRORS = counter("provider_errors_total", "Failed provider attempts by error class", ("kind",))
+PROVIDER_RETRIES = counter("provider_retries_total", "Provider attempts retried")
+SEND_RATE = gauge("send_rate", "Current AIMD send rate (calls/sec)")
+BREAKER_OPEN = gauge("breaker_open", "1 while the circuit breaker holds calls")
+BREAKER_TRIPS = counter("breaker_trips_total", "Times the circuit breaker opened")
+
+
+def classify(error):
+    """rate_limit (429), transient (5xx, timeouts, dropped connections) or permanent (anything else)."""
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        return RATE_LIMIT
+    if status in TRANSIENT_STATUSES or (status is not None and status >= 500):
+        return TRANSIENT
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError)):
+        return TRANSIENT
+    return PERMANENT
+
+
+def retry_after(error):
+    """Seconds the provider asked us to wait (Retry-After / retry-after-ms), or None."""
+    headers = {k.lower(): v for k, v in (getattr(error, "headers", None) or {}).items()}
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+# ----------------------------
+# Circuit Breaker
+# ----------------------------
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive transient failures (5xx, timeouts,
+    dropped connections) and holds every caller for `cooldown` seconds; then
+    one probe request is let through. A success closes it again, a failure
+    reopens it. 429s never trip it: the provider is up, just busy, so a 429
+    counts as an answer and closes it like a success.
+    """
+
+    def __init__(self, threshold=None, cooldown=None):
+        self.threshold = threshold or int(os.getenv("BREAKER_THRESHOLD", "5"))
+        self.cooldown = cooldown or float(os.getenv("BREAKER_COOLDOWN", "30"))
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.trips = 0
+
+    async def wait(self):
+        """Hold while open; True when the caller is the probe."""
+        while self.opened_at is not None:
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining <= 0 and not self.probing:
+                self.probing = True
+                return True
+            await asyncio.sleep(max(remaining, 0.05))
+        return False
+
+    def abandon_probe(self):
+        # The probe never got an answer (cancelled): let the next caller probe
+        self.probing = False
+
+    def success(self):
+        if self.opened_at is not None:
+            log("breaker_closed", "✅ Provider is answering again; resuming the campaign")
+            BREAKER_OPEN.set(0)
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+            if not self.probing:
+                self.trips += 1
+                BREAKER_TRIPS.inc()
+                log("breaker_opened", f"⛔ {self.failures} provider failures in a row; "
+                    f"pausing calls for {self.cooldown:g}s", failures=self.failures, cooldown=self.cooldown)
+            self.opened_at = time.monotonic()
+            self.probing = False
+            BREAKER_OPEN.set(1)
+
+
+# ----------------------------
+# Call Submitter
+# ----------------------------
+class CallSubmitter:
+    """
+    Shared submission layer for provider calls (e.g. client.calls.create).
+
+    Every attempt waits for the circuit breaker and a send token. Rate-limit
+    and transient errors are retried with full-jitter exponential backoff, or
+    after Retry-After when the provider sends it; permanent errors are raised
+    straight away. The send rate adapts AIMD-style: each success adds
+    `increase` calls/sec up to `max_rate`, each 429 halves it (at most once
+    per second, so one burst of 429s counts once). `bucket` may be any object
+    with a `rate`, `async acquire()` and `slow_down(factor, floor)` (the
+    once-per-second decrease, which it owns), e.g. one shared across
+    processes.
+    """
+
+    def __init__(self, rate=None, max_rate=None, max_attempts=None, base_delay=0.5, max_delay=30.0,
+                 increase=0.05, decrease=0.5, breaker=None, bucket=None):
+        rate = float(os.getenv("DIAL_RATE", "5")) if rate is None else rate
+        self.bucket = bucket or (TokenBucket(rate) if rate > 0 else None)
+        self.max_rate = max_rate or float(os.getenv("DIAL_MAX_RATE", str(max(rate, 1.0))))
+        self.min_rate = 0.2
+        self.max_attempts = max_attempts or int(os.getenv("SUBMIT_MAX_ATTEMPTS", "5"))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.increase = increase
+        self.decrease = decrease
+        self.breaker = breaker or CircuitBreaker()
+
+        self.attempts = 0
+        self.retries = 0
+        self.errors = {RATE_LIMIT: 0, TRANSIENT: 0, PERMANENT: 0}
+        self.gave_up = 0
+
+    @property
+    def rate(self):
+        return self.bucket.rate if self.bucket else 0.0
+
+    def _on_success(self):
+        if self.bucket:
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.increase)
+            SEND_RATE.set(self.bucket.rate)
+
+    def _on_rate_limit(self):
+        if self.bucket and self.bucket.slow_down(self.decrease, self.min_rate):
+            SEND_RATE.set(self.bucket.rate)
+
+    def backoff(self, attempt, error):
+        asked = retry_after(error)
+        if asked is not None:
+            return min(asked, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def submit(self, fn, *args, **kwargs):
+        for attempt in range(1, self.max_attempts + 1):
+            probe = await self.breaker.wait()
+            try:
+                if self.bucket:
+                    await self.bucket.acquire()
+                self.attempts += 1
+                with PROVIDER_CALL.time():
+                    result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                if probe:
+                    self.breaker.abandon_probe()
+                raise
+            except Exception as e:
+                kind = classify(e)
+                self.errors[kind] += 1
+                PROVIDER_ERRORS.labels(kind).inc()
+                if kind == PERMANENT:
+                    self.breaker.success()  # the provider answered; the request itself was bad
+                    raise
+                if kind == RATE_LIMIT:
+                    self.breaker.success()  # busy, but reachable
+                    self._on_rate_limit()
+                else:
+                    self.breaker.failure()
+                if attempt == self.max_attempts:
+                    self.gave_up += 1
+                    raise
+                self.retries += 1
+                PROVIDER_RETRIES.inc()
+                await asyncio.sleep(self.backoff(attempt, e))
+            else:
+                self.breaker.success()
+                self._on_success()
+                return result
+
+    def summary(self):
+        return (
+            f"{self.attempts} attempts, {self.retries} retries, "
+            f"{self.errors[RATE_LIMIT]} rate-limited, {self.errors[TRANSIENT]} transient, "
+            f"{self.errors[PERMANENT]} permanent, {self.gave_up} gave up, "
+            f"{self.breaker.trips} breaker trips, send rate now {self.rate:.2f}/s"
+        )
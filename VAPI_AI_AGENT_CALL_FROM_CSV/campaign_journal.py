@@ -0,0 +1,152 @@
+import heapq
+import os
+import sqlite3
+from datetime import datetime
+
+from metrics import log
+
+
+# ----------------------------
+# Campaign Checkpoint Journal
+# ----------------------------
+class CampaignJournal:
+    """
+    SQLite (WAL) journal that lets a crashed campaign resume where it stopped.
+
+    Every dialed phone is recorded with its row's byte offset and outcome,
+    and the campaign keeps a low watermark: the offset of the earliest row
+    that may not be finished yet. On restart the reader seeks straight to the
+    watermark and phones already dialed in this campaign are skipped, so
+    resuming costs one lookup instead of a rescan of the CSV or the log.
+
+    A phone is marked "dialing" before its call is placed. If the run dies
+    between that write and the call's outcome, the phone is treated as
+    dialed on resume (reported as `interrupted`) rather than risking a
+    second call.
+
+    Only "initiated" and "dialing" phones count as dialed. A call that was
+    never placed ("failed": permanent error, retries used up, breaker open;
+    "skipped": contact cap) keeps the watermark at its row, so a rerun reads
+    it again and retries it.
+
+    `shard` = (start, end) is the byte range of one campaign_runner worker.
+    Its phones go in the campaign's one `dialed` table, so every shard (and
+    end.py on the same file) skips a phone any of them dialed, whatever the
+    --workers of the earlier run. Only the watermark is per range: a resume
+    with the same ranges seeks straight to it, a range not seen before is
+    rescanned from its start and skipped by phone.
+    """
+
+    def __init__(self, path=None, campaign=None, source=None, shard=None):
+        self.path = path or os.getenv("CAMPAIGN_JOURNAL", "campaign_journal.db")
+        self.campaign = campaign or os.getenv("CAMPAIGN_ID") or os.path.basename(source or "campaign")
+        # The campaigns row holding this run's watermark
+        self.mark = self.campaign if shard is None else f"{self.campaign}@{shard[0]}-{shard[1]}"
+        self.shard = shard or (0, None)
+        self.already_dialed = 0
+
+        self._in_flight = set()
+        self._in_flight_heap = []
+        self._pending_phones = set()
+        self._last_offset = -1
+        self._first_unplaced = None  # earliest row whose call failed or was skipped this run
+        self._db = sqlite3.connect(self.path, timeout=30)  # shard processes share the file
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS campaigns (
+                campaign TEXT PRIMARY KEY,
+                source TEXT,
+                low_watermark INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS dialed (
+                campaign TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                row_offset INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                updated_at TEXT,
+                PRIMARY KEY (campaign, phone)
+            ) WITHOUT ROWID;
+            -- Only calls cut off by a crash stay "dialing", so this stays tiny
+            CREATE INDEX IF NOT EXISTS dialed_interrupted ON dialed (campaign) WHERE status = 'dialing';
+        """)
+        self._db.execute(
+            "INSERT OR IGNORE INTO campaigns (campaign, source, updated_at) VALUES (?, ?, ?)",
+            (self.mark, source, datetime.now().isoformat())
+        )
+        self._db.commit()
+
+        self.resume_offset = self._db.execute(
+            "SELECT low_watermark FROM campaigns WHERE campaign = ?", (self.mark,)
+        ).fetchone()[0]
+        if source and os.path.exists(source) and self.resume_offset > os.path.getsize(source):
+            log("checkpoint_reset", f"⚠️ {source} is smaller than the saved checkpoint; rescanning from the start",
+                source=source, checkpoint=self.resume_offset)
+            self.resume_offset = 0
+        start, end = self.shard
+        self.interrupted = self._db.execute(
+            "SELECT COUNT(*) FROM dialed INDEXED BY dialed_interrupted WHERE campaign = ? AND status = 'dialing'"
+            " AND row_offset >= ? AND row_offset < ?",
+            (self.campaign, start, end if end is not None else 1 << 62)
+        ).fetchone()[0]
+
+    def is_dialed(self, phone):
+        return self._db.execute(
+            "SELECT 1 FROM dialed WHERE campaign = ? AND phone = ? AND status IN ('initiated', 'dialing')",
+            (self.campaign, phone)
+        ).fetchone() is not None
+
+    def track(self, carts):
+        """Yield the carts still to dial, holding the watermark at the earliest unfinished row."""
+        for cart in carts:
+            if cart.phone in self._pending_phones or self.is_dialed(cart.phone):
+                self.already_dialed += 1
+                continue
+            self._in_flight.add(cart.offset)
+            heapq.heappush(self._in_flight_heap, cart.offset)
+            self._pending_phones.add(cart.phone)
+            yield cart
+
+    def start(self, cart):
+        # Written before the call is placed, so a crash can never lead to a second call
+        self._db.execute(
+            "INSERT OR REPLACE INTO dialed VALUES (?, ?, ?, 'dialing', ?)",
+            (self.campaign, cart.phone, cart.offset, datetime.now().isoformat())
+        )
+        self._db.commit()
+
+    def finish(self, cart, ok):
+        status = "skipped" if ok is None else "initiated" if ok else "failed"
+        now = datetime.now().isoformat()
+        self._in_flight.discard(cart.offset)
+        self._pending_phones.discard(cart.phone)
+        self._last_offset = max(self._last_offset, cart.offset)
+        if not ok and (self._first_unplaced is None or cart.offset < self._first_unplaced):
+            self._first_unplaced = cart.offset
+        # Rows before the earliest in-flight (or unplaced) one are all done;
+        # rows re-read from the watermark are skipped by phone
+        heap = self._in_flight_heap
+        while heap and heap[0] not in self._in_flight:
+            heapq.heappop(heap)
+        watermark = heap[0] if heap else self._last_offset
+        if self._first_unplaced is not None:
+            watermark = min(watermark, self._first_unplaced)
+        self._db.execute(
+            "UPDATE dialed SET status = ?, updated_at = ? WHERE campaign = ? AND phone = ?",
+            (status, now, self.campaign, cart.phone)
+        )
+        self._db.execute(
+            "UPDATE campaigns SET low_watermark = MAX(low_watermark, ?), updated_at = ? WHERE campaign = ?",
+            (watermark, now, self.mark)
+        )
+        self._db.commit()
+
+    def summary(self):
+        return (
+            f"campaign {self.campaign!r} resumed at byte {self.resume_offset}, "
+            f"{self.already_dialed} already dialed, {self.interrupted} interrupted mid-call"
+        )
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+from datetime import datetime
+from multiprocessing.managers import BaseManager
+
+from dotenv import load_dotenv
+from vapi import AsyncVapi
+# The SDK imports its calls client lazily on first use, which takes seconds;
+# import it once here so every forked worker inherits it
+import vapi.calls.client  # noqa: F401
+
+from cart_reader import CartReader, shard_ranges
+from call_log import CallLogSink, CALL_LOG_FIELDS
+from call_submitter import CallSubmitter
+from campaign_journal import CampaignJournal
+from dialer import dial_all
+from line_pool import LinePool, vapi_caller
+from metrics import REGISTRY, log
+from scheduler import CallScheduler
+
+
+# ----------------------------
+# Sharded Campaign Runner
+# ----------------------------
+# python campaign_runner.py --workers 4
+#
+# Replaces `python end.py` for very large exports. The cart file is split
+# into byte-range shards (cart_reader.shard_ranges) and each shard is dialed
+# by its own process with its own dial pool, scheduler and log segment, so
+# payload building, SDK parsing and logging use every core. The coordinator
+# (this process) owns what must stay global:
+#   - DIAL_RATE: one token bucket in shared memory that all workers draw from
+#   - dedup: a phone claimed by one worker is never dialed by another
+# Each worker dials from its own LinePool (PHONE_LINES, else PHONE_NUMBER_ID)
+# with every line's concurrency and per_minute split between the workers
+# (split_line_limits), rounding down so the shares never add up to more than
+# the line allows. Each worker keeps at least 1, so a limit below --workers
+# is exceeded; that is logged at startup.
+# Across runs, every worker checkpoints into the campaign's one journal,
+# keyed by phone: a resume skips a phone whichever shard dialed it, with any
+# --workers. When all workers are done the log segments are merged into
+# call_logs.csv.
+
+CLAIM_BATCH = 256
+
+
+# ----------------------------
+# Global Rate Limit
+# ----------------------------
+class SharedTokenBucket:
+    """
+    Rate limiter shared by every worker process.
+
+    The next free send slot lives in shared memory; acquire() reserves a slot
+    under a process-shared lock (held for a few µs) and sleeps until it
+    outside the lock, so N workers together send at most `rate` calls/sec.
+    `rate` is settable, which lets each worker's CallSubmitter apply AIMD to
+    the global rate; the time of the last decrease is shared too, so one
+    burst of 429s seen by every worker halves the rate once, not once each.
+    """
+
+    def __init__(self, rate):
+        self._rate = multiprocessing.Value("d", float(rate), lock=False)
+        self._next = multiprocessing.Value("d", 0.0, lock=False)
+        self._slowed_at = multiprocessing.Value("d", float("-inf"), lock=False)
+        self._lock = multiprocessing.Lock()
+
+    @property
+    def rate(self):
+        return self._rate.value
+
+    @rate.setter
+    def rate(self, value):
+        with self._lock:
+            self._rate.value = value
+
+    def slow_down(self, factor, floor, interval=1.0):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._slowed_at.value < interval:
+                return False
+            self._slowed_at.value = now
+            self._rate.value = max(floor, self._rate.value * factor)
+        return True
+
+    async def acquire(self):
+        now = time.monotonic()  # system-wide clock, comparable across processes
+        with self._lock:
+            slot = max(self._next.value, now)
+            self._next.value = slot + 1 / self._rate.value
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# ----------------------------
+# Global Dedup Set
+# ----------------------------
+class PhoneClaims:
+    """Lives in the coordinator; workers claim phones through a manager proxy (local socket)."""
+
+    def __init__(self):
+        self._owner = {}
+        self._duplicates = 0
+
+    def claim_many(self, carts):
+        # (phone, row offset) pairs; the first row to claim a phone owns it
+        owner = self._owner
+        won = [owner.setdefault(phone, offset) == offset for phone, offset in carts]
+        self._duplicates += won.count(False)
+        return won
+
+    def duplicates(self):
+        return self._duplicates
+
+
+class CampaignManager(BaseManager):
+    pass
+
+
+CampaignManager.register("PhoneClaims", PhoneClaims, exposed=("claim_many", "duplicates"))
+
+
+def claimed(carts, claims, batch=CLAIM_BATCH):
+    """Yield only the carts whose phone this worker won, claiming `batch` at a time."""
+    pending = []
+    for cart in carts:
+        pending.append(cart)
+        if len(pending) == batch:
+            yield from _claim(pending, claims)
+            pending = []
+    yield from _claim(pending, claims)
+
+
+def _claim(carts, claims):
+    if not carts:
+        return
+    won = claims.claim_many([(cart.phone, cart.offset) for cart in carts])
+    for cart, ok in zip(carts, won):
+        if ok:
+            yield cart
+
+
+# ----------------------------
+# Shard Worker
+# ----------------------------
+def run_shard(shard, workers, start, end, cart_file, log_file, rate, bucket, claims, results):
+    load_dotenv()
+    tag = f"[{shard + 1}/{workers}]"
+    client = AsyncVapi(token=os.getenv("VAPI_API_KEY"), base_url=os.getenv("VAPI_BASE_URL"))
+    submitter = CallSubmitter(rate=rate, bucket=bucket)
+    campaign = os.getenv("CAMPAIGN_ID") or os.path.basename(cart_file)
+    journal = CampaignJournal(campaign=campaign, source=cart_file, shard=(start, end))
+    carts = CartReader(cart_file, quiet=True, start=max(start, journal.resume_offset), end=end)
+    call_log = CallLogSink(segment_path(log_file, shard), CALL_LOG_FIELDS)
+    scheduler = CallScheduler()
+    lines = split_line_limits(LinePool.from_env(), workers)
+
+    # end.py's three messages, passed the way the SDK accepts them
+    # (calls.create has no `messages` argument)
+    async def place_call(cart):
+        phone = cart.phone
+        try:
+            call = await submitter.submit(lines.call, phone, lambda line: client.calls.create(
+                assistant_id=os.getenv("ASSISTANT_ID"),
+                **vapi_caller(line),
+                customer={
+                    "number": phone,
+                    "name": cart.name
+                },
+                assistant_overrides={
+                    "firstMessage": f"Hi {cart.name}, I see you left {cart.items} in your cart totaling {cart.total}. Can I help you complete your purchase?",
+                    "voicemailMessage": "Please call back when you're available.",
+                    "endCallMessage": "Thank you! Goodbye."
+                }
+            ))
+            status = "success"
+            call_id = call.id
+            call_ended_reason = "in_progress"
+        except Exception as e:
+            status = "failed"
+            call_id = "N/A"
+            call_ended_reason = str(e)
+            log("call_failed", f"{tag} ❌ Call failed for {cart.name} → {phone}: {e}",
+                phone=phone, shard=shard + 1, error=str(e))
+
+        call_log.write({
+            "timestamp": datetime.now(),
+            "name": cart.name,
+            "number": phone,
+            "items": cart.items,
+            "total": cart.total,
+            "reason": cart.reason,
+            "language": cart.language,
+            "status": status,
+            "call_id": call_id,
+            "call_ended_reason": call_ended_reason
+        })
+        return status == "success"
+
+    stats = asyncio.run(dial_all(claimed(carts, claims), place_call, journal=journal,
+                                 scheduler=scheduler, submitter=submitter))
+    call_log.close()
+    journal.close()
+    # Each process has its own registry, so each shard leaves its own snapshot
+    REGISTRY.write_snapshot(segment_path(os.getenv("METRICS_SNAPSHOT", "metrics_snapshot.json"), shard))
+
+    results.put({
+        "shard": shard,
+        "rows_read": carts.rows_read,
+        "succeeded": stats.succeeded,
+        "failed": stats.failed,
+        "skipped": stats.skipped,
+        "elapsed": stats.elapsed,
+        "cpu": time.process_time(),
+        "retries": submitter.summary(),
+        "lines": lines.summary(),
+    })
+
+
+def split_line_limits(pool, workers):
+    """Give this worker its 1/`workers` share of every line's limits (0 stays unlimited)."""
+    for line in pool.lines:
+        line.concurrency = max(1, line.concurrency // workers) if line.concurrency else 0
+        line.per_minute = max(1, line.per_minute // workers) if line.per_minute else 0
+    return pool
+
+
+def warn_line_limits(workers):
+    """Log each line whose limits are below `workers`: every worker still gets 1, so together they exceed it."""
+    for line in LinePool.from_env().lines:
+        for limit in ("concurrency", "per_minute"):
+            value = getattr(line, limit)
+            if 0 < value < workers:
+                log("line_limit_exceeded",
+                    f"⚠️ Line {line} allows {limit}={value} but {workers} workers each take at least 1; "
+                    f"it may see up to {workers}. Lower --workers to keep its limit",
+                    line=repr(line), limit=limit, value=value, workers=workers)
+
+
+def segment_path(log_file, shard):
+    root, ext = os.path.splitext(log_file)
+    return f"{root}.part{shard + 1}{ext}"
+
+
+def merge_segments(log_file, workers):
+    """Append every worker's log segment to `log_file` (one header in total), then delete it."""
+    with open(log_file, "ab") as out:
+        for shard in range(workers):
+            path = segment_path(log_file, shard)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as segment:
+                header = segment.readline()
+                if out.tell() == 0:
+                    out.write(header)
+                while chunk := segment.read(1 << 20):
+                    out.write(chunk)
+            os.remove(path)
+
+
+# ----------------------------
+# Coordinator
+# ----------------------------
+def collect_results(processes, results, poll=1.0):
+    """Wait for each shard's result; returns (results by shard, shards whose process exited without one)."""
+    shards, failed = {}, []
+    pending = set(range(len(processes)))
+    while pending:
+        try:
+            result = results.get(timeout=poll)
+        except queue.Empty:
+            exited = [shard for shard in sorted(pending) if processes[shard].exitcode is not None]
+            if not exited:
+                continue
+            # A process flushes its result before it exits, so drain what is queued before giving up on one
+            while True:
+                try:
+                    result = results.get_nowait()
+                except queue.Empty:
+                    break
+                shards[result["shard"]] = result
+                pending.discard(result["shard"])
+            for shard in exited:
+                if shard in pending:
+                    pending.discard(shard)
+                    failed.append(shard)
+                    log("shard_failed", f"❌ Shard {shard + 1} exited with code {processes[shard].exitcode} "
+                        f"without a result", shard=shard, exitcode=processes[shard].exitcode)
+            continue
+        shards[result["shard"]] = result
+        pending.discard(result["shard"])
+    return shards, failed
+
+
+def run_campaign(cart_file, workers, rate=None, log_file="call_logs.csv"):
+    """Dial `cart_file` with `workers` processes; returns (per-shard results, wall seconds, duplicates)."""
+    rate = float(os.getenv("DIAL_RATE", "5")) if rate is None else rate
+    ranges = shard_ranges(cart_file, workers)
+    warn_line_limits(workers)
+
+    started = time.monotonic()
+    with CampaignManager() as manager:
+        claims = manager.PhoneClaims()
+        bucket = SharedTokenBucket(rate) if rate > 0 else None
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=run_shard,
+                args=(shard, workers, start, end, cart_file, log_file, rate, bucket, claims, results),
+            )
+            for shard, (start, end) in enumerate(ranges)
+        ]
+        for process in processes:
+            process.start()
+        shards, failed = collect_results(processes, results)
+        for process in processes:
+            process.join()
+        duplicates = claims.duplicates()
+
+    # Keep the rows the surviving shards logged even when one of them died
+    merge_segments(log_file, workers)
+    elapsed = time.monotonic() - started
+    if failed:
+        raise RuntimeError(f"Shards {', '.join(str(shard + 1) for shard in failed)} exited without a result; "
+                           f"their rows were not all dialed (see {log_file} and the journal)")
+    return sorted(shards.values(), key=lambda r: r["shard"]), elapsed, duplicates
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Dial a cart file with one process per byte-range shard")
+    parser.add_argument("--cart-file", default=os.getenv("CART_FILE", "abandoned_cart.csv"))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CAMPAIGN_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--log-file", default="call_logs.csv")
+    args = parser.parse_args()
+
+    if not all([os.getenv("VAPI_API_KEY"), os.getenv("PHONE_NUMBER_ID") or os.getenv("PHONE_LINES"),
+                os.getenv("ASSISTANT_ID")]):
+        raise ValueError("Missing VAPI_API_KEY, PHONE_NUMBER_ID (or PHONE_LINES), or ASSISTANT_ID in .env")
+
+    print(f"🚀 Dialing {args.cart_file} with {args.workers} workers...\n")
+    shards, elapsed, duplicates = run_campaign(args.cart_file, args.workers, log_file=args.log_file)
+
+    calls = sum(r["succeeded"] + r["failed"] for r in shards)
+    print("=" * 60)
+    for r in shards:
+        print(f"✓ Shard {r['shard'] + 1}: {r['rows_read']} rows, {r['succeeded']} ok, {r['failed']} failed, "
+              f"{r['skipped']} skipped in {r['elapsed']:.2f}s | {r['retries']} | {r['lines']}")
+    print(f"✓ Throughput: {calls} calls in {elapsed:.2f}s → {calls / elapsed:.2f} calls/sec")
+    print(f"✓ Duplicate phones skipped across shards: {duplicates}")
+    print(f"✓ Call logs saved to: {args.log_file}")
+    print("=" * 60)
@@ -0,0 +1,149 @@
+import csv
+import os
+import time
+from typing import NamedTuple
+
+from metrics import counter, log, stage
+
+
+# ----------------------------
+# Cart Record
+# ----------------------------
+class Cart(NamedTuple):
+    name: str
+    phone: str
+    items: str
+    total: str
+    reason: str = "Unknown"
+    language: str = "en"
+    timezone: str = ""  # optional IANA zone, e.g. "Asia/Kolkata"
+    priority: str = ""  # optional rank from decision_service.py's dial list, highest first
+    offset: int = -1  # byte offset of the row in the CSV
+
+
+# Cart fields that come from CSV columns
+CSV_FIELDS = Cart._fields[:-1]
+
+
+CSV_PARSE = stage("csv_parse")
+CARTS_READ = counter("carts_read_total", "Cart rows read from the CSV")
+CARTS_SKIPPED = counter("carts_skipped_total", "Cart rows skipped for an invalid phone number")
+
+
+# ----------------------------
+# Streaming Cart Reader
+# ----------------------------
+class CartReader:
+    """
+    Lazily yields one Cart per CSV row, so the first call can go out as soon as
+    the header is read and memory stays flat however large the export is.
+
+    Rows with an invalid phone number are skipped inline and counted. `start`
+    is a byte offset to resume from (a Cart's `offset`); the header is still
+    read from the top of the file. With `end`, only rows starting before that
+    byte are read, so a file can be split into byte-range shards.
+    """
+
+    def __init__(self, path="abandoned_cart.csv", quiet=False, start=0, end=None):
+        self.path = path
+        self.quiet = quiet
+        self.start = start
+        self.end = end
+        self.rows_read = 0
+        self.skipped = 0
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            records = read_records(f)
+            _, header = next(records, (None, None))
+            if header is None:
+                return
+            columns = {name.strip(): i for i, name in enumerate(header)}
+            getters = [columns.get(field) for field in CSV_FIELDS]
+            missing = [f for f, i in zip(CSV_FIELDS[:4], getters) if i is None]
+            if missing:
+                raise ValueError(f"{self.path} is missing required columns: {', '.join(missing)}")
+            if self.start > f.tell():
+                f.seek(self.start)
+
+            defaults = Cart._field_defaults
+            # csv_parse times reading + parsing each row, not the consumer's work between rows
+            resumed = time.perf_counter()
+            for offset, fields in records:
+                if self.end is not None and offset >= self.end:
+                    break
+                self.rows_read += 1
+                CARTS_READ.inc()
+                values = [
+                    fields[i] if i is not None and i < len(fields) else defaults.get(name, "")
+                    for name, i in zip(CSV_FIELDS, getters)
+                ]
+                values.append(offset)
+                phone = values[1] = values[1].strip()
+
+                if not phone.startswith("+"):
+                    self.skipped += 1
+                    CARTS_SKIPPED.inc()
+                    if not self.quiet:
+                        log("cart_skipped", f"❌ Skipping invalid phone number: {phone}", phone=phone)
+                    continue
+
+                cart = Cart._make(values)
+                CSV_PARSE.observe(time.perf_counter() - resumed)
+                yield cart
+                resumed = time.perf_counter()
+
+
+def read_records(f):
+    # Read line by line from a binary file, yielding (byte offset, fields);
+    # a quoted field may span lines, so keep reading while the quotes are
+    # unbalanced.
+    while True:
+        offset = f.tell()
+        line = f.readline()
+        if not line:
+            break
+        while line.count(b'"') % 2:
+            more = f.readline()
+            if not more:
+                break
+            line += more
+        line = line.decode("utf-8-sig")
+        if line.strip():
+            yield offset, next(csv.reader([line]))
+
+
+def shard_ranges(path, shards, chunk_size=1 << 20):
+    """
+    Split a CSV into `shards` byte ranges [start, end) that each begin on a
+    row. Cut points are spread evenly by size and moved forward to the next
+    row start; quotes are counted from the header on, so a cut never lands
+    inside a quoted multi-line field.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        records = read_records(f)
+        next(records, None)
+        first = f.tell()
+        targets = [first + (size - first) * i // shards for i in range(1, shards)]
+
+        bounds = [first]
+        position, quotes = first, 0
+        for target in targets:
+            while position < target:
+                chunk = f.read(min(chunk_size, target - position))
+                if not chunk:
+                    break
+                quotes += chunk.count(b'"')
+                position += len(chunk)
+            # Finish the row the cut landed in (and any quoted field it is inside)
+            line = f.readline()
+            inside = (quotes + line.count(b'"')) % 2
+            while inside and line:
+                line = f.readline()
+                inside = (inside + line.count(b'"')) % 2
+            # A row start is outside any quotes, so counting restarts here
+            position, quotes = f.tell(), 0
+            bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
@@ -0,0 +1,82 @@
+import csv
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+
+# ----------------------------
+# Per-customer Contact Index
+# ----------------------------
+class ContactIndex:
+    """
+    Persistent phone → call timestamps index (SQLite, WAL).
+
+    Rows are clustered by (phone, called_at), so "how many calls to this
+    number in the last N hours" is one index range lookup, and opening the
+    index costs the same however many calls it holds; the call logs are
+    never re-read.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("CONTACT_INDEX", "contact_index.db")
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS contacts (
+                phone TEXT NOT NULL,
+                called_at REAL NOT NULL,
+                PRIMARY KEY (phone, called_at)
+            ) WITHOUT ROWID
+        """)
+
+    def calls_since(self, phone, hours=None):
+        """Calls to `phone` in the last `hours` hours (all time if None)."""
+        since = time.time() - hours * 3600 if hours is not None else float("-inf")
+        return self._db.execute(
+            "SELECT COUNT(*) FROM contacts WHERE phone = ? AND called_at >= ?", (phone, since)
+        ).fetchone()[0]
+
+    def record(self, phone, when=None):
+        when = when.timestamp() if isinstance(when, datetime) else when or time.time()
+        self._db.execute("INSERT OR IGNORE INTO contacts VALUES (?, ?)", (phone, when))
+        self._db.commit()
+
+    def record_many(self, contacts):
+        self._db.executemany("INSERT OR IGNORE INTO contacts VALUES (?, ?)", contacts)
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+def backfill(index, log_path):
+    """One-off import of the calls already in a call log (call_logs.csv or call_logs_detailed.csv)."""
+    contacts = []
+    with open(log_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            phone = row.get("customer_phone") or row.get("number")
+            status = row.get("call_status") or row.get("status")
+            if not phone or status == "failed":
+                continue
+            try:
+                contacts.append((phone.strip(), datetime.fromisoformat(row["timestamp"]).timestamp()))
+            except (KeyError, ValueError):
+                continue
+    index.record_many(contacts)
+    return len(contacts)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the contact index from existing call logs")
+    parser.add_argument("logs", nargs="*", default=["call_logs.csv", "call_logs_detailed.csv"])
+    args = parser.parse_args()
+
+    index = ContactIndex()
+    for log_path in args.logs:
+        if os.path.exists(log_path):
+            print(f"✓ Imported {backfill(index, log_path)} calls from {log_path}")
+    index.close()
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import time
+
+from metrics import counter, gauge, histogram, log
+
+
+# ----------------------------
+# Token Bucket Rate Limiter
+# ----------------------------
+class TokenBucket:
+    """Async token bucket: refills `rate` tokens per second, holds at most `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.slowed_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def slow_down(self, factor, floor, interval=1.0):
+        """Multiply the rate by `factor` (not below `floor`), at most once per `interval` seconds."""
+        now = time.monotonic()
+        if now - self.slowed_at < interval:
+            return False
+        self.slowed_at = now
+        self.rate = max(floor, self.rate * factor)
+        return True
+
+    async def acquire(self):
+        # One waiter at a time, so calls leave the bucket in FIFO order
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+# ----------------------------
+# Dial Statistics
+# ----------------------------
+class DialStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.finished = None
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+
+    @property
+    def total(self):
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def calls_per_second(self):
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (
+            f"{self.total} calls in {self.elapsed:.2f}s "
+            f"({self.succeeded} ok, {self.failed} failed, {self.skipped} skipped) "
+            f"→ {self.calls_per_second:.2f} calls/sec"
+        )
+
+
+# ----------------------------
+# Concurrent Dialer
+# ----------------------------
+CALLS = counter("calls_total", "Carts handled by the dialer", ("outcome",))
+CALLS_IN_FLIGHT = gauge("calls_in_flight", "place_call coroutines currently running")
+CALL_SECONDS = histogram("call_seconds", "place_call duration (payload, provider call, log write)")
+SUCCEEDED, FAILED, SKIPPED = (CALLS.labels(outcome) for outcome in ("ok", "failed", "skipped"))
+
+async def dial_all(carts, place_call, concurrency=None, rate=None, journal=None, scheduler=None, submitter=None,
+                   prefetcher=None):
+    """
+    Run `place_call(cart)` for every cart with up to `concurrency` calls in
+    flight, paced to `rate` calls per second (0 disables pacing).
+
+    `place_call` is a coroutine returning True on success, False on failure
+    and None for rows it decided not to dial. `carts` may be any
+    iterable, including a lazy generator: workers pull the next cart only when
+    they are free, so nothing is materialised up front.
+
+    With a CampaignJournal, phones already dialed in the campaign are
+    skipped and every call is checkpointed before and after it is placed.
+    With a CallScheduler, the carts are queued by calling window and
+    priority and workers pull from it instead of dialing in file order; it
+    reads up to its lookahead of carts ahead of the workers (all of them
+    with lookahead=0).
+    With a CallSubmitter, pacing is left to it: it paces every attempt,
+    retries included, and adapts the rate to the provider's 429s.
+    With a ScriptPrefetcher, workers pull carts whose first message is
+    already generated, from a pipeline running up to its depth ahead.
+    """
+    if concurrency is None:
+        concurrency = int(os.getenv("DIAL_CONCURRENCY", "10"))
+    if rate is None:
+        rate = float(os.getenv("DIAL_RATE", "5"))
+
+    bucket = TokenBucket(rate) if rate > 0 and submitter is None else None
+    stats = DialStats()
+    carts = journal.track(carts) if journal else carts
+    if scheduler is not None:
+        next_cart = scheduler.feed(carts).pop
+    else:
+        carts = iter(carts)
+
+        async def next_cart():
+            return next(carts, None)
+    if prefetcher is not None:
+        next_cart = prefetcher.pipeline(next_cart)
+
+    async def worker():
+        while (cart := await next_cart()) is not None:
+            if bucket:
+                await bucket.acquire()
+            if journal:
+                journal.start(cart)
+            CALLS_IN_FLIGHT.inc()
+            try:
+                with CALL_SECONDS.time():
+                    ok = await place_call(cart)
+            except Exception as e:
+                log("dial_error", f"❌ Unhandled error while dialing: {e}",
+                    phone=getattr(cart, "phone", None), error=str(e))
+                ok = False
+            finally:
+                CALLS_IN_FLIGHT.dec()
+            if journal:
+                journal.finish(cart, ok)
+
+            if ok is None:
+                stats.skipped += 1
+                SKIPPED.inc()
+            elif ok:
+                stats.succeeded += 1
+                SUCCEEDED.inc()
+            else:
+                stats.failed += 1
+                FAILED.inc()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    stats.finished = time.monotonic()
+    return stats
@@ -1,74 +1,112 @@
-import os
-import pandas as pd
-from dotenv import load_dotenv
-from vapi import Vapi  # your installed SDK
-
-# Load .env
-load_dotenv()
-
-VAPI_API_KEY = os.getenv("VAPI_API_KEY")        # PRIVATE key from VAPI dashboard
-PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")  # UUID of your attached phone number
-ASSISTANT_ID = os.getenv("ASSISTANT_ID")        # UUID of your assistant
-
-if not all([VAPI_API_KEY, PHONE_NUMBER_ID, ASSISTANT_ID]):
-    raise ValueError("Missing VAPI_API_KEY, PHONE_NUMBER_ID, or ASSISTANT_ID in .env")
-
-# Initialize Vapi client
-client = Vapi(token=VAPI_API_KEY)
-
-# Load abandoned cart CSV (ensure phone numbers are strings)
-df = pd.read_csv("abandoned_cart.csv", dtype={"phone": str})
-
-# Prepare log file
-log_file = "call_logs.csv"
-if not os.path.exists(log_file):
-    with open(log_file, "w") as f:
-        f.write("timestamp,name,number,items,total,reason,language,status,call_id\n")
-
-# Iterate over customers
-for _, row in df.iterrows():
-    phone = row["phone"].strip()
-
-    if not phone.startswith("+"):
-        print(f"Skipping invalid phone number: {phone}")
-        continue
-
-    try:
-        # Create call with messages list
-        call = client.calls.create(
-            assistant_id=ASSISTANT_ID,
-            phone_number_id=PHONE_NUMBER_ID,
-            customer={
-                "number": phone,
-                "name": row["name"]
-            },
-            messages=[
-                {
-                    "type": "text",
-                    "text": f"Hi {row['name']}, I see you left {row['items']} in your cart totaling {row['total']}. Can I help you complete your purchase?"
-                },
-                {
-                    "type": "voicemail",
-                    "text": "Please call back when you're available."
-                },
-                {
-                    "type": "end",
-                    "text": "Thank you! Goodbye."
-                }
-            ]
-        )
-
-        status = "success"
-        call_id = call.id
-        print(f"📞 Call processed for {row['name']} → {phone} | Call ID: {call_id}")
-
-    except Exception as e:
-        status = "failed"
-        call_id = str(e)
-        print(f"❌ Call failed for {row['name']} → {phone}: {e}")
-
-    # Append to log file
-    with open(log_file, "a") as f:
-        f.write(
-            f"{pd.Timestamp.now()},{row['name']},{phone},{row['items']},{row['total']},{row['reason']},{row['language']},{status},{call_id}\n"
-        )
+import os
+import asyncio
+from datetime import datetime
+from dotenv import load_dotenv
+from vapi import AsyncVapi  # your installed SDK
+from dialer import dial_all
+from cart_reader import CartReader
+from campaign_journal import CampaignJournal
+from call_submitter import CallSubmitter
+from scheduler import CallScheduler
+from call_log import CallLogSink, CALL_LOG_FIELDS
+from line_pool import LinePool, vapi_caller
+from metrics import log, write_snapshots
+
+# Load .env
+load_dotenv()
+
+VAPI_API_KEY = os.getenv("VAPI_API_KEY")        # PRIVATE key from VAPI dashboard
+PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")  # UUID of your attached phone number (or set PHONE_LINES)
+ASSISTANT_ID = os.getenv("ASSISTANT_ID")        # UUID of your assistant
+CART_FILE = os.getenv("CART_FILE", "abandoned_cart.csv")  # or the output of phone_prep.py
+
+if not all([VAPI_API_KEY, PHONE_NUMBER_ID or os.getenv("PHONE_LINES"), ASSISTANT_ID]):
+    raise ValueError("Missing VAPI_API_KEY, PHONE_NUMBER_ID (or PHONE_LINES), or ASSISTANT_ID in .env")
+
+# Initialize async Vapi client (VAPI_BASE_URL lets us point at a local fake server)
+client = AsyncVapi(token=VAPI_API_KEY, base_url=os.getenv("VAPI_BASE_URL"))
+
+# Retries 429s/5xx with backoff, adapts DIAL_RATE to 429s, pauses the campaign while Vapi is down
+submitter = CallSubmitter()
+
+# Caller IDs to dial from: PHONE_LINES (Vapi and Twilio numbers, each with its own
+# limits), else PHONE_NUMBER_ID. Each call goes to the least-loaded line with room
+# and fails over to another provider's line on errors (see line_pool.py)
+lines = LinePool.from_env()
+
+# Checkpoint journal: a rerun resumes at the first unfinished row and skips phones already dialed
+journal = CampaignJournal(source=CART_FILE)
+
+# Stream abandoned cart CSV (phone numbers stay strings, invalid ones are skipped)
+carts = CartReader(CART_FILE, start=journal.resume_offset)
+
+# Prepare log file (buffered, quoted CSV shared by all dial workers)
+log_file = "call_logs.csv"
+call_log = CallLogSink(log_file, CALL_LOG_FIELDS)
+
+# Place one call and log it
+async def place_call(cart):
+    phone = cart.phone
+
+    try:
+        # Personalize the assistant's opening, voicemail and goodbye for this cart
+        call = await submitter.submit(lines.call, phone, lambda line: client.calls.create(
+            assistant_id=ASSISTANT_ID,
+            **vapi_caller(line),
+            customer={
+                "number": phone,
+                "name": cart.name
+            },
+            assistant_overrides={
+                "firstMessage": f"Hi {cart.name}, I see you left {cart.items} in your cart totaling {cart.total}. Can I help you complete your purchase?",
+                "voicemailMessage": "Please call back when you're available.",
+                "endCallMessage": "Thank you! Goodbye."
+            }
+        ))
+
+        status = "success"
+        call_id = call.id
+        call_ended_reason = "in_progress"
+        log("call_initiated", f"📞 Call processed for {cart.name} → {phone} | Call ID: {call_id}",
+            phone=phone, call_id=call_id)
+
+    except Exception as e:
+        status = "failed"
+        call_id = "N/A"
+        call_ended_reason = str(e)
+        log("call_failed", f"❌ Call failed for {cart.name} → {phone}: {e}", phone=phone, error=str(e))
+
+    # Append to log file
+    call_log.write({
+        "timestamp": datetime.now(),
+        "name": cart.name,
+        "number": phone,
+        "items": cart.items,
+        "total": cart.total,
+        "reason": cart.reason,
+        "language": cart.language,
+        "status": status,
+        "call_id": call_id,
+        "call_ended_reason": call_ended_reason
+    })
+
+    return status == "success"
+
+
+# Carts are queued by the customer's local calling window, then cart value
+scheduler = CallScheduler()
+
+# Counters, gauges and per-stage latencies, written to METRICS_SNAPSHOT every few seconds
+metrics_file = write_snapshots()
+
+# Dial concurrently: DIAL_CONCURRENCY calls in flight, paced at DIAL_RATE calls/sec
+stats = asyncio.run(dial_all(carts, place_call, journal=journal, scheduler=scheduler, submitter=submitter))
+call_log.close()
+journal.close()
+
+print(f"✓ Throughput: {stats.summary()}")
+print(f"✓ Checkpoint: {journal.summary()}")
+print(f"✓ Retries: {submitter.summary()}")
+print(f"✓ Scheduler: {scheduler.summary()}")
+print(f"✓ Phone lines: {lines.summary()}")
+print(f"✓ Metrics snapshot: {metrics_file}")
@@ -0,0 +1,290 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+from call_submitter import PERMANENT, RATE_LIMIT, classify, retry_after
+from metrics import counter, gauge, log, stage
+from scheduler import COUNTRY_TIMEZONES
+
+
+# ----------------------------
+# Phone Line Pool
+# ----------------------------
+# The caller IDs a campaign dials from, each with its own limits. PHONE_LINES
+# is a JSON list (inline, or the path of a .json file):
+#
+#   [
+#     {"provider": "vapi", "id": "<Vapi phone number id>", "number": "+14155550100",
+#      "concurrency": 10, "per_minute": 30},
+#     {"provider": "twilio", "number": "+918000000001", "concurrency": 5, "per_minute": 20}
+#   ]
+#
+#   concurrency  calls holding the line at once (see LINE_HOLD_SECONDS; 0: no limit)
+#   per_minute   calls started in any 60 s (0: no limit)
+#   country      calling code the line serves; defaults to its number's
+#
+# Without PHONE_LINES the pool is the single PHONE_NUMBER_ID / TWILIO_NUMBER
+# line, limited to LINE_CONCURRENCY and LINE_PER_MINUTE. The campaign scripts
+# dial Twilio lines through Vapi (vapi_caller), so the assistant is on every
+# call; AI_Voice/main.py dials its Twilio lines with the Twilio API.
+#
+# Each call goes to the least-loaded line with room (busiest of concurrency
+# and per-minute use), waiting while every line is full. With
+# LINE_MATCH_COUNTRY=1 a customer is only dialed from lines of their own
+# country while one of those is up. A transient provider error moves the call
+# to a line of another provider; a 429 to any other line. A line failing
+# LINE_FAILURES times in a row rests for LINE_COOLDOWN seconds, a rate-limited
+# one for Retry-After. When every line has been tried the last error is
+# raised, for the CallSubmitter to back off and retry.
+#
+# A line is held from the provider request until the call ends: ended(call_id)
+# from the provider's webhook, else LINE_HOLD_SECONDS after it was placed
+# (0, the default, frees it as soon as the provider accepts the call).
+
+LINE_CONCURRENCY = int(os.getenv("LINE_CONCURRENCY", "0"))
+LINE_PER_MINUTE = int(os.getenv("LINE_PER_MINUTE", "0"))
+LINE_HOLD_SECONDS = float(os.getenv("LINE_HOLD_SECONDS", "0"))
+LINE_MATCH_COUNTRY = os.getenv("LINE_MATCH_COUNTRY", "0") == "1"
+LINE_FAILURES = int(os.getenv("LINE_FAILURES", "3"))
+LINE_COOLDOWN = float(os.getenv("LINE_COOLDOWN", "30"))
+
+LINE_CALLS = counter("line_calls_total", "Calls placed per phone line", ("line",))
+LINE_FAILOVERS = counter("line_failovers_total", "Calls moved off a line after a provider error", ("provider",))
+LINES_BUSY = gauge("line_calls_held", "Calls currently holding a phone line", ("line",))
+LINE_WAIT = stage("line_wait")
+
+
+def calling_code(phone):
+    """'+919876543210' → '91'; '' when the code is not a known one."""
+    digits = str(phone or "").lstrip("+")
+    for length in (3, 2, 1):
+        if digits[:length] in COUNTRY_TIMEZONES:
+            return digits[:length]
+    return ""
+
+
+class PhoneLine:
+    """One caller ID and its live usage."""
+
+    def __init__(self, provider, id=None, number=None, country=None, concurrency=None, per_minute=None):
+        self.provider = provider
+        self.id = id or number
+        self.number = number
+        self.country = str(country).lstrip("+") if country else calling_code(number)
+        self.concurrency = int(LINE_CONCURRENCY if concurrency is None else concurrency)
+        self.per_minute = int(LINE_PER_MINUTE if per_minute is None else per_minute)
+        self.held = 0
+        self.started = deque()  # monotonic start times within the last minute
+        self.placed = 0
+        self.failed = 0
+        self.failures = 0       # consecutive
+        self.resting_until = 0.0
+
+    def __repr__(self):
+        return f"{self.provider}:{self.number or self.id}"
+
+    def load(self, now, minute=60.0):
+        while self.started and now - self.started[0] >= minute:
+            self.started.popleft()
+        load = self.held / self.concurrency if self.concurrency else 0.0
+        if self.per_minute:
+            load = max(load, len(self.started) / self.per_minute)
+        return load
+
+    def free_at(self, now, minute=60.0):
+        """When the line next has room: now, a minute-window slot opening, or None (once a call ends)."""
+        self.load(now, minute)
+        if self.per_minute and len(self.started) >= self.per_minute:
+            return self.started[0] + minute
+        return now if not self.concurrency or self.held < self.concurrency else None
+
+
+def vapi_caller(line):
+    """calls.create arguments for dialing from `line`: a Vapi phone number, or a Twilio number Vapi dials through."""
+    if line.provider == "twilio":
+        return {"phone_number": {
+            "twilioPhoneNumber": line.number,
+            "twilioAccountSid": os.getenv("TWILIO_ACCOUNT_SID"),
+            "twilioAuthToken": os.getenv("TWILIO_AUTH_TOKEN"),
+        }}
+    return {"phone_number_id": line.id}
+
+
+class LinePool:
+    """
+    Routes calls over a pool of PhoneLines.
+
+    call(phone, dial) runs `dial(line)` (the provider request for one line)
+    on the best line for `phone`, failing over to other lines on provider
+    errors, and returns its result. The line stays held until ended(call_id)
+    or `hold` seconds; `call_id` reads the provider's id from the result.
+    `minute` is the per_minute window in seconds (shorter in simulations).
+    """
+
+    def __init__(self, lines, hold=None, match_country=None, failures=None, cooldown=None, minute=60.0,
+                 call_id=lambda result: getattr(result, "id", None) or getattr(result, "sid", None)):
+        if not lines:
+            raise ValueError("No phone lines to dial from: set PHONE_LINES, PHONE_NUMBER_ID or TWILIO_NUMBER")
+        self.lines = list(lines)
+        self.hold = LINE_HOLD_SECONDS if hold is None else hold
+        self.match_country = LINE_MATCH_COUNTRY if match_country is None else match_country
+        self.failure_threshold = failures or LINE_FAILURES
+        self.cooldown = LINE_COOLDOWN if cooldown is None else cooldown
+        self.call_id = call_id
+        self.minute = minute
+        self.failovers = 0
+        self.wait_seconds = 0.0
+
+        self._held = {}  # call_id -> (line, release timer)
+        self._changed = asyncio.Event()  # set (and replaced) whenever a line frees up
+
+    @classmethod
+    def from_env(cls, providers=("vapi", "twilio"), **kwargs):
+        """
+        The PHONE_LINES pool (only lines of `providers`), else the
+        PHONE_NUMBER_ID / TWILIO_NUMBER lines, also when PHONE_LINES holds
+        none of `providers`. ValueError when no line is left.
+        """
+        spec = os.getenv("PHONE_LINES", "").strip()
+        if spec and not spec.startswith("["):
+            with open(spec, encoding="utf-8") as f:
+                spec = f.read()
+        lines = [PhoneLine(**line) for line in json.loads(spec)] if spec else []
+        lines = [line for line in lines if line.provider in providers]
+        if not lines:
+            if os.getenv("PHONE_NUMBER_ID") and "vapi" in providers:
+                lines.append(PhoneLine("vapi", id=os.getenv("PHONE_NUMBER_ID")))
+            if os.getenv("TWILIO_NUMBER") and "twilio" in providers:
+                lines.append(PhoneLine("twilio", number=os.getenv("TWILIO_NUMBER")))
+        return cls(lines, **kwargs)
+
+    # ---- routing ----
+
+    def _preferred(self, phone, up, avoid):
+        others = [line for line in up if line.provider not in avoid]
+        up = others or up
+        if self.match_country:
+            code = calling_code(phone)
+            up = [line for line in up if line.country == code] or up
+        return up
+
+    async def acquire(self, phone, tried=(), avoid=(), wait_resting=True):
+        """
+        The least-loaded line with room for `phone`, waiting for one. None once
+        every line is tried, or resting and `wait_resting` is off.
+        """
+        waited_from = None
+        while True:
+            now = time.monotonic()
+            untried = [line for line in self.lines if line not in tried]
+            up = [line for line in untried if line.resting_until <= now]
+            if not up and not (untried and wait_resting):
+                return None
+            candidates = self._preferred(phone, up, avoid)
+            free = [line for line in candidates if line.free_at(now, self.minute) == now]
+            if free:
+                line = min(free, key=lambda line: (line.load(now, self.minute), line.placed))
+                line.held += 1
+                line.started.append(now)
+                LINES_BUSY.labels(repr(line)).inc()
+                if waited_from is not None:
+                    waited = now - waited_from
+                    self.wait_seconds += waited
+                    LINE_WAIT.observe(waited)
+                return line
+
+            # Every candidate is full (or resting): wait for a call to end, a
+            # minute-window slot to open or a line to come back
+            waited_from = waited_from or now
+            opens = [t for t in (line.free_at(now, self.minute) for line in candidates) if t is not None]
+            opens += [line.resting_until for line in untried if line.resting_until > now]
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), max(0.001, min(opens) - now) if opens else None)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, line):
+        line.held -= 1
+        LINES_BUSY.labels(repr(line)).dec()
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def ended(self, call_id):
+        """The provider reported the call over: free its line now."""
+        held = self._held.pop(call_id, None)
+        if held:
+            line, timer = held
+            if timer:
+                timer.cancel()
+            self.release(line)
+
+    def _keep(self, line, result):
+        call_id = self.call_id(result)
+        if not self.hold or not call_id:
+            self.release(line)
+            return
+        timer = asyncio.get_running_loop().call_later(self.hold, self.ended, call_id)
+        self._held[call_id] = (line, timer)
+
+    # ---- placing calls ----
+
+    async def call(self, phone, dial):
+        tried, avoid = set(), set()
+        error = None
+        while True:
+            # After a failure, don't sit out a cooldown: let the submitter back off
+            line = await self.acquire(phone, tried, avoid, wait_resting=error is None)
+            if line is None:
+                raise error or RuntimeError("No phone line is available")
+            tried.add(line)
+            placed = False
+            try:
+                result = await dial(line)
+                placed = True
+            except Exception as e:
+                line.failed += 1
+                kind = classify(e)
+                if kind == PERMANENT:
+                    raise  # the request was bad, not the line
+                error = e
+                if kind == RATE_LIMIT:
+                    line.resting_until = time.monotonic() + (retry_after(e) or 1.0)
+                else:
+                    avoid.add(line.provider)
+                    line.failures += 1
+                    if line.failures >= self.failure_threshold:
+                        line.resting_until = time.monotonic() + self.cooldown
+                        if line.failures == self.failure_threshold:
+                            log("line_resting", f"⛔ Line {line} failed {line.failures} times in a row; "
+                                f"resting it {self.cooldown:g}s at a time",
+                                line=repr(line), failures=line.failures, cooldown=self.cooldown)
+                self.failovers += 1
+                LINE_FAILOVERS.labels(line.provider).inc()
+                continue
+            finally:
+                if not placed:
+                    self.release(line)  # failed, or cancelled mid-request
+            line.failures = 0
+            line.placed += 1
+            LINE_CALLS.labels(repr(line)).inc()
+            self._keep(line, result)
+            return result
+
+    def stats(self):
+        return {
+            "lines": {
+                repr(line): {"placed": line.placed, "failed": line.failed, "held": line.held,
+                             "resting": line.resting_until > time.monotonic()}
+                for line in self.lines
+            },
+            "failovers": self.failovers,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+    def summary(self):
+        placed = ", ".join(f"{line} {line.placed}" for line in self.lines)
+        return (f"{len(self.lines)} lines ({placed}), {self.failovers} failovers, "
+                f"waited {self.wait_seconds:.2f}s for a free line")
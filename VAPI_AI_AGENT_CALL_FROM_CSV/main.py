@@ -1,97 +1,141 @@
-import os
-import pandas as pd
-from dotenv import load_dotenv
-from vapi import Vapi
-
-# Load .env
-load_dotenv()
-
-VAPI_API_KEY = os.getenv("VAPI_API_KEY")
-PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")
-ASSISTANT_ID = os.getenv("ASSISTANT_ID")
-
-if not all([VAPI_API_KEY, PHONE_NUMBER_ID, ASSISTANT_ID]):
-    raise ValueError("Missing VAPI_API_KEY, PHONE_NUMBER_ID, or ASSISTANT_ID in .env")
-
-# Initialize Vapi client
-client = Vapi(token=VAPI_API_KEY)
-
-# Load abandoned cart CSV
-df = pd.read_csv("abandoned_cart.csv", dtype={"phone": str})
-
-# Prepare log file
-log_file = "call_logs.csv"
-if not os.path.exists(log_file):
-    with open(log_file, "w") as f:
-        f.write("timestamp,name,number,items,total,reason,language,status,call_id,call_duration,call_ended_reason\n")
-
-print(f"🚀 Starting calls for {len(df)} abandoned carts...\n")
-
-# Iterate over customers
-for idx, row in df.iterrows():
-    phone = row["phone"].strip()
-    name = row["name"]
-    items = row["items"]
-    total = row["total"]
-    reason = row["reason"]
-    language = row["language"]
-
-    if not phone.startswith("+"):
-        print(f"❌ Skipping invalid phone number: {phone}")
-        continue
-
-    try:
-        # Create personalized first message for the assistant
-        personalized_message = (
-            f"Hi {name}! I'm calling from the store. "
-            f"I noticed you left {items} in your cart for {total}. "
-            f"I wanted to reach out and see if you need any help completing your purchase. "
-            f"Is there anything I can assist you with today?"
-        )
-
-        # Create call with assistant overrides
-        call = client.calls.create(
-            assistant_id=ASSISTANT_ID,
-            phone_number_id=PHONE_NUMBER_ID,
-            customer={
-                "number": phone,
-                "name": name
-            },
-            assistant_overrides={
-                "firstMessage": personalized_message,
-                "variableValues": {
-                    "customerName": name,
-                    "items": items,
-                    "total": total,
-                    "cartReason": reason
-                }
-            }
-        )
-
-        status = "initiated"
-        call_id = call.id if hasattr(call, 'id') else "unknown"
-        call_duration = "pending"
-        call_ended_reason = "in_progress"
-        
-        print(f"✅ Call initiated for {name} → {phone}")
-        print(f"   Call ID: {call_id}")
-        print(f"   Items: {items} | Total: {total}\n")
-
-    except Exception as e:
-        status = "failed"
-        call_id = "N/A"
-        call_duration = "0"
-        call_ended_reason = str(e)
-        print(f"❌ Call failed for {name} → {phone}")
-        print(f"   Error: {e}\n")
-
-    # Append to log file
-    with open(log_file, "a") as f:
-        f.write(
-            f"{pd.Timestamp.now()},{name},{phone},{items},{total},{reason},{language},{status},{call_id},{call_duration},{call_ended_reason}\n"
-        )
-
-print("=" * 60)
-print(f"✓ Completed processing {len(df)} customers")
-print(f"✓ Call logs saved to: {log_file}")
+import os
+import asyncio
+from datetime import datetime
+from dotenv import load_dotenv
+from vapi import AsyncVapi
+from dialer import dial_all
+from cart_reader import CartReader
+from campaign_journal import CampaignJournal
+from call_submitter import CallSubmitter
+from call_log import CallLogSink, CALL_LOG_FIELDS
+from script_prefetch import PREFETCH_DEPTH, ScriptPrefetcher, static_message
+from line_pool import LinePool, vapi_caller
+from metrics import log, write_snapshots
+
+# Load .env
+load_dotenv()
+
+VAPI_API_KEY = os.getenv("VAPI_API_KEY")
+PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")
+ASSISTANT_ID = os.getenv("ASSISTANT_ID")
+# Point at the output of phone_prep.py to dial normalized, deduplicated carts
+CART_FILE = os.getenv("CART_FILE", "abandoned_cart.csv")
+
+if not all([VAPI_API_KEY, PHONE_NUMBER_ID or os.getenv("PHONE_LINES"), ASSISTANT_ID]):
+    raise ValueError("Missing VAPI_API_KEY, PHONE_NUMBER_ID (or PHONE_LINES), or ASSISTANT_ID in .env")
+
+# Initialize async Vapi client (VAPI_BASE_URL lets us point at a local fake server)
+client = AsyncVapi(token=VAPI_API_KEY, base_url=os.getenv("VAPI_BASE_URL"))
+
+# Retries 429s/5xx with backoff, adapts DIAL_RATE to 429s, pauses the campaign while Vapi is down
+submitter = CallSubmitter()
+
+# Caller IDs to dial from: PHONE_LINES (Vapi and Twilio numbers, each with its own
+# limits), else PHONE_NUMBER_ID. Each call goes to the least-loaded line with room
+# and fails over to another provider's line on errors (see line_pool.py)
+lines = LinePool.from_env()
+
+# Checkpoint journal: a rerun resumes at the first unfinished row and skips phones already dialed
+journal = CampaignJournal(source=CART_FILE)
+
+# Stream abandoned cart CSV (rows are read lazily as the dialer needs them)
+carts = CartReader(CART_FILE, start=journal.resume_offset)
+
+# With PREFETCH_DEPTH > 0, the first message is written by the LLM for each
+# customer, PREFETCH_DEPTH carts ahead of the dialer (needs GROQ_API_KEY)
+prefetcher = ScriptPrefetcher() if PREFETCH_DEPTH > 0 else None
+
+# Prepare log file (buffered, quoted CSV shared by all dial workers)
+log_file = "call_logs.csv"
+call_log = CallLogSink(log_file, CALL_LOG_FIELDS)
+
+# Counters, gauges and per-stage latencies, written to METRICS_SNAPSHOT every few seconds
+metrics_file = write_snapshots()
+
+print(f"🚀 Starting calls for abandoned carts in {carts.path}...\n")
+
+# Place one call and log it
+async def place_call(cart):
+    phone = cart.phone
+    name = cart.name
+    items = cart.items
+    total = cart.total
+    reason = cart.reason
+    language = cart.language
+
+    try:
+        # Create personalized first message for the assistant (already generated when prefetching)
+        personalized_message = prefetcher.first_message(cart) if prefetcher else static_message(cart)
+
+        # Create call with assistant overrides, from whichever line the pool picks
+        call = await submitter.submit(lines.call, phone, lambda line: client.calls.create(
+            assistant_id=ASSISTANT_ID,
+            **vapi_caller(line),
+            customer={
+                "number": phone,
+                "name": name
+            },
+            assistant_overrides={
+                "firstMessage": personalized_message,
+                "variableValues": {
+                    "customerName": name,
+                    "items": items,
+                    "total": total,
+                    "cartReason": reason
+                }
+            }
+        ))
+
+        status = "initiated"
+        call_id = call.id if hasattr(call, 'id') else "unknown"
+        call_duration = "pending"
+        call_ended_reason = "in_progress"
+        
+        log("call_initiated",
+            f"✅ Call initiated for {name} → {phone}\n"
+            f"   Call ID: {call_id}\n"
+            f"   Items: {items} | Total: {total}\n",
+            phone=phone, call_id=call_id, total=total)
+
+    except Exception as e:
+        status = "failed"
+        call_id = "N/A"
+        call_duration = "0"
+        call_ended_reason = str(e)
+        log("call_failed", f"❌ Call failed for {name} → {phone}\n   Error: {e}\n",
+            phone=phone, error=str(e))
+
+    # Append to log file
+    call_log.write({
+        "timestamp": datetime.now(),
+        "name": name,
+        "number": phone,
+        "items": items,
+        "total": total,
+        "reason": reason,
+        "language": language,
+        "status": status,
+        "call_id": call_id,
+        "call_duration": call_duration,
+        "call_ended_reason": call_ended_reason
+    })
+
+    return status == "initiated"
+
+
+# Dial concurrently: DIAL_CONCURRENCY calls in flight, paced at DIAL_RATE calls/sec
+stats = asyncio.run(dial_all(carts, place_call, journal=journal, submitter=submitter, prefetcher=prefetcher))
+call_log.close()
+journal.close()
+
+print("=" * 60)
+print(f"✓ Completed processing {carts.rows_read} customers ({carts.skipped} skipped)")
+print(f"✓ Throughput: {stats.summary()}")
+print(f"✓ Checkpoint: {journal.summary()}")
+print(f"✓ Retries: {submitter.summary()}")
+print(f"✓ Phone lines: {lines.summary()}")
+if prefetcher:
+    print(f"✓ First messages: {prefetcher.summary()}")
+print(f"✓ Call logs saved to: {log_file}")
+print(f"✓ Metrics snapshot: {metrics_file}")
 print("=" * 60)
\ No newline at end of file
@@ -1,330 +1,226 @@
-import os
-import pandas as pd
-import time
-from datetime import datetime
-from dotenv import load_dotenv
-from vapi import Vapi
-
-# Load .env
-load_dotenv()
-
-VAPI_API_KEY = os.getenv("VAPI_API_KEY")
-PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")
-ASSISTANT_ID = os.getenv("ASSISTANT_ID")
-
-if not all([VAPI_API_KEY, PHONE_NUMBER_ID, ASSISTANT_ID]):
-    raise ValueError("Missing VAPI_API_KEY, PHONE_NUMBER_ID, or ASSISTANT_ID in .env")
-
-# Initialize Vapi client
-client = Vapi(token=VAPI_API_KEY)
-
-# Load abandoned cart CSV
-df = pd.read_csv("abandoned_cart.csv", dtype={"phone": str})
-
-# Enhanced log file with comprehensive tracking
-log_file = "call_logs_detailed.csv"
-
-# Create detailed CSV header if file doesn't exist
-if not os.path.exists(log_file):
-    with open(log_file, "w") as f:
-        headers = [
-            # Basic Info
-            "timestamp",
-            "call_date",
-            "call_time",
-            "customer_name",
-            "customer_phone",
-            
-            # Cart Info
-            "cart_items",
-            "cart_total",
-            "cart_quantity",
-            "cart_abandoned_date",
-            "days_since_abandonment",
-            
-            # Call Status
-            "call_id",
-            "call_status",
-            "call_initiated",
-            "call_answered",
-            "call_duration_seconds",
-            "call_ended_reason",
-            
-            # Customer Response
-            "customer_sentiment",
-            "customer_interest_level",
-            "customer_engagement_score",
-            
-            # Objections & Reasons
-            "primary_objection",
-            "secondary_objection",
-            "objection_details",
-            "price_concern",
-            "quality_concern",
-            "timing_concern",
-            "technical_issue",
-            "competitor_mention",
-            "changed_mind",
-            "not_interested",
-            "just_browsing",
-            
-            # Conversion Info
-            "conversion_result",
-            "purchase_completed",
-            "purchase_amount",
-            "discount_offered",
-            "discount_accepted",
-            "discount_amount",
-            
-            # AI Performance
-            "ai_technique_used",
-            "objection_handled_successfully",
-            "rapport_established",
-            "follow_up_scheduled",
-            "follow_up_date",
-            
-            # Customer Behavior
-            "callback_requested",
-            "voicemail_left",
-            "hung_up_early",
-            "call_back_attempts",
-            "previous_contact_count",
-            
-            # Additional Data
-            "customer_language",
-            "customer_location",
-            "customer_timezone",
-            "time_of_day",
-            "day_of_week",
-            
-            # Notes & Learning
-            "call_notes",
-            "ai_learnings",
-            "improvement_suggestions",
-            "script_effectiveness_rating"
-        ]
-        f.write(",".join(headers) + "\n")
-
-print(f"🚀 Starting enhanced call tracking for {len(df)} abandoned carts...\n")
-print(f"📊 Detailed analytics will be saved to: {log_file}\n")
-
-# Iterate over customers
-for idx, row in df.iterrows():
-    phone = row["phone"].strip()
-    name = row["name"]
-    items = row["items"]
-    total = row["total"]
-    reason = row.get("reason", "Unknown")
-    language = row.get("language", "en")
-
-    if not phone.startswith("+"):
-        print(f"❌ Skipping invalid phone number: {phone}")
-        continue
-
-    # Get current timestamp
-    now = datetime.now()
-    call_date = now.strftime("%Y-%m-%d")
-    call_time = now.strftime("%H:%M:%S")
-    day_of_week = now.strftime("%A")
-    time_of_day = "Morning" if now.hour < 12 else "Afternoon" if now.hour < 17 else "Evening"
-
-    try:
-        # Create call with enhanced metadata
-        call = client.calls.create(
-            assistant_id=ASSISTANT_ID,
-            phone_number_id=PHONE_NUMBER_ID,
-            customer={
-                "number": phone,
-                "name": name
-            },
-            assistant_overrides={
-                "variableValues": {
-                    "customerName": name,
-                    "items": items,
-                    "total": total,
-                    "cartReason": reason,
-                    "language": language,
-                    "callDate": call_date,
-                    "callTime": call_time
-                }
-            }
-        )
-
-        call_id = call.id if hasattr(call, 'id') else "unknown"
-        
-        # Initialize default values (these will be updated after call completes)
-        log_data = {
-            # Basic Info
-            "timestamp": now,
-            "call_date": call_date,
-            "call_time": call_time,
-            "customer_name": name,
-            "customer_phone": phone,
-            
-            # Cart Info
-            "cart_items": items,
-            "cart_total": total,
-            "cart_quantity": items.split("x")[1] if "x" in items else "1",
-            "cart_abandoned_date": "Unknown",
-            "days_since_abandonment": "Unknown",
-            
-            # Call Status
-            "call_id": call_id,
-            "call_status": "initiated",
-            "call_initiated": "Yes",
-            "call_answered": "Pending",
-            "call_duration_seconds": "0",
-            "call_ended_reason": "in_progress",
-            
-            # Customer Response
-            "customer_sentiment": "Pending",
-            "customer_interest_level": "Pending",
-            "customer_engagement_score": "Pending",
-            
-            # Objections & Reasons (Initialize all as No)
-            "primary_objection": "Pending",
-            "secondary_objection": "None",
-            "objection_details": "Pending",
-            "price_concern": "No",
-            "quality_concern": "No",
-            "timing_concern": "No",
-            "technical_issue": "No",
-            "competitor_mention": "No",
-            "changed_mind": "No",
-            "not_interested": "No",
-            "just_browsing": "No",
-            
-            # Conversion Info
-            "conversion_result": "Pending",
-            "purchase_completed": "No",
-            "purchase_amount": "0",
-            "discount_offered": "No",
-            "discount_accepted": "No",
-            "discount_amount": "0",
-            
-            # AI Performance
-            "ai_technique_used": "Barnum Effect, Reciprocity",
-            "objection_handled_successfully": "Pending",
-            "rapport_established": "Pending",
-            "follow_up_scheduled": "No",
-            "follow_up_date": "None",
-            
-            # Customer Behavior
-            "callback_requested": "No",
-            "voicemail_left": "No",
-            "hung_up_early": "No",
-            "call_back_attempts": "1",
-            "previous_contact_count": "0",
-            
-            # Additional Data
-            "customer_language": language,
-            "customer_location": "Unknown",
-            "customer_timezone": "Unknown",
-            "time_of_day": time_of_day,
-            "day_of_week": day_of_week,
-            
-            # Notes & Learning
-            "call_notes": f"Call initiated to {name} for {items}",
-            "ai_learnings": "To be updated after call completion",
-            "improvement_suggestions": "To be analyzed",
-            "script_effectiveness_rating": "Pending"
-        }
-        
-        print(f"✅ Call initiated for {name} → {phone}")
-        print(f"   Call ID: {call_id}")
-        print(f"   Items: {items} | Total: {total}")
-        print(f"   Day: {day_of_week} | Time: {time_of_day}\n")
-        
-        # Write to CSV
-        with open(log_file, "a") as f:
-            f.write(",".join([str(log_data[h]) for h in log_data.keys()]) + "\n")
-
-        # Small delay to avoid rate limiting
-        time.sleep(2)
-
-    except Exception as e:
-        error_log = {
-            "timestamp": now,
-            "call_date": call_date,
-            "call_time": call_time,
-            "customer_name": name,
-            "customer_phone": phone,
-            "cart_items": items,
-            "cart_total": total,
-            "cart_quantity": "Unknown",
-            "cart_abandoned_date": "Unknown",
-            "days_since_abandonment": "Unknown",
-            "call_id": "N/A",
-            "call_status": "failed",
-            "call_initiated": "Yes",
-            "call_answered": "No",
-            "call_duration_seconds": "0",
-            "call_ended_reason": f"Error: {str(e)}",
-            "customer_sentiment": "Unknown",
-            "customer_interest_level": "Unknown",
-            "customer_engagement_score": "0",
-            "primary_objection": "Technical Error",
-            "secondary_objection": "None",
-            "objection_details": str(e),
-            "price_concern": "No",
-            "quality_concern": "No",
-            "timing_concern": "No",
-            "technical_issue": "Yes",
-            "competitor_mention": "No",
-            "changed_mind": "No",
-            "not_interested": "No",
-            "just_browsing": "No",
-            "conversion_result": "Failed",
-            "purchase_completed": "No",
-            "purchase_amount": "0",
-            "discount_offered": "No",
-            "discount_accepted": "No",
-            "discount_amount": "0",
-            "ai_technique_used": "None - Call Failed",
-            "objection_handled_successfully": "No",
-            "rapport_established": "No",
-            "follow_up_scheduled": "No",
-            "follow_up_date": "None",
-            "callback_requested": "No",
-            "voicemail_left": "No",
-            "hung_up_early": "No",
-            "call_back_attempts": "1",
-            "previous_contact_count": "0",
-            "customer_language": language,
-            "customer_location": "Unknown",
-            "customer_timezone": "Unknown",
-            "time_of_day": time_of_day,
-            "day_of_week": day_of_week,
-            "call_notes": f"Call failed: {str(e)}",
-            "ai_learnings": "System error - needs investigation",
-            "improvement_suggestions": "Fix technical issues",
-            "script_effectiveness_rating": "0"
-        }
-        
-        print(f"❌ Call failed for {name} → {phone}")
-        print(f"   Error: {e}\n")
-        
-        with open(log_file, "a") as f:
-            f.write(",".join([str(error_log[h]) for h in error_log.keys()]) + "\n")
-
-print("=" * 70)
-print(f"✓ Completed processing {len(df)} customers")
-print(f"✓ Detailed call logs saved to: {log_file}")
-print("=" * 70)
-
-print("\n📊 TRACKED VARIABLES (58 data points per call):")
-print("""
-✅ BASIC INFO (5): timestamp, date, time, name, phone
-✅ CART DATA (5): items, total, quantity, abandoned date, days since
-✅ CALL STATUS (6): ID, status, initiated, answered, duration, end reason
-✅ SENTIMENT (3): sentiment, interest level, engagement score
-✅ OBJECTIONS (11): primary, secondary, price, quality, timing, technical, 
-                    competitor, changed mind, not interested, browsing
-✅ CONVERSION (6): result, completed, amount, discount offered/accepted/amount
-✅ AI PERFORMANCE (5): technique used, objection handled, rapport, follow-up
-✅ BEHAVIOR (6): callback requested, voicemail, hung up, attempts, previous contacts
-✅ CONTEXT (5): language, location, timezone, time of day, day of week
-✅ LEARNING (4): notes, AI learnings, improvements, effectiveness rating
-
-Total: 58 variables for comprehensive AI learning!
+import os
+import asyncio
+from datetime import datetime
+from dotenv import load_dotenv
+from vapi import AsyncVapi
+from dialer import dial_all
+from cart_reader import CartReader
+from campaign_journal import CampaignJournal
+from call_submitter import CallSubmitter
+from contact_index import ContactIndex
+from scheduler import CallScheduler, cart_timezone, day_period
+from call_log import CallLogSink, CallRecord, DETAILED_LOG_FIELDS
+from line_pool import LinePool, vapi_caller
+from metrics import log, stage, write_snapshots
+
+# Load .env
+load_dotenv()
+
+VAPI_API_KEY = os.getenv("VAPI_API_KEY")
+PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")
+ASSISTANT_ID = os.getenv("ASSISTANT_ID")
+# Point at the output of phone_prep.py to dial normalized, deduplicated carts
+CART_FILE = os.getenv("CART_FILE", "abandoned_cart.csv")
+
+if not all([VAPI_API_KEY, PHONE_NUMBER_ID or os.getenv("PHONE_LINES"), ASSISTANT_ID]):
+    raise ValueError("Missing VAPI_API_KEY, PHONE_NUMBER_ID (or PHONE_LINES), or ASSISTANT_ID in .env")
+
+# Initialize async Vapi client (VAPI_BASE_URL lets us point at a local fake server)
+client = AsyncVapi(token=VAPI_API_KEY, base_url=os.getenv("VAPI_BASE_URL"))
+
+# Retries 429s/5xx with backoff, adapts DIAL_RATE to 429s, pauses the campaign while Vapi is down
+submitter = CallSubmitter()
+
+# Caller IDs to dial from: PHONE_LINES (Vapi and Twilio numbers, each with its own
+# limits), else PHONE_NUMBER_ID. Each call goes to the least-loaded line with room
+# and fails over to another provider's line on errors (see line_pool.py)
+lines = LinePool.from_env()
+
+# Checkpoint journal: a rerun resumes at the first unfinished row and skips phones already dialed
+journal = CampaignJournal(source=CART_FILE)
+
+# Contact history per number: fills previous_contact_count / call_back_attempts
+# and, with CONTACT_CAP set, skips numbers already called that often recently
+contacts = ContactIndex()
+CALLBACK_WINDOW_HOURS = float(os.getenv("CALLBACK_WINDOW_HOURS", "72"))
+CONTACT_CAP = int(os.getenv("CONTACT_CAP", "0"))  # 0 = no cap
+CONTACT_CAP_HOURS = float(os.getenv("CONTACT_CAP_HOURS", "24"))
+
+# Stream abandoned cart CSV (rows are read lazily as the dialer needs them)
+carts = CartReader(CART_FILE, start=journal.resume_offset)
+
+# Workers pull whoever is inside their local calling window (CALL_WINDOW_START
+# to CALL_WINDOW_END), highest cart value first, instead of going in file order
+scheduler = CallScheduler()
+
+# Enhanced log file with comprehensive tracking
+log_file = "call_logs_detailed.csv"
+
+# Buffered, quoted CSV writer shared by all dial workers (writes the header if new)
+call_log = CallLogSink(log_file, DETAILED_LOG_FIELDS)
+
+# Optional typed, date-partitioned Parquet copy for analytics (needs pyarrow)
+parquet_dir = os.getenv("PARQUET_LOG_DIR")
+parquet_log = None
+if parquet_dir:
+    from call_log_parquet import ParquetCallLogSink
+    parquet_log = ParquetCallLogSink(parquet_dir)
+
+# Optional SQLite store with the Guide_2 schema (customer, cart, interaction, ...),
+# for lookups by phone / call_id / date without scanning the CSV
+store_path = os.getenv("CALL_STORE")
+call_store = None
+if store_path:
+    from call_store import CallStore
+    call_store = CallStore(store_path)
+
+# Counters, gauges and per-stage latencies, written to METRICS_SNAPSHOT every few seconds
+metrics_file = write_snapshots()
+PAYLOAD_BUILD = stage("payload_build")
+LOG_WRITE = stage("log_write")
+
+print(f"🚀 Starting enhanced call tracking for abandoned carts in {carts.path}...\n")
+print(f"📊 Detailed analytics will be saved to: {log_file}\n")
+
+# Place one call and log it
+async def place_call(cart):
+    phone = cart.phone
+    name = cart.name
+    items = cart.items
+    total = cart.total
+    reason = cart.reason
+    language = cart.language
+
+    # "Has this customer already been called today?" - one index lookup, no log scan
+    if CONTACT_CAP and contacts.calls_since(phone, CONTACT_CAP_HOURS) >= CONTACT_CAP:
+        log("call_skipped", f"⏭️ Skipping {name} → {phone}: already called {CONTACT_CAP}x in the last {CONTACT_CAP_HOURS:g}h\n",
+            phone=phone, reason="contact_cap")
+        return None
+    previous_contact_count = contacts.calls_since(phone)
+    call_back_attempts = contacts.calls_since(phone, CALLBACK_WINDOW_HOURS) + 1
+
+    # Get current timestamp (server time), and the customer's local time
+    now = datetime.now()
+    call_date = now.strftime("%Y-%m-%d")
+    call_time = now.strftime("%H:%M:%S")
+    tz = cart_timezone(cart)
+    local_now = datetime.now(tz)
+    day_of_week = local_now.strftime("%A")
+    time_of_day = day_period(local_now)
+
+    with PAYLOAD_BUILD.time():
+        # Columns known before the call is placed; the outcome columns start as
+        # "Pending" (call_log.PENDING_CALL) and are filled in later from webhooks
+        record = CallRecord(
+            timestamp=now, call_date=call_date, call_time=call_time,
+            customer_name=name, customer_phone=phone, cart_items=items, cart_total=total,
+            call_back_attempts=str(call_back_attempts), previous_contact_count=str(previous_contact_count),
+            customer_language=language, customer_timezone=tz.key,
+            time_of_day=time_of_day, day_of_week=day_of_week,
+        )
+        assistant_overrides = {
+            "variableValues": {
+                "customerName": name,
+                "items": items,
+                "total": total,
+                "cartReason": reason,
+                "language": language,
+                "callDate": call_date,
+                "callTime": call_time
+            }
+        }
+
+    try:
+        # Create call with enhanced metadata, from whichever line the pool picks
+        call = await submitter.submit(lines.call, phone, lambda line: client.calls.create(
+            assistant_id=ASSISTANT_ID,
+            **vapi_caller(line),
+            customer={
+                "number": phone,
+                "name": name
+            },
+            assistant_overrides=assistant_overrides
+        ))
+
+        call_id = call.id if hasattr(call, 'id') else "unknown"
+        
+        record.call_id = call_id
+        record.cart_quantity = items.split("x")[1] if "x" in items else "1"
+        record.call_notes = f"Call initiated to {name} for {items}"
+        
+        log("call_initiated",
+            f"✅ Call initiated for {name} → {phone}\n"
+            f"   Call ID: {call_id}\n"
+            f"   Items: {items} | Total: {total}\n"
+            f"   Day: {day_of_week} | Time: {time_of_day}\n",
+            phone=phone, call_id=call_id, total=total)
+        
+        contacts.record(phone, now)
+
+        # Write to CSV
+        with LOG_WRITE.time():
+            call_log.write(record)
+            if parquet_log:
+                parquet_log.write(record)
+            if call_store:
+                call_store.write(record, reason=reason)
+
+        return True
+
+    except Exception as e:
+        record.mark_failed(e)
+        
+        log("call_failed", f"❌ Call failed for {name} → {phone}\n   Error: {e}\n",
+            phone=phone, error=str(e))
+        
+        with LOG_WRITE.time():
+            call_log.write(record)
+            if parquet_log:
+                parquet_log.write(record)
+            if call_store:
+                call_store.write(record, reason=reason)
+
+        return False
+
+
+# Dial concurrently: DIAL_CONCURRENCY calls in flight, paced at DIAL_RATE calls/sec
+stats = asyncio.run(dial_all(carts, place_call, journal=journal, scheduler=scheduler, submitter=submitter))
+call_log.close()
+journal.close()
+contacts.close()
+if parquet_log:
+    parquet_log.close()
+if call_store:
+    call_store.close()
+
+print("=" * 70)
+print(f"✓ Completed processing {carts.rows_read} customers ({carts.skipped} skipped)")
+print(f"✓ Throughput: {stats.summary()}")
+print(f"✓ Checkpoint: {journal.summary()}")
+print(f"✓ Retries: {submitter.summary()}")
+print(f"✓ Scheduler: {scheduler.summary()}")
+print(f"✓ Phone lines: {lines.summary()}")
+print(f"✓ Detailed call logs saved to: {log_file}")
+if parquet_dir:
+    print(f"✓ Parquet analytics copy saved to: {parquet_dir}")
+if store_path:
+    print(f"✓ Call store (SQLite) updated: {store_path}")
+print(f"✓ Metrics snapshot: {metrics_file}")
+print("=" * 70)
+
+print("\n📊 TRACKED VARIABLES (58 data points per call):")
+print("""
+✅ BASIC INFO (5): timestamp, date, time, name, phone
+✅ CART DATA (5): items, total, quantity, abandoned date, days since
+✅ CALL STATUS (6): ID, status, initiated, answered, duration, end reason
+✅ SENTIMENT (3): sentiment, interest level, engagement score
+✅ OBJECTIONS (11): primary, secondary, price, quality, timing, technical, 
+                    competitor, changed mind, not interested, browsing
+✅ CONVERSION (6): result, completed, amount, discount offered/accepted/amount
+✅ AI PERFORMANCE (5): technique used, objection handled, rapport, follow-up
+✅ BEHAVIOR (6): callback requested, voicemail, hung up, attempts, previous contacts
+✅ CONTEXT (5): language, location, timezone, time of day, day of week
+✅ LEARNING (4): notes, AI learnings, improvements, effectiveness rating
+
+Total: 58 variables for comprehensive AI learning!
 """)
\ No newline at end of file
@@ -0,0 +1,311 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+_now = time.perf_counter
+_lock = threading.Lock()
+
+
+# ----------------------------
+# Metric Types
+# ----------------------------
+# Counters, gauges and fixed-bucket histograms, each optionally split by
+# labels (e.g. stage="provider_call"). Updates are plain attribute/list
+# writes without locks: the campaign scripts and the API record from one
+# event loop, and a lost increment from a background thread is acceptable
+# for monitoring. Adding a metric or a label series, and reading them all
+# for a render or snapshot, hold _lock: the snapshot thread must not walk a
+# dict that the event loop is growing. Rendered in the Prometheus text
+# format for /metrics and as JSON for the batch scripts' snapshot file.
+
+# Seconds: 50µs .. 60s, enough for a CSV row parse up to a Groq completion
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class _Metric:
+    __slots__ = ("name", "help", "labelnames", "_children")
+    kind = None
+
+    def __init__(self, name, help="", labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with _lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._child()
+        return child
+
+    def _series(self):
+        # (label values, metric) for every series of this metric
+        if self.labelnames:
+            return list(self._children.items())
+        return [((), self)]
+
+    def _label_text(self, values, extra=""):
+        pairs = [f'{k}="{v}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    __slots__ = ("value",)
+    kind = "counter"
+
+    def __init__(self, name, help="", labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.value = 0
+
+    def _child(self):
+        return Counter(self.name)
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def _render(self):
+        return [f"{self.name}{self._label_text(v)} {m.value}" for v, m in self._series()]
+
+    def _snapshot(self):
+        return self.value
+
+
+class Gauge(Counter):
+    __slots__ = ()
+    kind = "gauge"
+
+    def _child(self):
+        return Gauge(self.name)
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram. `with histogram.time():` times a block (about
+    1 µs per span, 0.7-1.1 µs in bench_metrics; half of that is the `with`
+    and the two clock reads); each span gets its own Timer, so concurrent
+    spans, e.g. across awaits, never share a start time.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+    kind = "histogram"
+
+    def __init__(self, name, help="", labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def _child(self):
+        return Histogram(self.name, buckets=self.buckets)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        """`with histogram.time():` records the block's duration."""
+        return Timer(self)
+
+    def quantile(self, q):
+        """
+        Estimate from the buckets, interpolating linearly inside the bucket
+        that holds the q-th value (as Prometheus' histogram_quantile does).
+        Values past the last bucket report its bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+    def _render(self):
+        lines = []
+        for values, m in self._series():
+            cumulative = 0
+            for bound, count in zip(m.buckets, m.counts):
+                cumulative += count
+                le = self._label_text(values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = self._label_text(values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {m.count}")
+            lines.append(f"{self.name}_sum{self._label_text(values)} {m.sum}")
+            lines.append(f"{self.name}_count{self._label_text(values)} {m.count}")
+        return lines
+
+    def _snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Timer:
+    """Context manager for one timed span; see Histogram.time()."""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Histogram.observe, inlined: one method call less per span
+        elapsed = _now() - self.start
+        h = self.histogram
+        h.counts[bisect_left(h.buckets, elapsed)] += 1
+        h.sum += elapsed
+        h.count += 1
+
+
+# ----------------------------
+# Registry
+# ----------------------------
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _get(self, cls, name, help, labelnames, **kwargs):
+        with _lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name, help="", labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name, help="", labelnames=()):
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help="", labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with _lock:
+            for metric in self._metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric._render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        snapshot = {}
+        with _lock:
+            for metric in self._metrics.values():
+                if metric.labelnames:
+                    snapshot[metric.name] = {
+                        ",".join(values): child._snapshot() for values, child in metric._children.items()
+                    }
+                else:
+                    snapshot[metric.name] = metric._snapshot()
+        return snapshot
+
+    def write_snapshot(self, path):
+        # Written to a temp file and renamed, so readers never see half a snapshot
+        data = {"written_at": datetime.now(timezone.utc).isoformat(), "metrics": self.snapshot()}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+# Per-stage latency of the calling hot path: csv_parse, payload_build,
+# provider_call, log_write, groq, twilio, ...
+STAGE_SECONDS = histogram("stage_seconds", "Time spent per pipeline stage", ("stage",))
+
+
+def stage(name):
+    """
+    The stage_seconds{stage=name} histogram; time a block with
+    `with stage("log_write").time():`. Hot loops can keep the returned
+    histogram instead of looking it up.
+    """
+    return STAGE_SECONDS.labels(name)
+
+
+def write_snapshots(path=None, interval=None):
+    """
+    Keep METRICS_SNAPSHOT (default metrics_snapshot.json) up to date every
+    `interval` seconds from a background thread, and once more at exit.
+    """
+    path = path or os.getenv("METRICS_SNAPSHOT", "metrics_snapshot.json")
+    interval = interval or float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "10"))
+    stopped = threading.Event()
+
+    def loop():
+        while not stopped.wait(interval):
+            # A failed write (disk full, ...) must not end the snapshots for the rest of the run
+            try:
+                REGISTRY.write_snapshot(path)
+            except Exception as e:
+                log("metrics_snapshot_failed", f"⚠️ Could not write metrics snapshot {path}: {e}",
+                    path=path, error=str(e))
+
+    def final():
+        stopped.set()
+        REGISTRY.write_snapshot(path)
+
+    threading.Thread(target=loop, daemon=True).start()
+    atexit.register(final)
+    return path
+
+
+# ----------------------------
+# Structured Logs
+# ----------------------------
+# log("call_failed", "❌ Call failed for ...", phone=..., error=...) prints the
+# human message as before, or with LOG_FORMAT=json one JSON object per line
+# (ts, event, message and the fields) for log shippers.
+LOG_JSON = os.getenv("LOG_FORMAT", "text").lower() == "json"
+
+
+def log(event, message="", **fields):
+    if LOG_JSON:
+        record = {"ts": datetime.now(timezone.utc).isoformat(), "event": event, "message": message, **fields}
+        sys.stdout.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+    else:
+        print(message or event)
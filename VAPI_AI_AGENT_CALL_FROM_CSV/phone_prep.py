@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# ----------------------------
+# Pre-dial Cart Preparation
+# ----------------------------
+# Runs once over the whole cart export before a campaign, with pandas string
+# ops over entire columns instead of per-row Python:
+#   - phones are stripped of separators and normalized to E.164
+#     (national numbers get DEFAULT_COUNTRY_CODE, "00" becomes "+")
+#   - malformed numbers are rejected
+#   - duplicate numbers collapse to the single highest-value cart
+#
+#   python phone_prep.py abandoned_cart.csv --out abandoned_cart_clean.csv
+#   CART_FILE=abandoned_cart_clean.csv python main3.py
+
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "91")
+NATIONAL_NUMBER_LENGTH = int(os.getenv("NATIONAL_NUMBER_LENGTH", "10"))
+
+E164 = r"^\+[1-9]\d{7,14}$"
+SEPARATORS = r"[\s\-().\/]"
+
+
+def normalize_phones(phones, country_code=DEFAULT_COUNTRY_CODE, national_length=NATIONAL_NUMBER_LENGTH):
+    """E.164 form of every phone in the series; <NA> where the number is malformed."""
+    phones = phones.astype("string[pyarrow]").str.replace(SEPARATORS, "", regex=True)
+    phones = phones.str.replace(r"^00", "+", regex=True)
+    # National numbers, with or without a leading trunk 0
+    national = phones.str.fullmatch(rf"0?\d{{{national_length}}}").fillna(False)
+    phones = phones.mask(national, "+" + country_code + phones.str.slice(start=-national_length))
+    return phones.where(phones.str.fullmatch(E164).fillna(False))
+
+
+def parse_totals(totals):
+    """Numeric value of currency strings like "$450", "₹1,299.00" or "Rs. 99"; NaN if unparseable."""
+    digits = totals.astype("string[pyarrow]").str.replace(r"[^\d.\-]", "", regex=True)
+    digits = digits.str.replace(r"^\.+|\.+$", "", regex=True)  # "Rs." leaves a stray dot
+    return digits.where(digits.str.fullmatch(r"-?\d+(\.\d+)?").fillna(False)).astype("float64")
+
+
+def prepare_carts(carts, phone_column="phone", total_column="total"):
+    """
+    Normalize, validate and dedup a cart frame.
+
+    Returns the cleaned frame in its original row order plus a report of how
+    many rows were read, rejected as malformed and dropped as duplicates.
+    """
+    carts = carts.copy()
+    carts[phone_column] = normalize_phones(carts[phone_column])
+    valid = carts[phone_column].notna()
+    rejected = int((~valid).sum())
+    carts = carts[valid]
+
+    # Walk the numbers highest value first, so the hash-based duplicated() keeps
+    # the best cart per number; only the phone column is reordered
+    values = parse_totals(carts[total_column]).fillna(-1.0).to_numpy()
+    order = (-values).argsort(kind="stable")
+    repeated = carts[phone_column].iloc[order].duplicated(keep="first").to_numpy()
+    keep = np.zeros(len(carts), dtype=bool)
+    keep[order[~repeated]] = True
+    unique = carts[keep]
+
+    report = {
+        "rows": int(valid.size),
+        "rejected": rejected,
+        "duplicates": int(len(carts) - len(unique)),
+        "kept": int(len(unique)),
+    }
+    return unique, report
+
+
+def prepare_csv(src, dst):
+    carts = pd.read_csv(src, dtype=str, keep_default_na=False)
+    clean, report = prepare_carts(carts)
+    clean.to_csv(dst, index=False)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Normalize, validate and dedup cart phones before dialing")
+    parser.add_argument("src", nargs="?", default="abandoned_cart.csv")
+    parser.add_argument("--out", default="abandoned_cart_clean.csv")
+    args = parser.parse_args()
+
+    report = prepare_csv(args.src, args.out)
+    print(f"✓ {report['rows']} rows → {report['kept']} to dial "
+          f"({report['rejected']} malformed, {report['duplicates']} duplicate numbers)")
+    print(f"✓ Saved to {args.out}")
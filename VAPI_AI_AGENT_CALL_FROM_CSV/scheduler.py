@@ -0,0 +1,217 @@
+import asyncio
+import heapq
+import itertools
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from metrics import Histogram, log
+
+
+# ----------------------------
+# Customer Time Zones
+# ----------------------------
+# A `timezone` column (IANA name) wins; otherwise the phone's country calling
+# code picks a representative zone. Countries spanning several zones get their
+# most populous one.
+COUNTRY_TIMEZONES = {
+    "1": "America/New_York", "7": "Europe/Moscow", "20": "Africa/Cairo",
+    "27": "Africa/Johannesburg", "33": "Europe/Paris", "34": "Europe/Madrid",
+    "39": "Europe/Rome", "44": "Europe/London", "49": "Europe/Berlin",
+    "52": "America/Mexico_City", "55": "America/Sao_Paulo", "61": "Australia/Sydney",
+    "62": "Asia/Jakarta", "63": "Asia/Manila", "65": "Asia/Singapore",
+    "81": "Asia/Tokyo", "82": "Asia/Seoul", "86": "Asia/Shanghai",
+    "91": "Asia/Kolkata", "92": "Asia/Karachi", "234": "Africa/Lagos",
+    "254": "Africa/Nairobi", "880": "Asia/Dhaka", "966": "Asia/Riyadh",
+    "971": "Asia/Dubai",
+}
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Asia/Kolkata")
+
+# Local hours in which a customer may be called: [start, end)
+CALL_WINDOW_START = int(os.getenv("CALL_WINDOW_START", "9"))
+CALL_WINDOW_END = int(os.getenv("CALL_WINDOW_END", "20"))
+
+# Carts read ahead of the dialer into the scheduler (0: the whole file)
+SCHEDULE_LOOKAHEAD = int(os.getenv("SCHEDULE_LOOKAHEAD", "10000"))
+
+# Seconds from a cart's window opening to its call: up to two days of waiting
+QUEUE_BUCKETS = (
+    0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 900, 1800, 2700, 3600, 5400,
+    7200, 10800, 14400, 21600, 28800, 43200, 64800, 86400, 172800,
+)
+
+
+@lru_cache(maxsize=None)
+def zone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def cart_timezone(cart):
+    explicit = zone(cart.timezone.strip()) if getattr(cart, "timezone", "") else None
+    if explicit:
+        return explicit
+    digits = cart.phone.lstrip("+")
+    for length in (3, 2, 1):
+        name = COUNTRY_TIMEZONES.get(digits[:length])
+        if name:
+            return zone(name)
+    return zone(DEFAULT_TIMEZONE)
+
+
+def day_period(local):
+    return "Morning" if local.hour < 12 else "Afternoon" if local.hour < 17 else "Evening"
+
+
+def next_window(tz, now, start=CALL_WINDOW_START, end=CALL_WINDOW_END):
+    """Epoch seconds at which calling someone in `tz` is next allowed (`now` if it already is)."""
+    local = datetime.fromtimestamp(now, tz)
+    if start <= local.hour < end:
+        return now
+    day = local.date() + timedelta(days=1 if local.hour >= end else 0)
+    return datetime(day.year, day.month, day.day, start, tzinfo=tz).timestamp()
+
+
+def cart_value(total):
+    digits = re.sub(r"[^\d.\-]", "", total or "").strip(".")
+    try:
+        return float(digits)
+    except ValueError:
+        return 0.0
+
+
+def cart_priority(cart):
+    """The dial list's `priority` when the row has one, else the cart's value."""
+    priority = getattr(cart, "priority", "")
+    if priority:
+        try:
+            return float(priority)
+        except ValueError:
+            pass
+    return cart_value(cart.total)
+
+
+# ----------------------------
+# Calling-window Scheduler
+# ----------------------------
+class CallScheduler:
+    """
+    Priority queue of carts keyed by each customer's next legal calling
+    window, then by priority (the dial list's `priority` column, else the
+    cart value).
+
+    Carts wait in a min-heap on the time their window opens; once it has
+    opened they move to a ready heap ordered by priority (highest first,
+    file order on ties). Workers pull with `await pop()`, so line capacity
+    always goes to the most valuable cart that is callable right now, and a
+    worker only sleeps when nobody is. A cart whose window closed while it
+    sat in the ready heap goes back to wait for its next window, so nobody is
+    dialed outside local calling hours. `clock` is injectable so the
+    scheduler can be driven in simulated time.
+
+    feed(carts) reads the carts lazily, keeping at most `lookahead` queued:
+    memory stays flat and the first call goes out after `lookahead` rows
+    rather than the whole file. The price is that ordering is only within
+    those rows; a better cart further down the file, or one callable now
+    while every queued cart waits for its window, is not seen until the
+    queue drains below `lookahead`. lookahead=0 (or extend()) queues
+    everything up front for a file-wide order.
+    """
+
+    def __init__(self, window_start=CALL_WINDOW_START, window_end=CALL_WINDOW_END, clock=time.time,
+                 lookahead=None):
+        self.window_start = window_start
+        self.window_end = window_end
+        self.clock = clock
+        self.lookahead = SCHEDULE_LOOKAHEAD if lookahead is None else lookahead
+        self.deferred = 0
+        self.peak_queued = 0
+        self.queue_latency = Histogram("scheduler_queue_seconds", buckets=QUEUE_BUCKETS)
+
+        self._waiting = []  # (opens, -priority, seq, cart, tz)
+        self._ready = []    # (-priority, seq, opens, cart, tz)
+        self._seq = itertools.count()
+        self._source = None
+        self._announced = None
+
+    def __len__(self):
+        return len(self._waiting) + len(self._ready)
+
+    def push(self, cart, now=None):
+        now = self.clock() if now is None else now
+        tz = cart_timezone(cart)
+        opens = next_window(tz, now, self.window_start, self.window_end)
+        heapq.heappush(self._waiting, (opens, -cart_priority(cart), next(self._seq), cart, tz))
+
+    def extend(self, carts):
+        now = self.clock()
+        for cart in carts:
+            self.push(cart, now)
+        self.peak_queued = max(self.peak_queued, len(self))
+        return self
+
+    def feed(self, carts):
+        """Queue `carts` lazily, up to `lookahead` at a time, as pop() makes room."""
+        self._source = iter(carts)
+        return self
+
+    def _top_up(self, now):
+        source = self._source
+        if source is None:
+            return
+        room = self.lookahead - len(self) if self.lookahead > 0 else float("inf")
+        while room > 0:
+            cart = next(source, None)
+            if cart is None:
+                self._source = None
+                break
+            self.push(cart, now)
+            room -= 1
+        self.peak_queued = max(self.peak_queued, len(self))
+
+    def pop_ready(self, now):
+        """(cart, None) for the best cart callable at `now`, else (None, time to wait until)."""
+        self._top_up(now)
+        waiting, ready = self._waiting, self._ready
+        while waiting and waiting[0][0] <= now:
+            opens, neg_priority, seq, cart, tz = heapq.heappop(waiting)
+            heapq.heappush(ready, (neg_priority, seq, opens, cart, tz))
+
+        while ready:
+            neg_priority, seq, opens, cart, tz = heapq.heappop(ready)
+            reopens = next_window(tz, now, self.window_start, self.window_end)
+            if reopens > now:
+                # Its window closed while it waited; queue it for the next one
+                heapq.heappush(waiting, (reopens, neg_priority, seq, cart, tz))
+                self.deferred += 1
+                continue
+            self.queue_latency.observe(now - opens)
+            return cart, None
+        return None, (waiting[0][0] if waiting else None)
+
+    async def pop(self):
+        while True:
+            cart, wait_until = self.pop_ready(self.clock())
+            if cart is not None or wait_until is None:
+                return cart
+            if wait_until != self._announced:
+                self._announced = wait_until
+                opens = datetime.fromtimestamp(wait_until).strftime("%Y-%m-%d %H:%M:%S")
+                log("schedule_waiting", f"⏳ Nobody is inside their calling window; next one opens at {opens} "
+                    f"({len(self)} queued)", opens=opens, queued=len(self))
+            await asyncio.sleep(max(0.0, wait_until - self.clock()))
+
+    def summary(self):
+        latency = self.queue_latency
+        if not latency.count:
+            return "no calls scheduled"
+        return (
+            f"queue latency p50 {latency.quantile(0.5):.1f}s, p99 {latency.quantile(0.99):.1f}s "
+            f"({latency.count} scheduled, {self.deferred} deferred to a later window, "
+            f"at most {self.peak_queued} queued)"
+        )
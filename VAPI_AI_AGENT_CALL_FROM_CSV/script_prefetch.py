@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+from metrics import counter, log, stage
+
+
+# ----------------------------
+# First-Message Prefetch
+# ----------------------------
+# LLM-written opening lines for a CSV campaign, generated ahead of the
+# dialer so no call waits on the model:
+#
+#   cart reader ──> producer ──> [batch of PREFETCH_BATCH carts] ──> one Groq request
+#                                                                      │
+#   dial workers <── next cart + its first message <── ready batches <─┘
+#
+# The producer stays up to PREFETCH_DEPTH carts ahead of the dial workers
+# and keeps several batches in flight. A worker only waits on the LLM when
+# the batch holding its next cart is still being generated. The campaign's
+# LLM stall time is the wall-clock time during which at least one worker was
+# waiting like that; it stays near zero while the overlap is working. A
+# cart the LLM fails on gets the static message.
+#
+#   PREFETCH_DEPTH=20 python main.py      (0, the default, keeps the static message)
+
+PREFETCH_DEPTH = int(os.getenv("PREFETCH_DEPTH", "0"))
+PREFETCH_BATCH = int(os.getenv("PREFETCH_BATCH", "5"))
+PREFETCH_MODEL = os.getenv("PREFETCH_MODEL", "llama-3.1-8b-instant")
+
+LLM_BATCH = stage("llm_batch")
+LLM_STALL_SECONDS = counter("llm_stall_seconds_total", "Time any dial worker waited for a first message")
+LLM_FALLBACKS = counter("llm_fallbacks_total", "Carts dialed with the static first message")
+
+SYSTEM_PROMPT = (
+    "You write the first sentence a friendly voice agent says when a customer who abandoned "
+    "their online cart picks up the phone. One or two short sentences, in the customer's "
+    "language, mentioning their name and items. Reply with JSON only: "
+    '{"messages": ["...", "..."]}, one message per cart, in the order given.'
+)
+
+
+def static_message(cart):
+    return (
+        f"Hi {cart.name}! I'm calling from the store. "
+        f"I noticed you left {cart.items} in your cart for {cart.total}. "
+        f"I wanted to reach out and see if you need any help completing your purchase. "
+        f"Is there anything I can assist you with today?"
+    )
+
+
+def build_prompt(carts):
+    return "\n\n".join(
+        f"Cart {i}\nCustomer: {cart.name}\nItems: {cart.items}\nTotal: {cart.total}\n"
+        f"Reason: {cart.reason}\nLanguage: {cart.language}"
+        for i, cart in enumerate(carts, start=1)
+    )
+
+
+async def groq_messages(client, carts):
+    """One completion for the whole batch; returns a message per cart (None where it gave none)."""
+    with LLM_BATCH.time():
+        response = await client.chat.completions.create(
+            model=PREFETCH_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_prompt(carts)},
+            ],
+            response_format={"type": "json_object"},
+        )
+    messages = json.loads(response.choices[0].message.content).get("messages") or []
+    messages = [m.strip() if isinstance(m, str) and m.strip() else None for m in messages]
+    return (messages + [None] * len(carts))[:len(carts)]
+
+
+class ScriptPrefetcher:
+    """
+    Producer/consumer pipeline between the cart source and the dial workers.
+
+    pipeline(next_cart) takes the dialer's async cart source and returns one
+    that yields the same carts with their first message already generated;
+    first_message(cart) then hands the text to place_call. `generate` is
+    `async (carts) -> [message or None]`, Groq JSON mode by default.
+    """
+
+    def __init__(self, generate=None, depth=None, batch_size=None, fallback=static_message):
+        self.depth = max(1, depth or PREFETCH_DEPTH)
+        self.batch_size = max(1, min(batch_size or PREFETCH_BATCH, self.depth))
+        self.fallback = fallback
+        self.requests = 0
+        self.generated = 0
+        self.fallbacks = 0
+        self.stall_seconds = 0.0
+
+        if generate is None:
+            from groq import AsyncGroq  # only needed when prefetching is on
+            client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+
+            async def generate(carts):
+                return await groq_messages(client, carts)
+        self._generate = generate
+        self._messages = {}
+
+    def pipeline(self, next_cart):
+        room = asyncio.Semaphore(self.depth)  # carts pulled but not yet handed to a worker
+        batches = asyncio.Queue()             # generation tasks in cart order; None at the end
+        ready = deque()
+        ahead = 0                             # carts generating or ready for the workers
+        waiting = 0                           # workers blocked on a batch still generating
+        stall_began = 0.0
+
+        async def produce():
+            try:
+                await fill()
+            finally:
+                batches.put_nowait(None)
+
+        async def fill():
+            nonlocal ahead
+            pending = None
+            finished = False
+            while not finished:
+                batch = []
+                while len(batch) < self.batch_size:
+                    if pending is None:
+                        # Wait for room before reading, so the lookahead is bounded
+                        await room.acquire()
+                        pending = asyncio.ensure_future(next_cart())
+                    if batch:
+                        if not ahead:
+                            break  # the workers have nothing else coming: send it now
+                        await asyncio.wait((pending,), timeout=0.05)
+                        if not pending.done():
+                            break  # the source is waiting (calling windows): don't hold carts back
+                    cart = await pending
+                    pending = None
+                    if cart is None:
+                        room.release()
+                        finished = True
+                        break
+                    batch.append(cart)
+                if batch:
+                    ahead += len(batch)
+                    batches.put_nowait(asyncio.create_task(self._messages_for(batch)))
+
+        async def next_prefetched():
+            nonlocal ahead, waiting, stall_began
+            while not ready:
+                task = await batches.get()
+                if task is None:
+                    batches.put_nowait(None)  # for the other workers
+                    producer = next_prefetched.producer
+                    if producer.done() and not producer.cancelled() and producer.exception():
+                        raise producer.exception()  # the cart source failed
+                    return None
+                if not task.done():
+                    if not waiting:
+                        stall_began = time.perf_counter()
+                    waiting += 1
+                    await asyncio.wait((task,))
+                    waiting -= 1
+                    if not waiting:
+                        stalled = time.perf_counter() - stall_began
+                        self.stall_seconds += stalled
+                        LLM_STALL_SECONDS.inc(stalled)
+                ready.extend(task.result())
+            cart, message = ready.popleft()
+            ahead -= 1
+            room.release()
+            self._messages[cart] = message
+            return cart
+
+        # Held here so the producer task is not garbage-collected mid-campaign
+        next_prefetched.producer = asyncio.create_task(produce())
+        return next_prefetched
+
+    async def _messages_for(self, carts):
+        self.requests += 1
+        try:
+            messages = await self._generate(carts)
+        except Exception as e:
+            log("prefetch_batch_failed", f"⚠️ First-message batch of {len(carts)} failed, using the static message: {e}",
+                batch=len(carts), error=str(e))
+            messages = [None] * len(carts)
+        return list(zip(carts, messages))
+
+    def first_message(self, cart):
+        message = self._messages.pop(cart, None)
+        if message is None:
+            self.fallbacks += 1
+            LLM_FALLBACKS.inc()
+            return self.fallback(cart)
+        self.generated += 1
+        return message
+
+    def summary(self):
+        per_request = (self.generated + self.fallbacks) / self.requests if self.requests else 0.0
+        return (
+            f"{self.generated} LLM first messages in {self.requests} requests "
+            f"({per_request:.1f} carts each, depth {self.depth}), {self.fallbacks} static fallbacks, "
+            f"dialer stalled {self.stall_seconds:.2f}s waiting on the LLM"
+        )
@@ -1,3 +1,3 @@
-from vapi import Vapi
-
-print("Vapi imported successfully!")
+from vapi import Vapi
+
+print("Vapi imported successfully!")
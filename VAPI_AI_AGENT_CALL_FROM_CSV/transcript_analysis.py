@@ -0,0 +1,471 @@
+import asyncio
+import json
+import os
+import re
+import time
+
+from call_outcomes import as_cell
+from call_store import vapi_transcript
+from metrics import counter, log, stage
+
+
+# ----------------------------
+# Transcript Analysis
+# ----------------------------
+# Fills the Customer Response and Objections columns of the call log
+# (customer_sentiment, primary_objection, price_concern, ...) from call
+# transcripts, offline and in bulk:
+#
+#   transcripts ──> keyword pass ──> clear-cut ──────────────────────────> results
+#                        │                                                   │
+#                        └──> ambiguous ──> batches of ANALYSIS_BATCH ──> one Groq request each
+#                                                                            │
+#   call store / call log <── one write per ANALYSIS_WRITE_ROWS results <────┘
+#
+# The keyword pass matches every cue phrase below in a single walk over the
+# customer's words (a word-level Aho-Corasick automaton, built once), so its
+# cost does not grow with the number of phrases. A transcript goes to the
+# LLM only when the cues can't be trusted: a cue is negated ("not too
+# expensive"), positive and negative cues are about even, or the customer
+# said ANALYSIS_MIN_WORDS words or more and no cue matched at all. When a
+# batch fails, its transcripts keep their keyword results.
+#
+#   python transcript_analysis.py                          (call store transcripts not analyzed yet)
+#   python transcript_analysis.py webhooks.jsonl --log call_logs_detailed.csv
+#
+# A .jsonl source holds {"call_id": ..., "transcript": ...} lines or raw
+# Vapi end-of-call reports.
+
+ANALYSIS_BATCH = int(os.getenv("ANALYSIS_BATCH", "20"))
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "4"))
+ANALYSIS_WRITE_ROWS = int(os.getenv("ANALYSIS_WRITE_ROWS", "1000"))
+ANALYSIS_MIN_WORDS = int(os.getenv("ANALYSIS_MIN_WORDS", "25"))
+ANALYSIS_MODEL = os.getenv("ANALYSIS_MODEL", "llama-3.1-8b-instant")
+ANALYSIS_MAX_CHARS = int(os.getenv("ANALYSIS_MAX_CHARS", "4000"))  # per transcript in the prompt
+
+LLM_ANALYSIS = stage("transcript_llm_batch")
+TRANSCRIPTS_ANALYZED = counter("transcripts_analyzed_total", "Transcripts analyzed, by what decided them",
+                               ("resolved_by",))
+BY_KEYWORDS, BY_LLM, BY_FALLBACK = (TRANSCRIPTS_ANALYZED.labels(by) for by in ("keywords", "llm", "fallback"))
+
+
+# ----------------------------
+# Cue Phrases
+# ----------------------------
+# Objection flags in the order their names are tried for primary_objection
+# when two are first mentioned in the same word
+OBJECTIONS = {
+    "price_concern": "Price", "quality_concern": "Quality", "timing_concern": "Timing",
+    "technical_issue": "Technical Issue", "competitor_mention": "Competitor",
+    "changed_mind": "Changed Mind", "not_interested": "Not Interested", "just_browsing": "Just Browsing",
+}
+FLAGS = (*OBJECTIONS, "callback_requested")
+
+CUES = {
+    "price_concern": (
+        "expensive", "pricey", "price", "costly", "cost", "costs", "afford", "cheaper", "budget",
+        "overpriced", "too much", "shipping charges", "delivery charges",
+    ),
+    "quality_concern": (
+        "quality", "reviews", "durable", "fake", "genuine", "material", "size", "sizing", "fit",
+        "doesn't fit", "return policy", "returns",
+    ),
+    "timing_concern": (
+        "later", "not now", "next week", "next month", "payday", "salary", "busy", "no time",
+        "not a good time", "some other time",
+    ),
+    "technical_issue": (
+        "error", "payment failed", "card declined", "declined", "website", "app", "crashed", "checkout",
+        "otp", "glitch", "bug", "login", "not loading", "couldn't pay",
+    ),
+    "competitor_mention": (
+        "amazon", "flipkart", "myntra", "meesho", "walmart", "ebay", "another store", "other store",
+        "another website", "other website", "elsewhere", "somewhere else", "competitor",
+    ),
+    "changed_mind": (
+        "changed my mind", "don't need", "no longer need", "don't want it", "already bought",
+        "already purchased", "bought it already",
+    ),
+    "not_interested": (
+        "not interested", "no thanks", "no thank you", "stop calling", "don't call", "remove my number",
+        "unsubscribe", "leave me alone",
+    ),
+    "just_browsing": ("just browsing", "just looking", "window shopping", "just checking", "only checking"),
+    "callback_requested": ("call me back", "call back", "call me later", "call later", "call tomorrow"),
+    "purchase_intent": (
+        "i'll buy", "will buy", "buy it", "order it", "finish the order", "complete the order",
+        "place the order", "complete my order", "finish my order", "go ahead",
+    ),
+    "positive": (
+        "yes", "yeah", "sure", "okay", "ok", "great", "perfect", "thanks", "thank you", "love", "awesome",
+        "sounds good", "that works", "interested", "happy", "nice", "helpful", "go ahead",
+    ),
+    "negative": (
+        "annoying", "annoyed", "angry", "frustrated", "frustrating", "waste", "terrible", "horrible",
+        "worst", "bad", "disappointed", "upset", "worried", "concerned", "scam", "spam", "hate", "rude",
+        "stop calling", "leave me alone", "not interested",
+    ),
+}
+
+# A cue within three words after one of these says the opposite
+NEGATORS = frozenset((
+    "not", "no", "never", "don't", "dont", "isn't", "wasn't", "aren't", "didn't", "won't", "nothing", "without",
+))
+NEGATION_WINDOW = 3
+
+WORD = re.compile(r"[a-z0-9']+")
+CUSTOMER_TURN = re.compile(r"^\s*(?:user|customer)\s*:\s*(.*)$", re.IGNORECASE | re.MULTILINE)
+ANY_TURN = re.compile(r"^\s*(?:ai|assistant|bot|user|customer)\s*:", re.IGNORECASE | re.MULTILINE)
+
+
+class CueMatcher:
+    """
+    Word-level Aho-Corasick automaton over the phrases of `cues` ({label: phrases}).
+
+    matches(words) walks the words once and returns (start, phrase, labels)
+    for every match, taking the longest phrase where several end on the same
+    word ("not interested" rather than "interested").
+    """
+
+    def __init__(self, cues=CUES):
+        phrases = {}
+        for label, texts in cues.items():
+            for text in texts:
+                phrases.setdefault(tuple(WORD.findall(text.lower())), set()).add(label)
+
+        goto, output = [{}], [None]
+        for words, labels in phrases.items():
+            state = 0
+            for word in words:
+                if word not in goto[state]:
+                    goto[state][word] = len(goto)
+                    goto.append({})
+                    output.append(None)
+                state = goto[state][word]
+            output[state] = (len(words), " ".join(words), frozenset(labels))
+
+        # Breadth-first failure links; a state without its own phrase reports the
+        # longest phrase ending at its failure state
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for word, child in goto[state].items():
+                queue.append(child)
+                f = fail[state]
+                while f and word not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(word, 0)
+                if output[child] is None:
+                    output[child] = output[fail[child]]
+        self.goto, self.fail, self.output = goto, fail, output
+        self.phrases = len(phrases)
+
+    def matches(self, words):
+        goto, fail, output = self.goto, self.fail, self.output
+        found = []
+        state = 0
+        for i, word in enumerate(words):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            hit = output[state]
+            if hit is not None:
+                found.append((i - hit[0] + 1, hit[1], hit[2]))
+        return found
+
+
+def customer_words(transcript):
+    """The customer's words, lowercased; the whole text when it has no speaker labels."""
+    turns = CUSTOMER_TURN.findall(transcript)
+    if not turns and not ANY_TURN.search(transcript):
+        turns = [transcript]
+    text = " ".join(turns).lower().replace("’", "'")
+    return WORD.findall(text), len(turns)
+
+
+def keyword_analysis(matcher, transcript, min_words=ANALYSIS_MIN_WORDS):
+    """(typed result, ambiguous) for one transcript, from its cue phrases alone."""
+    words, turns = customer_words(transcript)
+    flags = dict.fromkeys(FLAGS, False)
+    objections, details = [], []
+    positive = negative = 0
+    intent = negated = False
+    after = 0  # a negator inside an earlier cue ("not interested, stop calling") negates nothing
+    for start, phrase, labels in matcher.matches(words):
+        window = words[max(after, start - NEGATION_WINDOW):start]
+        after = start + phrase.count(" ") + 1
+        if any(w in NEGATORS for w in window):
+            negated = True
+            continue
+        for label in labels:
+            if label in flags:
+                flags[label] = True
+                if label in OBJECTIONS and OBJECTIONS[label] not in objections:
+                    objections.append(OBJECTIONS[label])
+                    details.append(phrase)
+        positive += "positive" in labels
+        negative += "negative" in labels
+        intent = intent or "purchase_intent" in labels
+
+    if positive > negative:
+        sentiment = "Positive"
+    elif negative > positive:
+        sentiment = "Negative"
+    else:
+        sentiment = "Neutral"
+    if intent:
+        interest = "High"
+    elif sentiment == "Negative" or flags["not_interested"] or flags["changed_mind"] or flags["just_browsing"]:
+        interest = "Low"
+    else:
+        interest = "Medium"
+
+    result = {
+        "customer_sentiment": sentiment,
+        "customer_interest_level": interest,
+        "customer_engagement_score": min(10, turns + len(words) // 10),
+        "primary_objection": objections[0] if objections else "None",
+        "secondary_objection": objections[1] if len(objections) > 1 else "None",
+        "objection_details": "; ".join(details) or "None",
+        **flags,
+    }
+    cued = positive or negative or intent or objections or flags["callback_requested"]
+    ambiguous = (
+        negated
+        or (positive and negative and max(positive, negative) < 2 * min(positive, negative))
+        or (not cued and len(words) >= min_words)
+    )
+    return result, bool(ambiguous)
+
+
+# ----------------------------
+# LLM Pass
+# ----------------------------
+SENTIMENTS = ("Positive", "Neutral", "Negative")
+INTEREST_LEVELS = ("High", "Medium", "Low")
+OBJECTION_NAMES = (*OBJECTIONS.values(), "None")
+
+SYSTEM_PROMPT = (
+    "You analyze phone calls between a store's voice agent (AI) and a customer (User) who abandoned "
+    "their online cart. For each call, reply with the customer's side of it as JSON only: "
+    '{"results": [{"customer_sentiment": "Positive|Neutral|Negative", '
+    '"customer_interest_level": "High|Medium|Low", "customer_engagement_score": 0-10, '
+    f'"primary_objection": "{"|".join(OBJECTION_NAMES)}", "secondary_objection": "...", '
+    '"objection_details": "a few words", '
+    + ", ".join(f'"{flag}": true|false' for flag in FLAGS)
+    + "}]}, one result per call, in the order given."
+)
+
+
+def build_prompt(transcripts):
+    return "\n\n".join(
+        f"Call {i}\n{transcript[:ANALYSIS_MAX_CHARS]}" for i, transcript in enumerate(transcripts, start=1)
+    )
+
+
+async def groq_analyses(client, transcripts):
+    """One completion for the whole batch; returns a dict per transcript (None where it gave none)."""
+    with LLM_ANALYSIS.time():
+        response = await client.chat.completions.create(
+            model=ANALYSIS_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_prompt(transcripts)},
+            ],
+            response_format={"type": "json_object"},
+        )
+    results = json.loads(response.choices[0].message.content).get("results") or []
+    results = [r if isinstance(r, dict) else None for r in results]
+    return (results + [None] * len(transcripts))[:len(transcripts)]
+
+
+def typed(raw, fallback):
+    """The LLM's answer coerced to the keyword result's types; fields it got wrong keep `fallback`."""
+    result = dict(fallback)
+    for name, allowed in (("customer_sentiment", SENTIMENTS), ("customer_interest_level", INTEREST_LEVELS),
+                          ("primary_objection", OBJECTION_NAMES), ("secondary_objection", OBJECTION_NAMES)):
+        value = str(raw.get(name, "")).strip().title()
+        matched = next((a for a in allowed if a.lower() == value.lower()), None)
+        if matched:
+            result[name] = matched
+    try:
+        result["customer_engagement_score"] = max(0, min(10, int(raw["customer_engagement_score"])))
+    except (KeyError, TypeError, ValueError):
+        pass
+    if isinstance(raw.get("objection_details"), str) and raw["objection_details"].strip():
+        result["objection_details"] = raw["objection_details"].strip()
+    for flag in FLAGS:
+        value = raw.get(flag)
+        if isinstance(value, str):
+            value = {"yes": True, "true": True, "no": False, "false": False}.get(value.strip().lower())
+        if isinstance(value, bool):
+            result[flag] = value
+    return result
+
+
+def cells(result):
+    """A typed result as call-log cells ("Yes"/"No" flags, the score as text)."""
+    return {name: as_cell(value) for name, value in result.items()}
+
+
+# ----------------------------
+# Pipeline
+# ----------------------------
+class TranscriptAnalyzer:
+    """
+    Streams (call_id, transcript) pairs through the keyword pass and the
+    batched LLM pass, and hands the typed results to `write` (a bulk
+    `[(call_id, fields)] -> None`, e.g. CallStore.apply) every `write_rows`
+    results. `classify` is `async (transcripts) -> [dict or None]`, Groq JSON
+    mode by default.
+    """
+
+    def __init__(self, classify=None, batch_size=None, concurrency=None, write_rows=None, min_words=None,
+                 matcher=None):
+        self.batch_size = max(1, batch_size or ANALYSIS_BATCH)
+        self.concurrency = max(1, concurrency or ANALYSIS_CONCURRENCY)
+        self.write_rows = max(1, write_rows or ANALYSIS_WRITE_ROWS)
+        self.min_words = ANALYSIS_MIN_WORDS if min_words is None else min_words
+        self.matcher = matcher or CueMatcher()
+        self.transcripts = 0
+        self.by_keywords = 0
+        self.by_llm = 0
+        self.fallbacks = 0
+        self.requests = 0
+        self.written = 0
+        self.seconds = 0.0
+
+        if classify is None:
+            from groq import AsyncGroq  # only needed once a transcript is ambiguous
+            client = None
+
+            async def classify(transcripts):
+                nonlocal client
+                client = client or AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+                return await groq_analyses(client, transcripts)
+        self._classify = classify
+
+    async def run(self, transcripts, write):
+        start = time.perf_counter()
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        batch, results = [], []
+
+        async def send(batch):
+            try:
+                results.extend(await self._analyzed(batch))
+            finally:
+                slots.release()
+
+        async def flush(rows):
+            if rows:
+                await asyncio.to_thread(write, [(call_id, cells(result)) for call_id, result in rows])
+                self.written += len(rows)
+
+        for call_id, transcript in transcripts:
+            self.transcripts += 1
+            result, ambiguous = keyword_analysis(self.matcher, transcript, self.min_words)
+            if not ambiguous:
+                self.by_keywords += 1
+                BY_KEYWORDS.inc()
+                results.append((call_id, result))
+            else:
+                batch.append((call_id, transcript, result))
+                if len(batch) == self.batch_size:
+                    await slots.acquire()
+                    in_flight.add(asyncio.create_task(send(batch)))
+                    batch = []
+            if len(results) >= self.write_rows:
+                rows, results[:] = results[:], []
+                await flush(rows)
+            elif self.transcripts % 256 == 0:
+                await asyncio.sleep(0)  # let finished LLM batches land
+            in_flight = {task for task in in_flight if not task.done()}
+
+        if batch:
+            await slots.acquire()
+            in_flight.add(asyncio.create_task(send(batch)))
+        await asyncio.gather(*in_flight)
+        await flush(results)
+        self.seconds = time.perf_counter() - start
+        return self.summary()
+
+    async def _analyzed(self, batch):
+        self.requests += 1
+        try:
+            answers = await self._classify([transcript for _, transcript, _ in batch])
+        except Exception as e:
+            log("analysis_batch_failed", f"⚠️ Analysis batch of {len(batch)} failed, keeping the keyword results: {e}",
+                batch=len(batch), error=str(e))
+            answers = [None] * len(batch)
+        analyzed = []
+        for (call_id, _, fallback), answer in zip(batch, answers):
+            if answer is None:
+                self.fallbacks += 1
+                BY_FALLBACK.inc()
+                analyzed.append((call_id, fallback))
+            else:
+                self.by_llm += 1
+                BY_LLM.inc()
+                analyzed.append((call_id, typed(answer, fallback)))
+        return analyzed
+
+    def summary(self):
+        return {
+            "transcripts": self.transcripts,
+            "by_keywords": self.by_keywords,
+            "by_llm": self.by_llm,
+            "fallbacks": self.fallbacks,
+            "llm_requests": self.requests,
+            "written": self.written,
+            "seconds": self.seconds,
+            "transcripts_per_sec": self.transcripts / self.seconds if self.seconds else 0.0,
+            "without_llm": self.by_keywords / self.transcripts if self.transcripts else 0.0,
+        }
+
+
+def read_jsonl(path):
+    """(call_id, transcript) pairs from {"call_id", "transcript"} lines or Vapi end-of-call reports."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "transcript" in record and "call_id" in record:
+                if record["call_id"] and record["transcript"]:
+                    yield record["call_id"], record["transcript"]
+            else:
+                report = vapi_transcript(record)
+                if report:
+                    yield report[0], report[1]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from call_outcomes import CallOutcomeStore
+    from call_store import CallStore
+
+    parser = argparse.ArgumentParser(description="Fill sentiment and objection columns from call transcripts")
+    parser.add_argument("src", nargs="?", help=".jsonl of transcripts (default: the call store's)")
+    parser.add_argument("--store", default=os.getenv("CALL_STORE", "call_store.db"),
+                        help="call store to read transcripts from and write results to")
+    parser.add_argument("--log", help="write results to this call log's outcome overlay instead")
+    parser.add_argument("--all", action="store_true", help="re-analyze transcripts already analyzed")
+    args = parser.parse_args()
+
+    store = CallStore(args.store) if not (args.src and args.log) else None
+    source = read_jsonl(args.src) if args.src else store.transcripts(pending_only=not args.all)
+    sink = CallOutcomeStore(args.log) if args.log else store
+
+    analyzer = TranscriptAnalyzer()
+    report = asyncio.run(analyzer.run(source, sink.apply))
+    if store:
+        store.close()
+
+    sent = report["transcripts"] - report["by_keywords"]
+    print(f"✓ {report['transcripts']} transcripts in {report['seconds']:.2f}s "
+          f"({report['transcripts_per_sec']:,.0f} transcripts/sec)")
+    print(f"✓ {report['by_keywords']} ({report['without_llm']:.1%}) resolved without the LLM, "
+          f"{sent} sent in {report['llm_requests']} requests ({report['fallbacks']} kept keyword results)")
+    print(f"✓ Wrote {report['written']} results to {args.log or args.store}")
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The campaign scripts import their helpers as top-level modules
+# (they are run from inside VAPI_AI_AGENT_CALL_FROM_CSV), so do the same here.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMPAIGN_DIR = os.path.join(REPO_ROOT, "VAPI_AI_AGENT_CALL_FROM_CSV")
+
+if CAMPAIGN_DIR not in sys.path:
+    sys.path.insert(0, CAMPAIGN_DIR)
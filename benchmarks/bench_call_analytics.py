@@ -0,0 +1,136 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from call_analytics import conversion_rate_by
+from call_log import DETAILED_LOG_FIELDS
+from call_log_parquet import BOOL_FIELDS, FLOAT_FIELDS, INT_FIELDS, ParquetCallLogSink
+
+
+# ----------------------------
+# Call Analytics Benchmark
+# ----------------------------
+# python -m benchmarks.bench_call_analytics --rows 10000000
+#
+# Writes the same synthetic detailed call log as a 55-column CSV and as the
+# partitioned Parquet store, then times "conversion rate by time_of_day over
+# the last 7 days" with pandas-on-CSV and with call_analytics.
+
+DAYS = 30
+CHOICES = {
+    "time_of_day": ["Morning", "Afternoon", "Evening"],
+    "day_of_week": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+    "primary_objection": ["Price", "Shipping cost", "Timing", "Quality", "None", "Pending"],
+    "customer_language": ["en", "hi", "es"],
+    "call_status": ["initiated", "failed", "completed"],
+}
+
+
+def make_chunk(rng, start, rows):
+    dates = np.array([f"2025-12-{d + 1:02d}" for d in range(DAYS)], dtype=object)
+    typed = {}
+    for field in DETAILED_LOG_FIELDS:
+        if field == "timestamp":
+            typed[field] = pa.array(
+                np.datetime64("2025-12-01") + rng.integers(0, DAYS * 86400, rows).astype("timedelta64[s]"),
+                type=pa.timestamp("us"),
+            )
+        elif field == "call_date":
+            typed[field] = pa.array(dates[rng.integers(0, DAYS, rows)], type=pa.string())
+        elif field in BOOL_FIELDS:
+            typed[field] = pa.array(rng.random(rows) < 0.15)
+        elif field in INT_FIELDS:
+            typed[field] = pa.array(rng.integers(0, 300, rows).astype(np.int32))
+        elif field in FLOAT_FIELDS:
+            typed[field] = pa.array(rng.integers(10, 900, rows).astype(np.float64))
+        elif field in CHOICES:
+            options = np.array(CHOICES[field], dtype=object)
+            typed[field] = pa.array(options[rng.integers(0, len(options), rows)], type=pa.string())
+        elif field in ("call_id", "customer_phone", "customer_name"):
+            typed[field] = pa.array([f"{field}-{i}" for i in range(start, start + rows)])
+        else:
+            typed[field] = pa.array(np.full(rows, "Pending", dtype=object), type=pa.string())
+    return pa.table(typed)
+
+
+def as_csv_text(table):
+    # The CSV log stores booleans as "Yes"/"No" and totals as "$450"
+    columns = {}
+    for field in table.column_names:
+        column = table[field].to_numpy(zero_copy_only=False)
+        if field in BOOL_FIELDS:
+            columns[field] = pa.array(np.where(column, "Yes", "No"))
+        elif field == "cart_total":
+            columns[field] = pa.array(np.char.add("$", column.astype(int).astype(str)))
+        else:
+            columns[field] = table[field]
+    return pa.table(columns)
+
+
+def build(tmp, rows, chunk_rows=1_000_000):
+    rng = np.random.default_rng(7)
+    csv_path = os.path.join(tmp, "call_logs_detailed.csv")
+    parquet_root = os.path.join(tmp, "call_logs_parquet")
+    sink = ParquetCallLogSink(parquet_root)
+
+    writer = None
+    for start in range(0, rows, chunk_rows):
+        chunk = make_chunk(rng, start, min(chunk_rows, rows - start))
+        text = as_csv_text(chunk)
+        if writer is None:
+            writer = pacsv.CSVWriter(csv_path, text.schema)
+        writer.write_table(text)
+        sink._write_table(chunk.cast(sink.schema))
+    writer.close()
+    return csv_path, parquet_root
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def pandas_full(csv_path, since):
+    df = pd.read_csv(csv_path)
+    df = df[df["call_date"] >= since]
+    return df.groupby("time_of_day")["purchase_completed"].apply(lambda s: (s == "Yes").mean())
+
+
+def pandas_usecols(csv_path, since):
+    df = pd.read_csv(csv_path, usecols=["call_date", "time_of_day", "purchase_completed"])
+    df = df[df["call_date"] >= since]
+    return df.groupby("time_of_day")["purchase_completed"].apply(lambda s: (s == "Yes").mean())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet analytics vs pandas-on-CSV")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    since = f"2025-12-{DAYS - 6:02d}"
+    with tempfile.TemporaryDirectory() as tmp:
+        build_time, (csv_path, parquet_root) = timed(lambda: build(tmp, args.rows))
+        parquet_bytes = sum(
+            os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(parquet_root) for f in files
+        )
+        print(f"📄 {args.rows:,} calls built in {build_time:.1f}s | "
+              f"CSV {os.path.getsize(csv_path) / 1e6:,.0f} MB | Parquet {parquet_bytes / 1e6:,.0f} MB")
+
+        results = {}
+        for label, query in [
+            ("pandas read_csv (all columns)", lambda: pandas_full(csv_path, since)),
+            ("pandas read_csv (usecols)", lambda: pandas_usecols(csv_path, since)),
+            ("parquet pruned + pushdown", lambda: conversion_rate_by(parquet_root, "time_of_day", since=since)),
+        ]:
+            results[label], _ = timed(query)
+
+        baseline = results["pandas read_csv (all columns)"]
+        for label, seconds in results.items():
+            print(f"   {label:<30} {seconds:8.3f}s  ({baseline / seconds:6.1f}x)")
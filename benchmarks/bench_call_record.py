@@ -0,0 +1,148 @@
+import argparse
+import csv
+import gc
+import io
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from call_log import DETAILED_LOG_FIELDS, CallRecord
+from call_log_parquet import ParquetCallLogSink
+
+
+# ----------------------------
+# Call Record Benchmark
+# ----------------------------
+# python -m benchmarks.bench_call_record --rows 100000
+#
+# Builds --rows detailed-log rows (1 in 10 a failed call) the way main3.py
+# used to, as hand-written dicts, and as CallRecords, then reports build
+# time, memory held by the rows (what a log buffer keeps alive), and the
+# time to serialise them to CSV and Parquet. Both must produce the same rows.
+
+def legacy_row(i, failed):
+    # The two literal dicts main3.py built per call before CallRecord
+    now = datetime(2026, 1, 5, 10, 30)
+    name, phone, items, total = f"Customer {i}", f"+91{9000000000 + i}", "Shoes x2", "$450"
+    if not failed:
+        return {
+            "timestamp": now, "call_date": "2026-01-05", "call_time": "10:30:00",
+            "customer_name": name, "customer_phone": phone,
+            "cart_items": items, "cart_total": total,
+            "cart_quantity": items.split("x")[1] if "x" in items else "1",
+            "cart_abandoned_date": "Unknown", "days_since_abandonment": "Unknown",
+            "call_id": f"call-{i}", "call_status": "initiated", "call_initiated": "Yes",
+            "call_answered": "Pending", "call_duration_seconds": "0", "call_ended_reason": "in_progress",
+            "customer_sentiment": "Pending", "customer_interest_level": "Pending",
+            "customer_engagement_score": "Pending",
+            "primary_objection": "Pending", "secondary_objection": "None", "objection_details": "Pending",
+            "price_concern": "No", "quality_concern": "No", "timing_concern": "No",
+            "technical_issue": "No", "competitor_mention": "No", "changed_mind": "No",
+            "not_interested": "No", "just_browsing": "No",
+            "conversion_result": "Pending", "purchase_completed": "No", "purchase_amount": "0",
+            "discount_offered": "No", "discount_accepted": "No", "discount_amount": "0",
+            "ai_technique_used": "Barnum Effect, Reciprocity", "objection_handled_successfully": "Pending",
+            "rapport_established": "Pending", "follow_up_scheduled": "No", "follow_up_date": "None",
+            "callback_requested": "No", "voicemail_left": "No", "hung_up_early": "No",
+            "call_back_attempts": "1", "previous_contact_count": "0",
+            "customer_language": "en", "customer_location": "Unknown", "customer_timezone": "Asia/Kolkata",
+            "time_of_day": "Morning", "day_of_week": "Monday",
+            "call_notes": f"Call initiated to {name} for {items}",
+            "ai_learnings": "To be updated after call completion",
+            "improvement_suggestions": "To be analyzed", "script_effectiveness_rating": "Pending",
+        }
+    e = "429 Too Many Requests"
+    return {
+        "timestamp": now, "call_date": "2026-01-05", "call_time": "10:30:00",
+        "customer_name": name, "customer_phone": phone, "cart_items": items, "cart_total": total,
+        "cart_quantity": "Unknown", "cart_abandoned_date": "Unknown", "days_since_abandonment": "Unknown",
+        "call_id": "N/A", "call_status": "failed", "call_initiated": "Yes", "call_answered": "No",
+        "call_duration_seconds": "0", "call_ended_reason": f"Error: {str(e)}",
+        "customer_sentiment": "Unknown", "customer_interest_level": "Unknown", "customer_engagement_score": "0",
+        "primary_objection": "Technical Error", "secondary_objection": "None", "objection_details": str(e),
+        "price_concern": "No", "quality_concern": "No", "timing_concern": "No", "technical_issue": "Yes",
+        "competitor_mention": "No", "changed_mind": "No", "not_interested": "No", "just_browsing": "No",
+        "conversion_result": "Failed", "purchase_completed": "No", "purchase_amount": "0",
+        "discount_offered": "No", "discount_accepted": "No", "discount_amount": "0",
+        "ai_technique_used": "None - Call Failed", "objection_handled_successfully": "No",
+        "rapport_established": "No", "follow_up_scheduled": "No", "follow_up_date": "None",
+        "callback_requested": "No", "voicemail_left": "No", "hung_up_early": "No",
+        "call_back_attempts": "1", "previous_contact_count": "0",
+        "customer_language": "en", "customer_location": "Unknown", "customer_timezone": "Asia/Kolkata",
+        "time_of_day": "Morning", "day_of_week": "Monday",
+        "call_notes": f"Call failed: {str(e)}", "ai_learnings": "System error - needs investigation",
+        "improvement_suggestions": "Fix technical issues", "script_effectiveness_rating": "0",
+    }
+
+
+def record_row(i, failed):
+    # What main3.py builds now
+    now = datetime(2026, 1, 5, 10, 30)
+    name, phone, items, total = f"Customer {i}", f"+91{9000000000 + i}", "Shoes x2", "$450"
+    record = CallRecord(
+        timestamp=now, call_date="2026-01-05", call_time="10:30:00",
+        customer_name=name, customer_phone=phone, cart_items=items, cart_total=total,
+        call_back_attempts="1", previous_contact_count="0",
+        customer_language="en", customer_timezone="Asia/Kolkata",
+        time_of_day="Morning", day_of_week="Monday",
+    )
+    if failed:
+        return record.mark_failed("429 Too Many Requests")
+    record.call_id = f"call-{i}"
+    record.cart_quantity = items.split("x")[1] if "x" in items else "1"
+    record.call_notes = f"Call initiated to {name} for {items}"
+    return record
+
+
+def build(make, rows):
+    start = time.perf_counter()
+    built = [make(i, i % 10 == 0) for i in range(rows)]
+    elapsed = time.perf_counter() - start
+    del built
+
+    # Again under tracemalloc (which slows allocation down) for the memory figure
+    gc.collect()
+    tracemalloc.start()
+    built = [make(i, i % 10 == 0) for i in range(rows)]
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, elapsed, held
+
+
+def to_csv(rows, as_row):
+    start = time.perf_counter()
+    writer = csv.writer(io.StringIO())
+    writer.writerows(as_row(r) for r in rows)
+    return time.perf_counter() - start
+
+
+def to_parquet(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = ParquetCallLogSink(tmp, flush_rows=len(rows) + 1)
+        start = time.perf_counter()
+        for r in rows:
+            sink.write(r)
+        sink.close()
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare dict rows with CallRecord for the detailed log")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dicts, dict_s, dict_mem = build(legacy_row, args.rows)
+    records, record_s, record_mem = build(record_row, args.rows)
+    fields = DETAILED_LOG_FIELDS
+    assert all([d[f] for f in fields] == list(r.row()) for d, r in zip(dicts, records)), "rows differ"
+
+    print(f"🧾 {args.rows:,} detailed-log rows ({len(fields)} columns, 10% failed calls)")
+    for label, rows, build_s, held, as_row in (
+        ("dicts", dicts, dict_s, dict_mem, lambda d: [d.get(f, "") for f in fields]),
+        ("CallRecord", records, record_s, record_mem, CallRecord.row),
+    ):
+        csv_s = to_csv(rows, as_row)
+        parquet_s = to_parquet(rows)
+        print(f"   {label:10} build {build_s * 1e6 / args.rows:5.2f} µs/row | held {held / args.rows:6.0f} B/row "
+              f"| CSV {csv_s * 1e6 / args.rows:5.2f} µs/row | Parquet {parquet_s * 1e6 / args.rows:5.2f} µs/row")
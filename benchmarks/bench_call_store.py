@@ -0,0 +1,96 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from call_log import DETAILED_LOG_FIELDS, CallLogSink, CallRecord
+from call_store import CallStore, import_csv
+
+
+# ----------------------------
+# Call Store Benchmark
+# ----------------------------
+# python -m benchmarks.bench_call_store --rows 100000 --customers 20000
+#
+# Writes --rows detailed-log calls (spread over --customers phones, 1 in 10
+# a failed call) to call_logs_detailed.csv and to the SQLite call store, then
+# answers "every call to this customer" for --lookups random phones from
+# each: a full scan of the CSV against one index lookup in the store. Also
+# times the one-off import of the CSV into a fresh store.
+
+def make_records(rows, customers, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 5, 9, 0)
+    for i in range(rows):
+        n = rng.randrange(customers)
+        now = start + timedelta(seconds=i * 3)
+        record = CallRecord(
+            timestamp=now, call_date=now.strftime("%Y-%m-%d"), call_time=now.strftime("%H:%M:%S"),
+            customer_name=f"Customer {n}", customer_phone=f"+91{9000000000 + n}",
+            cart_items=f"Shoes x{n % 3 + 1}, cat food", cart_total=f"${n % 900 + 10}",
+            customer_language="en", customer_timezone="Asia/Kolkata",
+            time_of_day="Morning", day_of_week="Monday",
+        )
+        if i % 10 == 0:
+            record.mark_failed("503 Service Unavailable")
+        else:
+            record.call_id = f"call-{i}"
+            record.call_notes = f"Call initiated to Customer {n}"
+        yield record
+
+
+def csv_lookup(path, phone):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row for row in csv.DictReader(f) if row["customer_phone"] == phone]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV call log vs the SQLite call store")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--lookups", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "call_logs_detailed.csv")
+        store_path = os.path.join(tmp, "call_store.db")
+
+        start = time.perf_counter()
+        with CallLogSink(csv_path, DETAILED_LOG_FIELDS, flush_rows=500) as sink:
+            for record in make_records(args.rows, args.customers):
+                sink.write(record)
+        csv_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with CallStore(store_path) as store:
+            for record in make_records(args.rows, args.customers):
+                store.write(record, reason="Abandoned checkout")
+        store_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with CallStore(os.path.join(tmp, "imported.db")) as imported:
+            import_csv(imported, csv_path)
+        import_s = time.perf_counter() - start
+
+        phones = [f"+91{9000000000 + n}" for n in random.Random(1).sample(range(args.customers), args.lookups)]
+        store = CallStore(store_path)
+        start = time.perf_counter()
+        from_csv = [csv_lookup(csv_path, phone) for phone in phones]
+        csv_lookup_s = (time.perf_counter() - start) / len(phones)
+        start = time.perf_counter()
+        from_store = [store.interactions_for(phone) for phone in phones]
+        store_lookup_s = (time.perf_counter() - start) / len(phones)
+        store.close()
+        assert [len(rows) for rows in from_csv] == [len(rows) for rows in from_store], "lookups differ"
+        assert all(a == {k: str(v) for k, v in b.items()} for rs, ss in zip(from_csv, from_store)
+                   for a, b in zip(rs, ss)), "rows differ"
+
+        print(f"🗄️ {args.rows:,} calls, {args.customers:,} customers "
+              f"(CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, store {os.path.getsize(store_path) / 1e6:.1f} MB)")
+        print(f"   write    CSV {args.rows / csv_write:9,.0f} rows/s | store {args.rows / store_write:9,.0f} rows/s")
+        print(f"   import   CSV → store in {import_s:.2f}s ({args.rows / import_s:,.0f} rows/s)")
+        print(f"   lookup   all calls for one customer: CSV scan {csv_lookup_s * 1000:8.1f} ms | "
+              f"store {store_lookup_s * 1000:6.3f} ms ({csv_lookup_s / store_lookup_s:,.0f}x)")
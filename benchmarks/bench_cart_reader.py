@@ -0,0 +1,66 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from cart_reader import CartReader
+
+
+# ----------------------------
+# Cart Ingestion Benchmark
+# ----------------------------
+# python -m benchmarks.bench_cart_reader --rows 100000 1000000
+#
+# Compares the old pd.read_csv + iterrows path with the streaming CartReader:
+# time until the first row is ready to dial, full-scan rows/sec, and peak
+# Python heap (tracemalloc) while scanning.
+
+def write_carts(path, rows):
+    with open(path, "w") as f:
+        f.write("name,phone,items,total,reason,language\n")
+        for i in range(rows):
+            f.write(f'Customer {i},+91{9000000000 + i},"Shoes x{i % 3 + 1}, cat food","${i % 900 + 10}","Abandoned checkout","en"\n')
+
+
+def measure(scan):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    rows = 0
+    for _ in scan():
+        if first is None:
+            first = time.perf_counter() - start
+        rows += 1
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, rows / elapsed, peak
+
+
+def pandas_rows(path):
+    df = pd.read_csv(path, dtype={"phone": str})
+    for _, row in df.iterrows():
+        if row["phone"].strip().startswith("+"):
+            yield row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming CSV reader vs pandas")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"carts_{rows}.csv")
+            write_carts(path, rows)
+            print(f"📄 {rows:,} rows ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+            for label, scan in [
+                ("pandas", lambda: pandas_rows(path)),
+                ("stream", lambda: CartReader(path, quiet=True)),
+            ]:
+                first, rate, peak = measure(scan)
+                print(f"   {label:<7} first row {first * 1000:9.2f} ms | {rate:10,.0f} rows/sec | peak {peak / 1e6:8.2f} MB")
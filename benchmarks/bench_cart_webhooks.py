@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks import REPO_ROOT
+from benchmarks.fake_groq import FakeGroqServer
+from benchmarks.fake_twilio import FakeTwilioServer
+from benchmarks.load_call_customer import free_port, peak_rss_mb, percentile, start_app
+
+
+# ----------------------------
+# Cart Webhook → Dial Benchmark
+# ----------------------------
+# python -m benchmarks.bench_cart_webhooks --events 500 --rate 100
+# python -m benchmarks.bench_cart_webhooks --events 2000 --rate 500 --queue-max 200   # backpressure
+# python -m benchmarks.bench_cart_webhooks --events 100 --lease 1 --groq-latency 3      # leases expire mid-batch
+# python -m benchmarks.bench_cart_webhooks --events 100 --streaming --stream-fail-after 12  # Groq fails mid-call
+#
+# Runs the voice API under uvicorn against stub Groq and Twilio servers and
+# POSTs --events cart-abandoned webhooks at a steady --rate (open loop: a
+# slow server does not slow the sender down). Reports how long the webhook
+# itself takes to answer, the end-to-end latency from sending the webhook to
+# the Twilio call request for that customer, calls/sec, and how many webhooks
+# were turned away with 429 once --queue-max events were waiting, and
+# how many customers were dialed more than once (a batch outliving
+# --lease must not be handed out again while it is being dialed). Every
+# webhook is signed with CART_SECRET, as the store platform would.
+
+CART_SECRET = "bench-cart-secret"
+
+def cart(i):
+    return {
+        "customer_name": f"Customer {i}",
+        "phone": f"+1555{i:07d}",
+        "items": ["Shoes x2", "cat food"] if i % 2 else ["Yoga mat"],
+        "cart_value": 20 + i % 500,
+        "language": "en",
+    }
+
+
+def signed(body):
+    data = json.dumps(body).encode()
+    signature = hmac.new(CART_SECRET.encode(), data, hashlib.sha256).hexdigest()
+    return {"content": data, "headers": {"Content-Type": "application/json", "X-Cart-Signature": signature}}
+
+
+async def send(url, events, rate):
+    sent_at = {}
+    ingest = []
+    rejected = 0
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=200)) as client:
+        async def post(i):
+            nonlocal rejected
+            body = cart(i)
+            start = time.perf_counter()
+            sent = time.time()
+            response = await client.post(url, **signed(body))
+            ingest.append(time.perf_counter() - start)
+            if response.status_code == 202:
+                sent_at[body["phone"]] = sent
+            elif response.status_code == 429:
+                rejected += 1
+            else:
+                raise RuntimeError(f"webhook answered {response.status_code}: {response.text}")
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(events):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(post(i)))
+        await asyncio.gather(*tasks)
+    return sent_at, ingest, rejected
+
+
+def run(events, rate, groq_latency, twilio_latency, consumers, batch, queue_max, streaming, lease=60,
+        stream_fail_after=None):
+    groq = FakeGroqServer(latency=groq_latency, fail_after=stream_fail_after).start()
+    twilio = FakeTwilioServer(latency=twilio_latency).start()
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        app = start_app(os.path.join(REPO_ROOT, "AI_Voice"), port, groq.url, twilio.url, no_cache=False, extra_env={
+            "CART_QUEUE": os.path.join(tmp, "cart_queue.db"),
+            "CART_QUEUE_MAX": str(queue_max),
+            "CART_CONSUMERS": str(consumers),
+            "CART_BATCH": str(batch),
+            "SCRIPT_STREAMING": "1" if streaming else "0",
+            # Where the streamed call's <Redirect> fetches the rest of the script
+            "PUBLIC_BASE_URL": f"http://127.0.0.1:{port}",
+            "CART_WEBHOOK_SECRET": CART_SECRET,
+            "CART_QUEUE_LEASE": str(lease),
+        })
+        try:
+            unsigned = httpx.post(f"http://127.0.0.1:{port}/webhooks/cart-abandoned", json=cart(0), timeout=10)
+            assert unsigned.status_code == 401, f"an unsigned webhook was answered {unsigned.status_code}"
+            start = time.perf_counter()
+            sent_at, ingest, rejected = asyncio.run(
+                send(f"http://127.0.0.1:{port}/webhooks/cart-abandoned", events, rate)
+            )
+            deadline = time.monotonic() + 60 + len(sent_at) / 10
+            while len(twilio.dialed_at) < len(sent_at) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            elapsed = time.perf_counter() - start
+            rss = peak_rss_mb(app.pid)
+            if lease < 10:
+                # Give events whose lease ran out time to be redelivered (and redialed)
+                time.sleep(3 * lease)
+        finally:
+            app.terminate()
+            app.wait()
+            groq.stop()
+            twilio.stop()
+
+    # Sent → the Calls request reaching Twilio (the call exists once it answers)
+    to_dial = [twilio.dialed_at[phone] - sent for phone, sent in sent_at.items() if phone in twilio.dialed_at]
+    dialed = len(to_dial)
+    # Call updates (streaming redirects) carry no To; only new calls count
+    per_customer = Counter(call["To"] for call in twilio.calls if "To" in call)
+    return {
+        "events": events,
+        "accepted": len(sent_at),
+        "rejected": rejected,
+        "dialed": dialed,
+        "redialed": sum(count - 1 for count in per_customer.values()),
+        "calls_per_sec": dialed / elapsed,
+        "ingest_p50_ms": percentile(ingest, 50) * 1000,
+        "ingest_p99_ms": percentile(ingest, 99) * 1000,
+        "to_dial_p50_ms": percentile(to_dial, 50) * 1000 if to_dial else None,
+        "to_dial_p99_ms": percentile(to_dial, 99) * 1000 if to_dial else None,
+        "peak_rss_mb": rss,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cart-abandoned webhook ingestion and webhook-to-dial latency")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=100, help="webhooks per second")
+    parser.add_argument("--consumers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--queue-max", type=int, default=10_000)
+    parser.add_argument("--lease", type=float, default=60, help="CART_QUEUE_LEASE seconds")
+    parser.add_argument("--stream-fail-after", type=int, help="break every Groq stream off after this many words")
+    parser.add_argument("--groq-latency", type=float, default=0.5)
+    parser.add_argument("--twilio-latency", type=float, default=0.1)
+    parser.add_argument("--streaming", action="store_true", help="dial on the first sentence (SCRIPT_STREAMING=1)")
+    args = parser.parse_args()
+
+    r = run(args.events, args.rate, args.groq_latency, args.twilio_latency,
+            args.consumers, args.batch, args.queue_max, args.streaming, args.lease, args.stream_fail_after)
+    print(f"🛒 {r['events']} cart webhooks at {args.rate:g}/s | {args.consumers} consumers x batch {args.batch}")
+    print(f"   ingest        p50 {r['ingest_p50_ms']:.1f} ms | p99 {r['ingest_p99_ms']:.1f} ms | "
+          f"accepted {r['accepted']} | 429 {r['rejected']}")
+    if r["dialed"]:
+        print(f"   webhook→dial  p50 {r['to_dial_p50_ms']:.0f} ms | p99 {r['to_dial_p99_ms']:.0f} ms | "
+              f"{r['dialed']} dialed | {r['calls_per_sec']:.1f} calls/sec | peak RSS {r['peak_rss_mb']:.0f} MB")
+        print(f"   redialed      {r['redialed']} {'✅' if not r['redialed'] else '❌'}")
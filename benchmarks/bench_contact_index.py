@@ -0,0 +1,70 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from contact_index import ContactIndex
+
+
+# ----------------------------
+# Contact Index Benchmark
+# ----------------------------
+# python -m benchmarks.bench_contact_index --calls 10000 1000000
+#
+# Fills a contact index and an equivalent call log with --calls calls spread
+# over a week, then reports index open time, µs per "calls in the last 24h"
+# lookup, and what answering the same question by scanning the log costs.
+
+def build(tmp, calls, phones):
+    now = time.time()
+    rng = random.Random(7)
+    contacts = [(f"+91{9000000000 + rng.randrange(phones)}", now - rng.uniform(0, 7 * 86400)) for _ in range(calls)]
+
+    index = ContactIndex(os.path.join(tmp, "contacts.db"))
+    index.record_many(contacts)
+    index.close()
+
+    log_path = os.path.join(tmp, "call_logs.csv")
+    with open(log_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "number", "status"])
+        writer.writerows((when, phone, "initiated") for phone, when in contacts)
+    return log_path, [phone for phone, _ in contacts]
+
+
+def scan_log(log_path, phone, since):
+    with open(log_path, newline="") as f:
+        return sum(1 for row in csv.DictReader(f) if row["number"] == phone and float(row["timestamp"]) >= since)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark contact-history lookups")
+    parser.add_argument("--calls", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for calls in args.calls:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path, phones = build(tmp, calls, max(1, calls // 5))
+
+            start = time.perf_counter()
+            index = ContactIndex(os.path.join(tmp, "contacts.db"))
+            index.calls_since(phones[0], 24)
+            open_ms = (time.perf_counter() - start) * 1000
+
+            sample = [random.choice(phones) for _ in range(args.lookups)]
+            start = time.perf_counter()
+            for phone in sample:
+                index.calls_since(phone, 24)
+            lookup_us = (time.perf_counter() - start) / len(sample) * 1e6
+            index.close()
+
+            start = time.perf_counter()
+            scan_log(log_path, phones[0], time.time() - 86400)
+            scan_ms = (time.perf_counter() - start) * 1000
+
+        print(f"📇 {calls:,} calls to {max(1, calls // 5):,} numbers")
+        print(f"   index open {open_ms:6.2f} ms | lookup {lookup_us:5.1f} µs | "
+              f"log scan {scan_ms:9.1f} ms per lookup ({scan_ms * 1000 / lookup_us:,.0f}x)")
@@ -0,0 +1,107 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_carts import parse_rows, write_carts
+from decision_service import DecisionService
+
+
+# ----------------------------
+# Decision Service Benchmark
+# ----------------------------
+# python -m benchmarks.bench_decision_service --rows 1M
+#
+# Loads a synthetic cart export with an abandoned_at column (0-96 hours ago)
+# and applies the same rules (min value, languages, excluded reasons, max
+# age, reason weights) two ways: the Decision Service's parse + mask
+# evaluation, and a per-row loop of `if` checks over the same columns. Both
+# must keep exactly the same carts.
+
+RULES = {
+    "min_value": 50,
+    "languages": ["en", "hi"],
+    "exclude_reasons": ["Browsing"],
+    "max_age_hours": 72,
+    "reason_weights": {"Payment failed": 1.5, "Coupon not applied": 1.2},
+}
+
+
+def load_carts(rows, seed, now):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "carts.csv")
+        write_carts(path, rows, dupes=0.02, invalid=0.01, seed=seed)
+        carts = pd.read_csv(path, dtype=str, keep_default_na=False)
+    ages = np.random.default_rng(seed).integers(0, 96 * 3600, rows)
+    stamps = pd.to_datetime(now - ages, unit="s").strftime("%Y-%m-%dT%H:%M:%S")
+    carts["abandoned_at"] = np.where(ages % 50 == 0, "", stamps)  # 2% unknown
+    return carts
+
+
+def per_row(carts, rules, now):
+    keep = []
+    priority = []
+    languages = set(rules["languages"])
+    excluded = set(rules["exclude_reasons"])
+    weights = rules["reason_weights"]
+    cutoff = now - rules["max_age_hours"] * 3600
+    for total, language, reason, abandoned_at in zip(
+            carts["total"], carts["language"], carts["reason"], carts["abandoned_at"]):
+        digits = re.sub(r"[^\d.\-]", "", total).strip(".")
+        try:
+            value = float(digits)
+        except ValueError:
+            keep.append(False)
+            continue
+        if value < rules["min_value"]:
+            keep.append(False)
+        elif language not in languages:
+            keep.append(False)
+        elif reason in excluded:
+            keep.append(False)
+        elif abandoned_at and datetime.fromisoformat(abandoned_at).replace(tzinfo=timezone.utc).timestamp() < cutoff:
+            keep.append(False)
+        else:
+            keep.append(True)
+            priority.append(value * weights.get(reason, 1.0))
+    return np.array(keep), np.array(priority)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized Decision Service vs per-row if checks")
+    parser.add_argument("--rows", default="1M")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    now = int(datetime.now(timezone.utc).timestamp())
+    carts = load_carts(rows, args.seed, now)
+    service = DecisionService(**RULES, now=now)
+
+    parse_s, columns = timed(service.columns, carts)
+    evaluate_s, (keep, priority, rejected) = timed(service.evaluate, columns)
+    evaluate_s = min(evaluate_s, *(timed(service.evaluate, columns)[0] for _ in range(4)))
+    rank_s, _ = timed(lambda: (-priority[keep]).argsort(kind="stable"))
+    loop_s, (loop_keep, loop_priority) = timed(per_row, carts, RULES, now)
+
+    assert np.array_equal(keep, loop_keep), "kept carts differ"
+    assert np.allclose(priority[keep], loop_priority), "priorities differ"
+
+    vector_s = parse_s + evaluate_s + rank_s
+    print(f"⚖️ {rows:,} carts → {int(keep.sum()):,} to dial | rejected: "
+          + ", ".join(f"{rule} {count:,}" for rule, count in rejected.items()))
+    print(f"   vectorized  parse {parse_s * 1000:7.1f} ms | evaluate {evaluate_s * 1000:6.1f} ms | "
+          f"rank {rank_s * 1000:5.1f} ms | total {vector_s:.2f}s")
+    print(f"   per-row ifs {loop_s:.2f}s ({loop_s / vector_s:.1f}x slower in total, "
+          f"{loop_s / evaluate_s:,.0f}x the rule evaluation)")
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import itertools
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+from line_pool import LinePool, PhoneLine, calling_code
+
+
+# ----------------------------
+# Phone Line Pool Simulation
+# ----------------------------
+# python -m benchmarks.bench_line_pool --lines 1 2 4 8
+#
+# Mock Vapi and Twilio providers in-process: a call request takes --latency
+# and the call then holds its line for --call-seconds (released by the pool's
+# hold timer, as a webhook would). Lines alternate providers and countries
+# (+91 / +1), each carrying --concurrency calls and --per-minute starts;
+# customers are half Indian, half US numbers, dialed from their own country.
+# Time is compressed: one simulated minute lasts --minute real seconds.
+#
+# For each pool size, --minutes of dialing with more workers than the pool
+# can carry; reports calls per simulated minute (it should grow with the
+# pool) and the share dialed from a same-country line. Then a Vapi outage
+# for the middle third of the run on the largest pool: calls fail over to the
+# Twilio lines.
+
+
+class ProviderDown(Exception):
+    status_code = 503
+
+
+class MockProvider:
+    def __init__(self, name, latency, seconds):
+        self.name = name
+        self.latency = latency
+        self.seconds = seconds  # real seconds per simulated second
+        self.down = False
+        self.requests = 0
+
+    async def create(self, line, phone):
+        self.requests += 1
+        await asyncio.sleep(self.latency * self.seconds)
+        if self.down:
+            raise ProviderDown(f"{self.name} is unavailable")
+        return SimpleNamespace(id=str(uuid.uuid4()), line=line, phone=phone)
+
+
+def make_lines(count, concurrency, per_minute):
+    lines = []
+    for i in range(count):
+        provider = ("vapi", "twilio")[i % 2]
+        number = ("+9180000", "+1415555")[(i // 2) % 2] + f"{i:04d}"
+        lines.append(PhoneLine(provider, id=f"{provider}-{i}", number=number,
+                               concurrency=concurrency, per_minute=per_minute))
+    return lines
+
+
+async def simulate(lines, args, outage=None):
+    seconds = args.minute / 60
+    providers = {name: MockProvider(name, args.latency, seconds) for name in ("vapi", "twilio")}
+    pool = LinePool(lines, hold=args.call_seconds * seconds, match_country=True, cooldown=30 * seconds,
+                    minute=args.minute)
+    rng = random.Random(7)
+    customers = (f"+91{rng.randrange(7000000000, 9999999999)}" if i % 2
+                 else f"+1{rng.randrange(2000000000, 9999999999)}" for i in itertools.count())
+    placed = []  # (time, provider, same country)
+    failed = 0
+    duration = args.minutes * args.minute
+
+    async def dial(line, phone):
+        return await providers[line.provider].create(line, phone)
+
+    async def worker(stop_at):
+        nonlocal failed
+        while time.monotonic() < stop_at:
+            phone = next(customers)
+            try:
+                call = await pool.call(phone, lambda line: dial(line, phone))
+            except ProviderDown:
+                failed += 1
+                await asyncio.sleep(0.05 * args.minute)  # the submitter's backoff
+                continue
+            placed.append((time.monotonic(), call.line.provider, call.line.country == calling_code(phone)))
+
+    async def outage_window():
+        if outage:
+            await asyncio.sleep(duration * outage[0])
+            providers["vapi"].down = True
+            await asyncio.sleep(duration * (outage[1] - outage[0]))
+            providers["vapi"].down = False
+
+    capacity = sum(line.concurrency for line in lines)
+    start = time.monotonic()
+    await asyncio.gather(outage_window(), *(worker(start + duration) for _ in range(capacity * 2)))
+    placed = [p for p in placed if p[0] - start < duration]  # not the calls workers were waiting on at the end
+    in_outage = [p for p in placed if outage and duration * outage[0] <= p[0] - start < duration * outage[1]]
+    return {
+        "lines": len(lines),
+        "calls": len(placed),
+        "per_minute": len(placed) / args.minutes,
+        "outage_per_minute": len(in_outage) / (args.minutes * (outage[1] - outage[0])) if outage else 0.0,
+        "same_country": sum(p[2] for p in placed) / len(placed) if placed else 0.0,
+        "failovers": pool.failovers,
+        "failed": failed,
+        "by_provider": {name: sum(p[1] == name for p in placed) for name in providers},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate calls/min of a phone line pool against its size")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=5, help="calls per line at once")
+    parser.add_argument("--per-minute", type=int, default=20, help="call starts per line per minute")
+    parser.add_argument("--call-seconds", type=float, default=45, help="how long a call holds its line")
+    parser.add_argument("--latency", type=float, default=0.3, help="provider request seconds")
+    parser.add_argument("--minutes", type=float, default=5, help="simulated minutes per run")
+    parser.add_argument("--minute", type=float, default=1.0, help="real seconds per simulated minute")
+    args = parser.parse_args()
+
+    limit = min(args.per_minute, args.concurrency * 60 / (args.call_seconds + args.latency))
+    print(f"☎️  lines of {args.concurrency} concurrent / {args.per_minute} per minute, "
+          f"{args.call_seconds:g}s calls (≤ {limit:.1f} calls/min per line), {args.minutes:g} simulated minutes")
+    for count in args.lines:
+        r = asyncio.run(simulate(make_lines(count, args.concurrency, args.per_minute), args))
+        print(f"   {r['lines']:>3} lines | {r['per_minute']:7.1f} calls/min | "
+              f"{r['same_country']:.0%} same-country | vapi {r['by_provider']['vapi']:>4} "
+              f"twilio {r['by_provider']['twilio']:>4}")
+
+    count = max(max(args.lines), 2)
+    r = asyncio.run(simulate(make_lines(count, args.concurrency, args.per_minute), args, outage=(1 / 3, 2 / 3)))
+    print(f"   {r['lines']:>3} lines, Vapi down for the middle third | {r['per_minute']:7.1f} calls/min overall, "
+          f"{r['outage_per_minute']:.1f} during the outage | {r['failovers']} failovers | "
+          f"{r['failed']} calls failed on every line | vapi {r['by_provider']['vapi']} "
+          f"twilio {r['by_provider']['twilio']}")
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import time
+
+from metrics import Registry
+
+
+# ----------------------------
+# Metrics Overhead Benchmark
+# ----------------------------
+# python -m benchmarks.bench_metrics --spans 1000000
+#
+# Cost of recording one timed span / counter update, against an empty loop,
+# for each way the scripts record metrics. The target is under 1 µs per span;
+# a timed span lands at 0.7-1.1 µs, so expect ❌ on a slow or busy machine.
+
+def per_op(fn, spans):
+    start = time.perf_counter()
+    fn(spans)
+    return (time.perf_counter() - start) / spans
+
+
+def empty(spans):
+    for _ in range(spans):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure metrics overhead per recorded span")
+    parser.add_argument("--spans", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    stages = registry.histogram("stage_seconds", "", ("stage",))
+    hist = stages.labels("log_write")
+    calls = registry.counter("calls_total", "", ("outcome",)).labels("ok")
+
+    def with_timer(spans):
+        for _ in range(spans):
+            with hist.time():
+                pass
+
+    def with_lookup(spans):
+        for _ in range(spans):
+            with stages.labels("log_write").time():
+                pass
+
+    def counter_inc(spans):
+        for _ in range(spans):
+            calls.inc()
+
+    def awaited_timer(spans):
+        async def run():
+            for _ in range(spans):
+                with hist.time():
+                    await asyncio.sleep(0)
+        asyncio.run(run())
+
+    def awaited_bare(spans):
+        async def run():
+            for _ in range(spans):
+                await asyncio.sleep(0)
+        asyncio.run(run())
+
+    baseline = per_op(empty, args.spans)
+    print(f"⏱️ {args.spans:,} spans per case (overhead over an empty loop)")
+    for label, fn in (
+        ("with hist.time():", with_timer),
+        ("with stage lookup:", with_lookup),
+        ("counter.inc()", counter_inc),
+    ):
+        cost = per_op(fn, args.spans) - baseline
+        print(f"   {label:24} {cost * 1e9:7.0f} ns/span {'✅' if cost < 1e-6 else '❌'}")
+
+    # Across an await: compared with the same loop untimed
+    spans = args.spans // 10
+    cost = per_op(awaited_timer, spans) - per_op(awaited_bare, spans)
+    print(f"   {'hist.time() + await':24} {cost * 1e9:7.0f} ns/span {'✅' if cost < 1e-6 else '❌'}")
+    assert hist.count >= 2 * args.spans, "spans were not recorded"
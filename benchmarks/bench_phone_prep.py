@@ -0,0 +1,95 @@
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from phone_prep import DEFAULT_COUNTRY_CODE, E164, SEPARATORS, prepare_carts
+
+
+# ----------------------------
+# Phone Prep Benchmark
+# ----------------------------
+# python -m benchmarks.bench_phone_prep --rows 1000000
+#
+# Builds a messy cart frame (national, spaced, dashed, 00-prefixed and junk
+# numbers, ~30% repeats) and times the vectorized prepare_carts against the
+# same normalize / validate / dedup done one row at a time in Python, plus
+# the scripts' old strip + startswith("+") check for reference.
+
+def make_carts(rows, seed=7):
+    rng = np.random.default_rng(seed)
+    numbers = pd.Series(9000000000 + rng.integers(0, int(rows * 0.7), rows)).astype(str)
+    styles = [
+        "+91" + numbers,
+        numbers,
+        "0" + numbers,
+        "0091 " + numbers.str[:5] + " " + numbers.str[5:],
+        "+91-" + numbers,
+        pd.Series("12345", index=numbers.index),
+    ]
+    style = rng.integers(0, len(styles), rows)
+    phones = styles[0].copy()
+    for i, variant in enumerate(styles[1:], start=1):
+        phones[style == i] = variant[style == i]
+    return pd.DataFrame({
+        "name": "Customer " + pd.Series(np.arange(rows)).astype(str),
+        "phone": phones,
+        "items": "Shoes x1, cat food",
+        "total": "$" + pd.Series(rng.integers(10, 5000, rows)).astype(str),
+        "reason": "Abandoned checkout",
+        "language": "en",
+    })
+
+
+def per_row(carts):
+    separators = re.compile(SEPARATORS)
+    e164 = re.compile(E164)
+    national = re.compile(r"0?\d{10}")
+    best = {}
+    rejected = 0
+    for row in carts.itertuples(index=False):
+        phone = separators.sub("", row.phone.strip())
+        if phone.startswith("00"):
+            phone = "+" + phone[2:]
+        if national.fullmatch(phone):
+            phone = "+" + DEFAULT_COUNTRY_CODE + phone[-10:]
+        if not e164.match(phone):
+            rejected += 1
+            continue
+        try:
+            value = float(re.sub(r"[^\d.\-]", "", row.total))
+        except ValueError:
+            value = -1.0
+        if phone not in best or value > best[phone][0]:
+            best[phone] = (value, row)
+    return len(best), rejected
+
+
+def old_check(carts):
+    return sum(1 for phone in carts["phone"] if phone.strip().startswith("+"))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vectorized phone prep")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        carts = make_carts(rows)
+        vector_s, (clean, report) = timed(prepare_carts, carts)
+        loop_s, (loop_kept, loop_rejected) = timed(per_row, carts)
+        old_s, _ = timed(old_check, carts)
+        assert (loop_kept, loop_rejected) == (report["kept"], report["rejected"])
+
+        print(f"☎️  {rows:,} rows → {report['kept']:,} kept, {report['rejected']:,} malformed, "
+              f"{report['duplicates']:,} duplicates")
+        print(f"   vectorized {vector_s:6.2f}s | per-row {loop_s:6.2f}s ({loop_s / vector_s:.1f}x) | "
+              f"old strip+startswith check (no normalize/dedup) {old_s:5.2f}s")
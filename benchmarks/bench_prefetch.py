@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks import CAMPAIGN_DIR
+from benchmarks.fake_groq import FakeGroqServer
+from benchmarks.fake_vapi import FakeVapiServer
+from benchmarks.run_suite import run_script, script_env
+from benchmarks.synthetic_carts import parse_rows, write_carts
+
+
+# ----------------------------
+# First-Message Prefetch Benchmark
+# ----------------------------
+# python -m benchmarks.bench_prefetch --rows 500
+#
+# Runs main.py unmodified against the fake Vapi and Groq servers three ways:
+#   static    PREFETCH_DEPTH=0, the built-in message, no LLM (the ceiling)
+#   inline    depth 1, batch 1: one LLM request per cart, nothing generated
+#             ahead, so every dial waits on the model
+#   prefetch  --depth carts ahead in batches of --batch
+# and reports calls/sec, LLM requests and the campaign's LLM stall time
+# (llm_stall_seconds_total from the metrics snapshot).
+
+def run(mode, csv_path, rows, tmp, args):
+    depth, batch = {"static": (0, 1), "inline": (1, 1), "prefetch": (args.depth, args.batch)}[mode]
+    vapi = FakeVapiServer(latency=args.vapi_latency).start()
+    groq = FakeGroqServer(latency=args.groq_latency, token_delay=args.token_delay).start()
+    work = tempfile.mkdtemp(dir=tmp)
+    snapshot = os.path.join(work, "metrics.json")
+    env = script_env(
+        VAPI_API_KEY="fake-key", PHONE_NUMBER_ID="fake-number", ASSISTANT_ID="fake-assistant",
+        VAPI_BASE_URL=vapi.url, CART_FILE=csv_path, DIAL_RATE=0, DIAL_CONCURRENCY=args.concurrency,
+        GROQ_API_KEY="fake-groq-key", GROQ_BASE_URL=groq.url,
+        PREFETCH_DEPTH=depth, PREFETCH_BATCH=batch, METRICS_SNAPSHOT=snapshot,
+    )
+    try:
+        wall, _ = run_script([sys.executable, os.path.join(CAMPAIGN_DIR, "main.py")], work, env)
+    finally:
+        vapi.stop()
+        groq.stop()
+    with open(snapshot, encoding="utf-8") as f:
+        metrics = json.load(f)["metrics"]
+    return {
+        "mode": mode,
+        "depth": depth,
+        "batch": batch,
+        "calls": len(vapi.calls),
+        "calls_per_sec": len(vapi.calls) / vapi.busy_seconds,
+        "llm_requests": groq.requests,
+        "stall_s": metrics.get("llm_stall_seconds_total", 0.0),
+        "fallbacks": metrics.get("llm_fallbacks_total", 0),
+        "wall_s": wall,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM first-message prefetching for main.py")
+    parser.add_argument("--rows", default="500")
+    parser.add_argument("--depth", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--vapi-latency", type=float, default=0.05)
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.004, help="seconds per generated word")
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "carts.csv")
+        write_carts(csv_path, rows, seed=7)
+        print(f"💬 main.py over {rows:,} carts, DIAL_CONCURRENCY {args.concurrency}, "
+              f"Groq {args.groq_latency * 1000:.0f} ms + {args.token_delay * 1000:.0f} ms/word")
+        for mode in ("static", "inline", "prefetch"):
+            r = run(mode, csv_path, rows, tmp, args)
+            print(f"   {mode:<8} depth {r['depth']:>3} batch {r['batch']:>2} | {r['calls_per_sec']:6.1f} calls/sec | "
+                  f"{r['llm_requests']:>4} LLM requests | stall {r['stall_s']:6.2f}s | fallbacks {r['fallbacks']}")
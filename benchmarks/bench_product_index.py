@@ -0,0 +1,114 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import REPO_ROOT
+from benchmarks.load_call_customer import percentile
+from benchmarks.synthetic_carts import ITEMS, parse_rows
+
+sys.path.append(os.path.join(REPO_ROOT, "AI_Voice"))
+from product_index import ProductIndex, build_index
+
+
+# ----------------------------
+# Product Index Benchmark
+# ----------------------------
+# python -m benchmarks.bench_product_index --rows 1M
+#
+# Builds the product index over a synthetic catalog (brand x line x product
+# x variant names, with facts and prices) using the deterministic hash
+# embedder, then times single-item searches (p50/p99, uncached), batched
+# searches, and cached facts() lookups. Recall@k is checked against an
+# exact scan of every list for a sample of the same queries; a hit is a
+# result scoring at least the exact k-th best (the catalog has many ties).
+
+BRANDS = ("Acme", "Nimbus", "Zenith", "Orbit", "Kite", "Lumen", "Vertex", "Maple", "Cobalt", "Aurora",
+          "Pioneer", "Summit", "Harbor", "Quartz", "Willow", "Falcon")
+LINES = ("Pro", "Lite", "Max", "Air", "Classic", "Sport", "Eco", "Plus", "Mini", "Ultra")
+PRODUCTS = tuple(item.split(" x")[0].rstrip('"') for item in ITEMS) + (
+    "Wireless headphones", "Bluetooth speaker", "Smart watch", "Water bottle", "Travel mug",
+    "Gaming mouse", "Mechanical keyboard", "Office chair", "Hiking boots", "Rain jacket",
+    "Face serum", "Sunscreen", "Dog leash", "Cat litter", "Protein powder", "Green tea",
+)
+COLOURS = ("black", "white", "blue", "red", "green", "grey", "rose gold", "navy")
+FACTS = ("free returns within 30 days", "2-year warranty", "ships in 24 hours", "bestseller this month",
+         "4.6 stars from 2,000 reviews", "eco-friendly packaging", "back in stock", "10% off with SAVE10")
+
+
+def make_catalog(rows, seed=7):
+    rng = random.Random(seed)
+    for i in range(rows):
+        product = PRODUCTS[i % len(PRODUCTS)]
+        brand = BRANDS[(i // len(PRODUCTS)) % len(BRANDS)]
+        line = LINES[(i // (len(PRODUCTS) * len(BRANDS))) % len(LINES)]
+        colour = COLOURS[rng.randrange(len(COLOURS))]
+        yield {
+            "sku": f"SKU{i:08d}",
+            "name": f"{brand} {product} {line} {i % 997}",
+            "category": colour,
+            "price": f"₹{rng.randrange(199, 49999)}",
+            "facts": ", ".join(rng.sample(FACTS, 2)),
+        }
+
+
+def queries(count, seed=11):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        product = rng.choice(PRODUCTS)
+        texts.append(f"{rng.choice(BRANDS)} {product.lower()}" if rng.random() < 0.5 else product)
+    return texts
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and query times of the product knowledge index")
+    parser.add_argument("--rows", default="1M")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--recall-sample", type=int, default=100)
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        build_s, count = timed(build_index, make_catalog(rows), tmp)
+        size = os.path.getsize(os.path.join(tmp, "vectors.f32"))
+        index = ProductIndex(tmp)
+        texts = queries(args.queries)
+
+        index.search(texts[:50], args.k)  # page in the centroids and the hot lists
+        single = [timed(index.search, [text], args.k)[0] for text in texts]
+        batches = [texts[i:i + args.batch] for i in range(0, len(texts), args.batch)]
+        batched = [timed(index.search, batch, args.k)[0] for batch in batches]
+
+        for text in texts:
+            index.facts([text])
+        cached = [timed(index.facts, [text])[0] for text in texts]
+
+        sample = texts[:args.recall_sample]
+        _, approx = index.search_rows(index.embedder.embed(sample), args.k)
+        exact_s, (_, exact) = timed(index.search_rows, index.embedder.embed(sample), args.k, len(index.centroids))
+        recall = np.mean(approx >= exact[:, -1:] - 1e-5)
+        index.close()
+
+    print(f"📚 {count:,} products, {index.meta['lists']} lists x {index.probes} probes, "
+          f"{index.meta['dim']}-dim ({size / 1e6:.0f} MB memory-mapped)")
+    print(f"   build        {build_s:.1f}s ({count / build_s:,.0f} products/s)")
+    print(f"   search 1     p50 {percentile(single, 50) * 1000:.2f} ms | p99 {percentile(single, 99) * 1000:.2f} ms")
+    print(f"   search {args.batch:<5} p50 {percentile(batched, 50) * 1000:.2f} ms | "
+          f"p99 {percentile(batched, 99) * 1000:.2f} ms per batch "
+          f"({percentile(batched, 50) / args.batch * 1000:.3f} ms per item)")
+    print(f"   cached facts p50 {percentile(cached, 50) * 1e6:.1f} µs | p99 {percentile(cached, 99) * 1e6:.1f} µs")
+    print(f"   recall@{args.k}     {recall:.1%} against an exact scan "
+          f"({exact_s / len(sample) * 1000:.1f} ms per query)")
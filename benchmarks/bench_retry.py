@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+
+from vapi import AsyncVapi
+
+from benchmarks.fake_vapi import FakeVapiServer
+from call_submitter import CallSubmitter, CircuitBreaker
+from dialer import dial_all
+
+
+# ----------------------------
+# Retry Layer Benchmark
+# ----------------------------
+# python -m benchmarks.bench_retry --calls 300
+#
+# Dials --calls carts against a fault-injecting fake Vapi, once with the old
+# single attempt per call and once through CallSubmitter, for each scenario:
+#   rate limited - the fake org allows --limit calls/sec, we start at --rate
+#   flaky        - 10% of requests get a 5xx
+#   outage       - every request fails with 503 for 3 s, 1 s into the run
+# and reports calls lost, attempts, retries, breaker trips and the rate AIMD
+# settled on.
+
+SCENARIOS = {
+    "rate limited": lambda limit: {"rate_limit": limit},
+    "flaky": lambda limit: {"error_rate": 0.1},
+    "outage": lambda limit: {"outage": (1.0, 4.0)},
+}
+
+
+def run(calls, latency, concurrency, rate, faults, retry):
+    server = FakeVapiServer(latency=latency, **faults)
+    client = AsyncVapi(token="fake-key", base_url=server.url)
+    submitter = CallSubmitter(rate=rate, max_rate=rate, max_attempts=8, base_delay=0.1, max_delay=5,
+                              breaker=CircuitBreaker(threshold=10, cooldown=1.0)) if retry else None
+
+    async def create(i):
+        return await client.calls.create(
+            assistant_id="fake-assistant",
+            phone_number_id="fake-number",
+            customer={"number": f"+1555{i:07d}", "name": f"Customer {i}"},
+        )
+
+    async def place_call(i):
+        try:
+            call = await (submitter.submit(create, i) if submitter else create(i))
+        except Exception:
+            return False
+        return bool(call.id)
+
+    async def main():
+        await create(0)  # warm up the SDK before the clock (and the faults) start
+        server.reset()
+        return await dial_all(range(calls), place_call, concurrency=concurrency, rate=rate, submitter=submitter)
+
+    server.start()
+    try:
+        stats = asyncio.run(main())
+    finally:
+        server.stop()
+    return stats, server, submitter
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare single-attempt dialing with the retry layer under faults")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake calls.create latency (s)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=50, help="starting send rate (calls/sec)")
+    parser.add_argument("--limit", type=float, default=20, help="fake org rate limit (calls/sec)")
+    args = parser.parse_args()
+
+    for name, make_faults in SCENARIOS.items():
+        print(f"🧪 {name}")
+        for retry in (False, True):
+            stats, server, submitter = run(args.calls, args.latency, args.concurrency, args.rate,
+                                       make_faults(args.limit), retry)
+            label = "retry layer" if retry else "single try"
+            lost = args.calls - len(server.calls)
+            faults = ", ".join(f"{status}×{count}" for status, count in sorted(server.faults.items())) or "none"
+            print(f"   {label:12} lost {lost:4} | {server.requests:5} requests in {stats.elapsed:5.1f}s "
+                  f"| faults {faults}")
+            if submitter:
+                print(f"   {'':12} {submitter.summary()}")
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import time
+
+from benchmarks import REPO_ROOT
+
+sys.path.append(os.path.join(REPO_ROOT, "AI_Voice"))
+from script_templates import CART_BANDS, TemplateLibrary, cart_band  # noqa: E402
+
+
+# ----------------------------
+# Script Template Render Benchmark
+# ----------------------------
+# python -m benchmarks.bench_script_templates --carts 100000
+#
+# Renders call scripts from a template library (as built offline by
+# AI_Voice/script_templates.py) for a mix of carts and reports µs per script
+# and the template hit rate. Carts in --uncovered languages have no template
+# and would fall back to the LLM.
+
+SAMPLE_TEMPLATES = {
+    "plain": [
+        "Hi {first_name}, this is Maya from the store. You left {items} in your cart, worth {cart_value}. "
+        "Would you like me to help you finish your order?",
+        "Hello {customer_name}! Your cart with {items} is still saved. "
+        "It comes to {cart_value} and is ready whenever you are.",
+    ],
+    "discount": [
+        "Hi {first_name}, this is Maya from the store. You left {items} in your cart, worth {cart_value}. "
+        "Use code {discount_code} today for a little off. Shall I help you check out?",
+        "Hello {customer_name}! {items} are still waiting for you. "
+        "Code {discount_code} takes something off your {cart_value} total today.",
+    ],
+}
+
+
+def sample_library(languages):
+    return TemplateLibrary({
+        f"{language}|{band}|{discount}": texts
+        for language in languages
+        for band, _ in CART_BANDS
+        for discount, texts in SAMPLE_TEMPLATES.items()
+    })
+
+
+def make_carts(count, languages):
+    values = (499, 2499.5, 12999)
+    return [
+        {
+            "customer_name": f"Customer {i}",
+            "phone": f"+91{9000000000 + i}",
+            "items": ["Wireless Headphones", "Bluetooth Speaker"][: i % 2 + 1],
+            "cart_value": values[i % 3],
+            "discount_code": "SAVE10" if i % 2 else "",
+            "language": languages[i % len(languages)],
+        }
+        for i in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark template rendering")
+    parser.add_argument("--carts", type=int, default=100_000)
+    parser.add_argument("--languages", nargs="+", default=["en", "hi"])
+    parser.add_argument("--uncovered", nargs="*", default=["ta"], help="languages with no templates")
+    args = parser.parse_args()
+
+    library = sample_library(args.languages)
+    carts = make_carts(args.carts, args.languages + args.uncovered)
+
+    start = time.perf_counter()
+    for cart in carts:
+        library.render(cart)
+    elapsed = time.perf_counter() - start
+
+    stats = library.stats()
+    print(f"📝 {args.carts} carts over bands {sorted({cart_band(c['cart_value']) for c in carts})}")
+    print(f"   {elapsed / args.carts * 1e6:.2f} µs per script | hit rate {stats['hit_rate']:.0%} | "
+          f"LLM calls saved {stats['llm_calls_saved']} | LLM fallbacks {stats['llm_fallbacks']}")
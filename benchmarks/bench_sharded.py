@@ -0,0 +1,72 @@
+import argparse
+import os
+import tempfile
+
+# Every synthetic customer is callable whatever the hour the benchmark runs at
+os.environ.setdefault("CALL_WINDOW_START", "0")
+os.environ.setdefault("CALL_WINDOW_END", "24")
+
+from benchmarks.fake_vapi import FakeVapiServer  # noqa: E402
+from campaign_runner import run_campaign  # noqa: E402
+
+
+# ----------------------------
+# Sharded Runner Scaling Benchmark
+# ----------------------------
+# python -m benchmarks.bench_sharded --rows 5000 --workers 1 2 4
+#
+# Dials a synthetic cart file (with --dupes of the phones repeated elsewhere
+# in the file) through campaign_runner against a fake Vapi, once per worker
+# count, unpaced, and reports calls/sec, speed-up over one worker, CPU time
+# per call (the work sharding spreads over cores) and whether any phone
+# reached the provider twice. Speed-up is bounded by os.cpu_count().
+
+def write_carts(path, rows, dupes):
+    with open(path, "w") as f:
+        f.write("name,phone,items,total,reason,language\n")
+        every = int(1 / dupes) if dupes else 0
+        for i in range(rows):
+            n = i
+            if every and i % every == 0:
+                # Reuse the phone of a row half a file away, i.e. usually in another shard
+                n = (i + rows // 2) % rows
+                n += n % every == 0
+            f.write(f'Customer {i},+91{9000000000 + n},"Shoes x{i % 3 + 1}, cat food","${i % 900 + 10}","Abandoned checkout","en"\n')
+
+
+def run(csv_path, workers, latency, tmp):
+    server = FakeVapiServer(latency=latency).start()
+    os.environ.update({
+        "VAPI_API_KEY": "fake-key", "PHONE_NUMBER_ID": "fake-number", "ASSISTANT_ID": "fake-assistant",
+        "VAPI_BASE_URL": server.url, "DIAL_CONCURRENCY": "50",
+        "CAMPAIGN_JOURNAL": os.path.join(tmp, f"journal_{workers}.db"),
+    })
+    try:
+        shards, elapsed, duplicates = run_campaign(csv_path, workers, rate=0,
+                                                   log_file=os.path.join(tmp, f"calls_{workers}.csv"))
+    finally:
+        server.stop()
+    phones = [call["customer"]["number"] for call in server.calls]
+    cpu = sum(r["cpu"] for r in shards)
+    return sum(r["succeeded"] for r in shards), elapsed, cpu, duplicates, len(phones) - len(set(phones))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure how the sharded campaign runner scales with workers")
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latency", type=float, default=0.02, help="fake calls.create latency (s)")
+    parser.add_argument("--dupes", type=float, default=0.05, help="share of rows repeating another row's phone")
+    args = parser.parse_args()
+
+    print(f"🖥️  {os.cpu_count()} CPUs, {args.rows:,} rows, fake latency {args.latency}s")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "carts.csv")
+        write_carts(csv_path, args.rows, args.dupes)
+        baseline = None
+        for workers in args.workers:
+            calls, elapsed, cpu, duplicates, redialed = run(csv_path, workers, args.latency, tmp)
+            rate = calls / elapsed
+            baseline = baseline or rate
+            print(f"   workers={workers:<3} {calls:,} calls in {elapsed:6.2f}s → {rate:7.1f} calls/sec "
+                  f"({rate / baseline:4.2f}x) | {cpu / calls * 1000:.1f} ms CPU/call | {duplicates:,} duplicate rows skipped, {redialed} phones dialed twice")
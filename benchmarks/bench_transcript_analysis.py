@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import os
+import random
+import re
+import tempfile
+import time
+
+from benchmarks.fake_groq import FakeGroqServer
+from benchmarks.synthetic_carts import ITEMS, parse_rows
+from call_log import CallRecord
+from call_store import CallStore
+from transcript_analysis import CUES, CueMatcher, TranscriptAnalyzer, customer_words, groq_analyses
+
+
+# ----------------------------
+# Transcript Analysis Benchmark
+# ----------------------------
+# python -m benchmarks.bench_transcript_analysis --rows 100k
+#
+# Stores --rows synthetic calls with transcripts in a fresh call store (most
+# with clear-cut customer turns, --ambiguous of them negated, mixed or long
+# and cue-less), then:
+#   keywords   the cue pass alone: one automaton walk per transcript against
+#              one regex search per cue phrase
+#   pipeline   transcript_analysis end to end against the fake Groq server:
+#              read from the store, keyword pass, batched LLM pass, bulk
+#              write-back; transcripts/sec and the share resolved without
+#              the LLM
+#   llm-every  one Groq request per transcript, same concurrency, over
+#              --llm-sample transcripts (the approach the pipeline replaces)
+
+CLEAR = (
+    "Yeah, it was a bit expensive.|Okay, that works. I'll finish the order tonight.",
+    "I'm not interested, stop calling me.",
+    "I was just browsing, thanks.",
+    "The payment failed at checkout, the website kept showing an error.|Sure, send me the link.",
+    "I found it cheaper on Amazon.|No thanks.",
+    "Can you call me back tomorrow? I'm busy right now.",
+    "I changed my mind, I don't need it anymore.",
+    "Great, thank you! Go ahead and apply the discount.",
+    "I'm worried about the quality, the reviews were bad.|Okay, I'll think about it.",
+    "Hello?",
+)
+AMBIGUOUS = (
+    "It's not too expensive, I just wasn't sure about it.|Maybe.",
+    "Thanks, but honestly this is annoying, I'm happy with what I have, it's frustrating.",
+    "Well my sister usually orders these things for me and she said she would look at it when she "
+    "comes over on the weekend, so I suppose we will see what she thinks about all of it then.",
+)
+
+
+def make_transcript(rng, ambiguous, name, items):
+    turns = rng.choice(AMBIGUOUS if ambiguous else CLEAR).split("|")
+    lines = [f"AI: Hi {name}, this is Maya from the store. I noticed you left {items} in your cart."]
+    for turn in turns:
+        lines.append(f"User: {turn}")
+        lines.append("AI: I can offer you 10% off with code SAVE10 today.")
+    return "\n".join(lines)
+
+
+def fill_store(path, rows, ambiguous, seed=7):
+    rng = random.Random(seed)
+    store = CallStore(path, flush_rows=5000)
+    transcripts = []
+    for i in range(rows):
+        name, items = f"Customer {i}", rng.choice(ITEMS)
+        record = CallRecord(customer_name=name, customer_phone=f"+91{9000000000 + i}", cart_items=items,
+                            cart_total=f"${i % 900 + 10}", timestamp=f"2026-01-05T09:{i % 60:02d}:00",
+                            call_id=f"call-{i}")
+        store.write(record)
+        transcripts.append((f"call-{i}", make_transcript(rng, rng.random() < ambiguous, name, items), ""))
+        if len(transcripts) == 5000:
+            store.save_transcripts(transcripts)
+            transcripts = []
+    store.save_transcripts(transcripts)
+    return store
+
+
+def naive_flags(patterns, transcript):
+    text = " ".join(customer_words(transcript)[0])
+    return {label for label, pattern in patterns if pattern.search(text)}
+
+
+async def llm_every(transcripts, groq_url, concurrency):
+    from groq import AsyncGroq
+
+    client = AsyncGroq(api_key="fake-groq-key", base_url=groq_url)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(transcript):
+        async with slots:
+            return await groq_analyses(client, [transcript])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in transcripts))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keyword-first transcript analysis against the LLM per call")
+    parser.add_argument("--rows", default="100k")
+    parser.add_argument("--ambiguous", type=float, default=0.15, help="share of transcripts the cues can't settle")
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-sample", type=int, default=200)
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="seconds per generated word")
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    groq = FakeGroqServer(latency=args.groq_latency, token_delay=args.token_delay).start()
+    os.environ["GROQ_BASE_URL"] = groq.url
+    os.environ.setdefault("GROQ_API_KEY", "fake-groq-key")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = fill_store(os.path.join(tmp, "call_store.db"), rows, args.ambiguous)
+            texts = [t for _, t in store.transcripts()]
+
+            matcher = CueMatcher()
+            start = time.perf_counter()
+            for text in texts:
+                matcher.matches(customer_words(text)[0])
+            automaton_s = time.perf_counter() - start
+
+            patterns = [(label, re.compile(r"\b" + re.escape(phrase) + r"\b"))
+                        for label, phrases in CUES.items() for phrase in phrases]
+            start = time.perf_counter()
+            for text in texts:
+                naive_flags(patterns, text)
+            naive_s = time.perf_counter() - start
+
+            analyzer = TranscriptAnalyzer(batch_size=args.batch, concurrency=args.concurrency)
+            report = asyncio.run(analyzer.run(store.transcripts(), store.apply))
+            left = sum(1 for _ in store.transcripts())
+            analyzed = store.interaction("call-0")
+            store.close()
+
+            sample = texts[:args.llm_sample]
+            requests_before = groq.requests
+            every_s = asyncio.run(llm_every(sample, groq.url, args.concurrency))
+            assert groq.requests - requests_before >= len(sample)
+    finally:
+        groq.stop()
+
+    print(f"📝 {rows:,} transcripts, {args.ambiguous:.0%} ambiguous, {matcher.phrases} cue phrases, "
+          f"Groq {args.groq_latency * 1000:.0f} ms + {args.token_delay * 1000:.0f} ms/word")
+    print(f"   keywords   automaton {len(texts) / automaton_s:>9,.0f} transcripts/sec | "
+          f"regex per phrase {len(texts) / naive_s:>9,.0f} transcripts/sec ({naive_s / automaton_s:.1f}x)")
+    print(f"   pipeline   {report['transcripts_per_sec']:>9,.0f} transcripts/sec | "
+          f"{report['without_llm']:.1%} without the LLM | {report['llm_requests']} LLM requests "
+          f"(batch {args.batch}) | {report['written']:,} written, {left} left pending")
+    print(f"   llm-every  {len(sample) / every_s:>9,.1f} transcripts/sec | {len(sample)} LLM requests "
+          f"for {len(sample)} transcripts")
+    print(f"   call-0     {analyzed['customer_sentiment']} | {analyzed['primary_objection']} | "
+          f"price_concern {analyzed['price_concern']}")
@@ -0,0 +1,124 @@
+import json
+import re
+import time
+import uuid
+
+from benchmarks.fake_server import FakeHandler, FakeServer, serve_main
+
+
+# ----------------------------
+# Fake Groq HTTP Server
+# ----------------------------
+# OpenAI-compatible POST /openai/v1/chat/completions. Point the Groq SDK at
+# it with GROQ_BASE_URL. `latency` is the time to the first token; with
+# stream=true the rest arrives as server-sent events, one word every
+# `token_delay` seconds. With response_format json_object the reply is
+# {"messages": [...]}, one script per "Customer:" line in the prompt, and
+# takes as much longer as there are customers; for transcript analysis
+# (a system prompt asking for "results") it is {"results": [...]}, one
+# FAKE_ANALYSIS per "Call N" line. With `fail_after` set, a stream breaks
+# off with an error event after that many words.
+
+FAKE_SCRIPT = (
+    "Hi {name}, this is Maya from the store. "
+    "I noticed you left a few items in your cart. "
+    "Use code SAVE10 today and we'll take 10% off. "
+    "Would you like me to help you finish your order?"
+)
+
+FAKE_ANALYSIS = {
+    "customer_sentiment": "Neutral", "customer_interest_level": "Medium", "customer_engagement_score": 5,
+    "primary_objection": "Price", "secondary_objection": "None", "objection_details": "wants a better price",
+    "price_concern": True, "quality_concern": False, "timing_concern": False, "technical_issue": False,
+    "competitor_mention": False, "changed_mind": False, "not_interested": False, "just_browsing": False,
+    "callback_requested": False,
+}
+
+
+class FakeGroqHandler(FakeHandler):
+    def handle_post(self, body):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return super().handle_post(body)
+
+        request = json.loads(body or b"{}")
+        prompt = request["messages"][-1]["content"]
+        names = [line.split(":", 1)[1].strip() for line in prompt.splitlines()
+                 if line.strip().startswith("Customer:")] or ["there"]
+        script = FAKE_SCRIPT.format(name=names[-1])
+        words = len(script.split(" "))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get("model", "llama-3.1-8b-instant")
+
+        if request.get("stream"):
+            self.stream(completion_id, model, script)
+            return None
+
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        if json_mode and '"results"' in request["messages"][0]["content"]:
+            calls = sum(1 for line in prompt.splitlines() if re.fullmatch(r"Call \d+", line.strip()))
+            script = json.dumps({"results": [FAKE_ANALYSIS] * max(1, calls)})
+            words = len(script.split(" "))
+        elif json_mode:
+            script = json.dumps({"messages": [FAKE_SCRIPT.format(name=name) for name in names]})
+            words *= len(names)
+
+        # A non-streamed completion arrives only once every token is generated
+        time.sleep(self.server.token_delay * (words - 1))
+        return 200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": script},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 60, "completion_tokens": 50, "total_tokens": 110},
+        }
+
+    def stream(self, completion_id, model, script):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        words = script.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.server.token_delay)
+            if i == self.server.fail_after:
+                error = {"error": {"message": "stream interrupted", "type": "server_error"}}
+                self.wfile.write(f"data: {json.dumps(error)}\n\n".encode())
+                self.wfile.flush()
+                return
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": "stop" if i == len(words) - 1 else None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeGroqServer(FakeServer):
+    handler = FakeGroqHandler
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, token_delay=0.02, seed=7,
+                 fail_after=None):
+        super().__init__(host, port, latency, error_rate, seed)
+        self.token_delay = token_delay
+        self.fail_after = fail_after
+
+
+if __name__ == "__main__":
+    serve_main(FakeGroqServer, "Groq", 8788, "GROQ_BASE_URL")
@@ -0,0 +1,120 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ----------------------------
+# Shared Fake Server Plumbing
+# ----------------------------
+# Base for the local stand-ins of Vapi, Groq and Twilio: threaded, tracks
+# peak concurrency and when the first and last requests arrived, sleeps
+# `latency` seconds per request to mimic the real provider, and answers
+# `error_rate` of requests with a random 500/502/503.
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        server = self.server
+
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests += 1
+            server.first_request_at = server.first_request_at or time.monotonic()
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            result = server.fault() or self.handle_post(body)
+            if result is not None:
+                self.reply(*result)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+                server.last_request_at = time.monotonic()
+
+    def handle_post(self, body):
+        # Return (status, payload), or write the response yourself and return None
+        return 404, {"message": f"Cannot POST {self.path}"}
+
+    def reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    handler = FakeHandler
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, seed=7):
+        super().__init__((host, port), self.handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.first_request_at = self.last_request_at = None
+        self.faults = {}
+        self._rng = random.Random(seed)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def busy_seconds(self):
+        # From the first request arriving to the last response, i.e. without client start-up
+        if self.first_request_at is None:
+            return 0.0
+        return self.last_request_at - self.first_request_at
+
+    def fault(self):
+        """(status, payload, headers) for a request that should fail, else None."""
+        if self.error_rate:
+            with self.lock:
+                if self._rng.random() < self.error_rate:
+                    return self._fail(self._rng.choice((500, 502, 503)), "Upstream error")
+        return None
+
+    def _fail(self, status, message, headers=None):
+        self.faults[status] = self.faults.get(status, 0) + 1
+        return status, {"statusCode": status, "message": message}, headers
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def serve_main(server_class, name, default_port, env_hint):
+    import argparse
+
+    parser = argparse.ArgumentParser(description=f"Run a local fake {name} API")
+    parser.add_argument("--port", type=int, default=default_port)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 5xx")
+    args = parser.parse_args()
+
+    server = server_class(port=args.port, latency=args.latency, error_rate=args.error_rate)
+    print(f"🧪 Fake {name} listening on {server.url} (latency {args.latency}s, error rate {args.error_rate:.0%})")
+    print(f"   export {env_hint}={server.url}")
+    server.serve_forever()
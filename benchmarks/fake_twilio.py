@@ -0,0 +1,50 @@
+import time
+import uuid
+from urllib.parse import parse_qs
+
+from benchmarks.fake_server import FakeHandler, FakeServer, serve_main
+
+
+# ----------------------------
+# Fake Twilio HTTP Server
+# ----------------------------
+# POST /2010-04-01/Accounts/<sid>/Calls.json creates a call and
+# POST .../Calls/<call_sid>.json updates one. The Twilio SDK has no base-URL
+# setting, so benchmarks/stub_env/sitecustomize.py redirects api.twilio.com
+# here when TWILIO_API_BASE_URL is set.
+
+class FakeTwilioHandler(FakeHandler):
+    def handle_post(self, body):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if len(parts) < 4 or parts[0] != "2010-04-01" or parts[3].split(".")[0] != "Calls":
+            return super().handle_post(body)
+
+        form = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        account_sid = parts[2]
+        call_sid = parts[4].split(".")[0] if len(parts) > 4 else f"CA{uuid.uuid4().hex}"
+        with self.server.lock:
+            self.server.calls.append(form)
+            self.server.dialed_at.setdefault(form.get("To"), time.time())
+        return 201, {
+            "sid": call_sid,
+            "account_sid": account_sid,
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "status": "queued",
+            "direction": "outbound-api",
+            "api_version": "2010-04-01",
+            "uri": f"/2010-04-01/Accounts/{account_sid}/Calls/{call_sid}.json",
+        }
+
+
+class FakeTwilioServer(FakeServer):
+    handler = FakeTwilioHandler
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, seed=7):
+        super().__init__(host, port, latency, error_rate, seed)
+        self.calls = []
+        self.dialed_at = {}  # To number -> time.time() of its first call
+
+
+if __name__ == "__main__":
+    serve_main(FakeTwilioServer, "Twilio", 8789, "TWILIO_API_BASE_URL")
@@ -0,0 +1,87 @@
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from benchmarks.fake_server import FakeHandler, FakeServer, serve_main
+
+
+# ----------------------------
+# Fake Vapi HTTP Server
+# ----------------------------
+# Answers POST /call like api.vapi.ai does, after an optional artificial
+# latency, so the dialer can be exercised without real keys or phone calls.
+#
+# Faults can be injected to exercise the retry layer:
+#   rate_limit  - calls/sec the fake org may place; above it → 429 + Retry-After
+#   error_rate  - share of requests answered with a random 500/502/503
+#   outage      - (start, end) seconds after start() during which every call → 503
+
+class FakeVapiHandler(FakeHandler):
+    def handle_post(self, body):
+        if self.path.rstrip("/") != "/call":
+            return super().handle_post(body)
+
+        request = json.loads(body or b"{}")
+        now = datetime.now(timezone.utc).isoformat()
+        call = {
+            "id": str(uuid.uuid4()),
+            "orgId": "fake-org",
+            "createdAt": now,
+            "updatedAt": now,
+            "type": "outboundPhoneCall",
+            "status": "queued",
+            "assistantId": request.get("assistantId"),
+            "phoneNumberId": request.get("phoneNumberId"),
+            "customer": request.get("customer"),
+        }
+        with self.server.lock:
+            self.server.calls.append(request)
+        return 201, call
+
+
+class FakeVapiServer(FakeServer):
+    handler = FakeVapiHandler
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, rate_limit=0, outage=None, seed=7):
+        super().__init__(host, port, latency, error_rate, seed)
+        self.calls = []
+        self.rate_limit = rate_limit
+        self.outage = outage
+        self.reset()
+
+    def reset(self):
+        """Forget past requests and restart the fault clock (e.g. after a warm-up call)."""
+        with self.lock:
+            self.calls.clear()
+            self.requests = 0
+            self.faults = {}
+            self.first_request_at = self.last_request_at = None
+            self.started = self._refilled = time.monotonic()
+            self._tokens = float(self.rate_limit)
+
+    def start(self):
+        self.reset()
+        return super().start()
+
+    def fault(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.outage and self.outage[0] <= now - self.started < self.outage[1]:
+                return self._fail(503, "Service Unavailable")
+        fault = super().fault()
+        if fault is not None:
+            return fault
+        with self.lock:
+            if self.rate_limit:
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate_limit
+                    return self._fail(429, "Too Many Requests", {"Retry-After": f"{wait:.3f}"})
+                self._tokens -= 1
+        return None
+
+
+if __name__ == "__main__":
+    serve_main(FakeVapiServer, "Vapi", 8787, "VAPI_BASE_URL")
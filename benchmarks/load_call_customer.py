@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import atexit
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks import REPO_ROOT
+from benchmarks.fake_groq import FakeGroqServer
+from benchmarks.fake_twilio import FakeTwilioServer
+
+
+# ----------------------------
+# /call-customer Load Test
+# ----------------------------
+# Runs the voice API under uvicorn against stub Groq and Twilio servers and
+# reports requests/sec and latency percentiles. --rev runs an older revision
+# of AI_Voice/ instead, so the sync and async versions can be compared:
+#
+#   python -m benchmarks.load_call_customer --rev 8f15522   # before
+#   python -m benchmarks.load_call_customer                 # working tree
+#
+# --no-cache disables the script cache so every request pays the LLM call.
+
+STUB_ENV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_env")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def peak_rss_mb(pid):
+    # High-water mark of a running process's resident memory (Linux only)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def export_revision(rev, dest):
+    archive = subprocess.run(
+        ["git", "archive", rev, "AI_Voice", "VAPI_AI_AGENT_CALL_FROM_CSV"], cwd=REPO_ROOT, check=True, capture_output=True
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", dest], input=archive, check=True)
+    return os.path.join(dest, "AI_Voice")
+
+
+def start_app(app_dir, port, groq_url, twilio_url, no_cache, extra_env=None):
+    env = dict(
+        os.environ,
+        GROQ_API_KEY="fake-groq-key",
+        GROQ_BASE_URL=groq_url,
+        TWILIO_ACCOUNT_SID="ACfake",
+        TWILIO_AUTH_TOKEN="fake-token",
+        TWILIO_NUMBER="+15550000000",
+        TWILIO_API_BASE_URL=twilio_url,
+        PYTHONPATH=os.pathsep.join([STUB_ENV, os.environ.get("PYTHONPATH", "")]),
+    )
+    if no_cache:
+        env["SCRIPT_CACHE_SIZE"] = "0"
+    # Whatever the app writes (call-log outcomes, the cart queue) goes to a
+    # scratch directory, never next to the real call logs
+    scratch = tempfile.mkdtemp(prefix="voice_api_")
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    env.update(CALL_LOG_PATH=os.path.join(scratch, "call_logs_detailed.csv"),
+               CART_QUEUE=os.path.join(scratch, "cart_queue.db"))
+    env.update(extra_env or {})
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def hammer(url, requests, concurrency):
+    latencies = []
+    errors = 0
+    queue = iter(range(requests))
+
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal errors
+            for _ in queue:
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def run(app_dir, requests, concurrency, groq_latency, twilio_latency, no_cache,
+        groq_error_rate=0.0, twilio_error_rate=0.0):
+    groq = FakeGroqServer(latency=groq_latency, error_rate=groq_error_rate).start()
+    twilio = FakeTwilioServer(latency=twilio_latency, error_rate=twilio_error_rate).start()
+    port = free_port()
+    app = start_app(app_dir, port, groq.url, twilio.url, no_cache)
+    try:
+        url = f"http://127.0.0.1:{port}/call-customer"
+        httpx.get(url, timeout=60)  # warm-up
+        latencies, errors, elapsed = asyncio.run(hammer(url, requests, concurrency))
+        rss = peak_rss_mb(app.pid)
+    finally:
+        app.terminate()
+        app.wait()
+        groq.stop()
+        twilio.stop()
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "requests_per_sec": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "groq_peak_in_flight": groq.max_in_flight,
+        "peak_rss_mb": rss,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test /call-customer against stub providers")
+    parser.add_argument("--rev", help="git revision of AI_Voice/ to test (default: working tree)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--groq-latency", type=float, default=0.5)
+    parser.add_argument("--twilio-latency", type=float, default=0.1)
+    parser.add_argument("--no-cache", action="store_true", help="disable the script cache")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_dir = export_revision(args.rev, tmp) if args.rev else os.path.join(REPO_ROOT, "AI_Voice")
+        result = run(app_dir, args.requests, args.concurrency,
+                     args.groq_latency, args.twilio_latency, args.no_cache)
+
+    label = args.rev or "working tree"
+    print(f"🔥 /call-customer @ {label}: {result['requests']} requests, concurrency {args.concurrency}")
+    print(f"   {result['requests_per_sec']:.1f} req/sec | p50 {result['p50_ms']:.0f} ms | "
+          f"p99 {result['p99_ms']:.0f} ms | errors {result['errors']} | "
+          f"Groq peak in flight {result['groq_peak_in_flight']}")
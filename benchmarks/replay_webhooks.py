@@ -0,0 +1,202 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import time
+import uuid
+from urllib.parse import parse_qs
+
+import httpx
+import pandas as pd
+from twilio.request_validator import RequestValidator
+
+from benchmarks import REPO_ROOT
+from benchmarks.fake_groq import FakeGroqServer
+from benchmarks.fake_twilio import FakeTwilioServer
+from benchmarks.load_call_customer import free_port, start_app
+from call_log import DETAILED_LOG_FIELDS
+from call_outcomes import CallOutcomeStore, parse_twilio, parse_vapi
+
+
+# ----------------------------
+# Webhook Replay
+# ----------------------------
+# python -m benchmarks.replay_webhooks --calls 5000
+#
+# Writes a detailed call log of --calls "Pending" rows in a temp directory,
+# starts the voice API against it and replays the recorded callbacks in
+# fixtures/webhooks/ (with each row's call_id swapped in, signed as Vapi and
+# Twilio would): a Vapi status update and end-of-call report per call, plus a
+# Twilio status callback for every tenth call. Checks every outcome landed,
+# then compares the per-update cost with rewriting the CSV through pandas and
+# times the offline compaction.
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "webhooks")
+VAPI_SECRET = "fake-vapi-secret"
+TWILIO_TOKEN = "fake-token"  # start_app's TWILIO_AUTH_TOKEN
+
+
+def load_fixtures():
+    def read(name):
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            return f.read()
+    return {
+        "status": json.loads(read("vapi_status_update.json")),
+        "report": json.loads(read("vapi_end_of_call_report.json")),
+        "voicemail": json.loads(read("vapi_end_of_call_voicemail.json")),
+        "twilio": read("twilio_status_callback.txt"),
+    }
+
+
+def write_log(path, call_ids):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(DETAILED_LOG_FIELDS)
+        for i, call_id in enumerate(call_ids):
+            row = dict.fromkeys(DETAILED_LOG_FIELDS, "Pending")
+            row.update(customer_name=f"Customer {i}", customer_phone=f"+91{9000000000 + i}",
+                       call_id=call_id, call_status="initiated")
+            writer.writerow(row[name] for name in DETAILED_LOG_FIELDS)
+
+
+def with_call_id(payload, call_id):
+    payload = json.loads(json.dumps(payload))
+    payload["message"]["call"]["id"] = call_id
+    return payload
+
+
+def callbacks(fixtures, call_ids, base_url):
+    vapi_headers = {"X-Vapi-Secret": VAPI_SECRET}
+    validator = RequestValidator(TWILIO_TOKEN)
+    for i, call_id in enumerate(call_ids):
+        yield "/webhooks/vapi", {"json": with_call_id(fixtures["status"], call_id), "headers": vapi_headers}
+        report = fixtures["voicemail"] if i % 4 == 3 else fixtures["report"]
+        yield "/webhooks/vapi", {"json": with_call_id(report, call_id), "headers": vapi_headers}
+        if i % 10 == 0:
+            form = fixtures["twilio"].replace("CallSid=CA3f2b9b1c7d0e4a5f8b6c1d2e3f4a5b6c", f"CallSid={call_id}")
+            fields = {k: v[0] for k, v in parse_qs(form, keep_blank_values=True).items()}
+            yield "/webhooks/twilio", {"content": form, "headers": {
+                "Content-Type": "application/x-www-form-urlencoded",
+                "X-Twilio-Signature": validator.compute_signature(f"{base_url}/webhooks/twilio", fields),
+            }}
+
+
+async def replay(base_url, requests, concurrency):
+    queue = iter(requests)
+    errors = 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for path, kwargs in queue:
+                response = await client.post(path, **kwargs)
+                if response.status_code >= 300:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return errors, elapsed
+
+
+def unsigned_refused(base_url, fixtures):
+    # Callbacks without the secret or with a bad signature must not touch the log
+    vapi = httpx.post(f"{base_url}/webhooks/vapi", json=fixtures["report"], timeout=10)
+    twilio = httpx.post(f"{base_url}/webhooks/twilio", content=fixtures["twilio"], timeout=10, headers={
+        "Content-Type": "application/x-www-form-urlencoded", "X-Twilio-Signature": "forged"})
+    return vapi.status_code == 401 and twilio.status_code == 403
+
+
+def wait_applied(base_url, expected, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        outcomes = httpx.get(f"{base_url}/stats", timeout=10).json()["call_outcomes"]
+        if outcomes["updates_applied"] >= expected:
+            return outcomes
+        time.sleep(0.1)
+    raise RuntimeError(f"only {outcomes['updates_applied']} of {expected} updates were applied")
+
+
+def store_apply_ms(log_path, requests, batch_size=500):
+    # The store alone, without HTTP: parse every callback and apply in batches
+    updates = [
+        parse_vapi(kwargs["json"]) if "json" in kwargs
+        else parse_twilio({k: v[0] for k, v in parse_qs(kwargs["content"], keep_blank_values=True).items()})
+        for _, kwargs in requests
+    ]
+    store = CallOutcomeStore(log_path, overlay_path=log_path + ".replay.jsonl")
+    start = time.perf_counter()
+    for i in range(0, len(updates), batch_size):
+        store.apply(updates[i:i + batch_size])
+    return (time.perf_counter() - start) / len(updates) * 1000
+
+
+def pandas_rewrite_ms(log_path, call_ids, fields, samples=5):
+    # What updating the CSV in place would cost: read, set the columns, write back
+    start = time.perf_counter()
+    for call_id in call_ids[:samples]:
+        df = pd.read_csv(log_path, dtype=str, keep_default_na=False)
+        mask = df["call_id"] == call_id
+        for name, value in fields.items():
+            df.loc[mask, name] = value
+        df.to_csv(log_path, index=False)
+    return (time.perf_counter() - start) / samples * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded call-outcome webhooks")
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    call_ids = [str(uuid.uuid4()) for _ in range(args.calls)]
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    requests = list(callbacks(fixtures, call_ids, base_url))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "call_logs_detailed.csv")
+        write_log(log_path, call_ids)
+        log_mb = os.path.getsize(log_path) / 1e6
+
+        groq = FakeGroqServer().start()
+        twilio = FakeTwilioServer().start()
+        app = start_app(os.path.join(REPO_ROOT, "AI_Voice"), port, groq.url, twilio.url, False,
+                        extra_env={"CALL_LOG_PATH": log_path, "VAPI_SERVER_SECRET": VAPI_SECRET})
+        try:
+            start = time.perf_counter()
+            errors, posted = asyncio.run(replay(base_url, requests, args.concurrency))
+            outcomes = wait_applied(base_url, len(requests))
+            applied = time.perf_counter() - start
+            assert unsigned_refused(base_url, fixtures)
+        finally:
+            app.terminate()
+            app.wait()
+            groq.stop()
+            twilio.stop()
+
+        store = CallOutcomeStore(log_path)
+        converted, voicemail = store.get(call_ids[0]), store.get(call_ids[3])
+        assert converted["conversion_result"] == "Converted" and converted["purchase_completed"] == "Yes"
+        assert converted["call_status"] in ("ended", "completed")  # a late status-update can't reopen it
+        assert voicemail["voicemail_left"] == "Yes" and voicemail["call_answered"] == "No"
+        assert sum(store.get(c)["call_status"] != "initiated" for c in call_ids[:: max(1, args.calls // 1000)]) \
+            == len(call_ids[:: max(1, args.calls // 1000)])
+
+        first_update = store.outcomes[call_ids[0]]
+        apply_ms = store_apply_ms(log_path, requests)
+        start = time.perf_counter()
+        store.compact()
+        compact_s = time.perf_counter() - start
+        with open(log_path, newline="", encoding="utf-8") as f:
+            pending = sum(row["conversion_result"] == "Pending" for row in csv.DictReader(f))
+        rewrite_ms = pandas_rewrite_ms(log_path, call_ids, first_update)
+
+    print(f"📨 Replayed {len(requests)} callbacks for {args.calls} calls ({log_mb:.1f} MB log), errors {errors}")
+    print(f"   {len(requests) / applied:.0f} updates/sec end to end | posted in {posted:.2f}s | "
+          f"unmatched {outcomes['unmatched']}")
+    print(f"   store.apply: {apply_ms:.4f} ms per update | "
+          f"pandas rewrite: {rewrite_ms:.0f} ms per update")
+    print(f"   compact: {compact_s:.2f}s | rows still Pending after compact: {pending}")
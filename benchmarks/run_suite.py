@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks import CAMPAIGN_DIR, REPO_ROOT
+from benchmarks.fake_vapi import FakeVapiServer
+from benchmarks.load_call_customer import run as load_call_customer
+from benchmarks.synthetic_carts import parse_rows, write_carts
+
+
+# ----------------------------
+# End-to-End Benchmark Suite
+# ----------------------------
+# python -m benchmarks.run_suite --out results/today.json
+# python -m benchmarks.run_suite --out results/branch.json --compare results/today.json
+#
+# Runs the real scripts, unmodified, as subprocesses against the local fake
+# Vapi / Groq / Twilio servers on synthetic cart files, and saves one JSON
+# file per run (machine, git revision and every scenario's numbers) so two
+# runs can be compared. Scenarios:
+#   scan          CartReader over --scan-rows (1k .. 10M) rows
+#   phone_prep    phone_prep.py over the same files
+#   main.py       the campaign scripts over --dial-rows rows, unpaced
+#   main3.py      (DIAL_RATE=0), DIAL_CONCURRENCY calls in flight; a
+#   end.py        script that gets no call to the fake server fails the run
+#   sharded       campaign_runner.py --workers N
+#   call_customer /call-customer under uvicorn (load_call_customer)
+#
+# Each result has a throughput (rows/sec or calls/sec), p50/p99 latency where
+# there is one, and the peak RSS of the largest process. Calls/sec is measured
+# at the fake server (first request to last response) and scan rows/sec inside
+# the scan, so interpreter and SDK start-up are not counted; phone_prep's
+# rows/sec covers the whole run, pandas import included. p50/p99 come from the
+# script's own provider_call histogram in its metrics snapshot (the worst
+# shard for sharded runs).
+
+SCENARIOS = ("scan", "phone_prep", "main.py", "main3.py", "end.py", "sharded", "call_customer")
+
+# Times the scan itself and writes the seconds to argv[2]
+SCAN = "\n".join((
+    "import sys, time",
+    "from cart_reader import CartReader",
+    "start = time.perf_counter()",
+    "for _ in CartReader(sys.argv[1], quiet=True): pass",
+    "open(sys.argv[2], 'w').write(str(time.perf_counter() - start))",
+))
+
+
+def run_script(cmd, cwd, env):
+    """Run cmd to completion; returns (wall seconds, peak RSS MB of it or any child it waited for)."""
+    with open(os.path.join(cwd, "stderr.txt"), "wb") as err:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=err)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status) != 0:
+        with open(os.path.join(cwd, "stderr.txt"), encoding="utf-8", errors="replace") as f:
+            tail = f.read()[-2000:]
+        raise RuntimeError(f"{' '.join(cmd)} failed:\n{tail}")
+    return wall, usage.ru_maxrss / 1024  # ru_maxrss is in KB on Linux
+
+
+def script_env(**extra):
+    return dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([CAMPAIGN_DIR, os.environ.get("PYTHONPATH", "")]),
+        **{k: str(v) for k, v in extra.items()},
+    )
+
+
+def provider_latency(snapshots):
+    # (p50, p99) in ms from the metrics snapshot(s); the worst one if several
+    quantiles = []
+    for path in snapshots:
+        with open(path, encoding="utf-8") as f:
+            stage = json.load(f)["metrics"]["stage_seconds"].get("provider_call")
+        if stage and stage["count"]:
+            quantiles.append((stage["p50"], stage["p99"]))
+    if not quantiles:
+        return None, None
+    return max(q[0] for q in quantiles) * 1000, max(q[1] for q in quantiles) * 1000
+
+
+def result(scenario, rows, unit, count, seconds, wall, rss, p50=None, p99=None, errors=0):
+    return {
+        "scenario": scenario,
+        "rows": rows,
+        "unit": unit,
+        "count": count,
+        "throughput": round(count / seconds, 2) if seconds else None,
+        "p50_ms": None if p50 is None else round(p50, 2),
+        "p99_ms": None if p99 is None else round(p99, 2),
+        "peak_rss_mb": None if rss is None else round(rss, 1),
+        "errors": errors,
+        "wall_s": round(wall, 2),
+    }
+
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+def run_scan(csv_path, rows, tmp):
+    timing = os.path.join(tmp, "scan_seconds")
+    wall, rss = run_script([sys.executable, "-c", SCAN, csv_path, timing], tmp, script_env())
+    with open(timing) as f:
+        return result("scan", rows, "rows/s", rows, float(f.read()), wall, rss)
+
+
+def run_phone_prep(csv_path, rows, tmp):
+    cmd = [sys.executable, os.path.join(CAMPAIGN_DIR, "phone_prep.py"), csv_path,
+           "--out", os.path.join(tmp, "clean.csv")]
+    wall, rss = run_script(cmd, tmp, script_env())
+    return result("phone_prep", rows, "rows/s", rows, wall, wall, rss)
+
+
+def run_campaign(scenario, csv_path, rows, tmp, args):
+    server = FakeVapiServer(latency=args.vapi_latency, error_rate=args.vapi_error_rate).start()
+    snapshot = os.path.join(tmp, "metrics.json")
+    env = script_env(
+        VAPI_API_KEY="fake-key", PHONE_NUMBER_ID="fake-number", ASSISTANT_ID="fake-assistant",
+        VAPI_BASE_URL=server.url, CART_FILE=csv_path,
+        DIAL_RATE=0, DIAL_CONCURRENCY=args.concurrency,
+        # every synthetic customer is callable whatever the hour the suite runs at
+        CALL_WINDOW_START=0, CALL_WINDOW_END=24,
+        METRICS_SNAPSHOT=snapshot,
+    )
+    if scenario == "sharded":
+        cmd = [sys.executable, os.path.join(CAMPAIGN_DIR, "campaign_runner.py"),
+               "--workers", str(args.workers), "--cart-file", csv_path]
+        snapshots = [os.path.join(tmp, f"metrics.part{i + 1}.json") for i in range(args.workers)]
+    else:
+        cmd = [sys.executable, os.path.join(CAMPAIGN_DIR, scenario)]
+        snapshots = [snapshot]
+    try:
+        wall, rss = run_script(cmd, tmp, env)
+    finally:
+        server.stop()
+    if rows and not server.calls:
+        # The script exited cleanly, but every calls.create failed before it was sent
+        raise RuntimeError(f"{scenario} placed no calls out of {rows:,} carts")
+    p50, p99 = provider_latency(p for p in snapshots if os.path.exists(p))
+    return result(scenario, rows, "calls/s", len(server.calls), server.busy_seconds, wall, rss,
+                  p50, p99, errors=sum(server.faults.values()))
+
+
+def run_call_customer(args):
+    start = time.perf_counter()
+    r = load_call_customer(os.path.join(REPO_ROOT, "AI_Voice"), args.requests, args.concurrency,
+                           args.groq_latency, args.twilio_latency, no_cache=False)
+    wall = time.perf_counter() - start
+    return result("call_customer", None, "req/s", r["requests"], r["requests"] / r["requests_per_sec"], wall,
+                  r["peak_rss_mb"], r["p50_ms"], r["p99_ms"], errors=r["errors"])
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+def git_revision():
+    def git(*cmd):
+        return subprocess.run(["git", *cmd], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    rev = git("rev-parse", "--short", "HEAD")
+    return f"{rev}-dirty" if git("status", "--porcelain", "--untracked-files=no") else rev
+
+
+def describe(r):
+    latency = f" | p50 {r['p50_ms']:.1f} ms | p99 {r['p99_ms']:.1f} ms" if r["p99_ms"] is not None else ""
+    rows = f" {r['rows']:>10,} rows" if r["rows"] else " " * 16
+    rss = f"{r['peak_rss_mb']:.0f} MB" if r["peak_rss_mb"] is not None else "n/a"
+    return (f"   {r['scenario']:<14}{rows} | {r['throughput']:>11,.1f} {r['unit']:<7}{latency} "
+            f"| peak RSS {rss} | errors {r['errors']}")
+
+
+def compare(results, baseline_path, threshold):
+    """Print each scenario against the same scenario in a saved run; returns the regressions."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {(r["scenario"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n📊 Against {baseline_path} ({baseline['git_revision']}, {baseline['started_at'][:19]}):")
+    for r in results:
+        old = before.get((r["scenario"], r["rows"]))
+        if old is None:
+            continue
+        changes = []
+        # (metric, higher is better)
+        for metric, better_up in (("throughput", True), ("p99_ms", False), ("peak_rss_mb", False)):
+            if not old.get(metric) or r.get(metric) is None:
+                continue
+            change = r[metric] / old[metric] - 1
+            worse = -change if better_up else change
+            flag = " ⚠️" if worse > threshold else ""
+            changes.append(f"{metric} {change:+.0%}{flag}")
+            if flag:
+                regressions.append((r["scenario"], r["rows"], metric, change))
+        rows = f" @ {r['rows']:,}" if r["rows"] else ""
+        print(f"   {r['scenario']}{rows}: {', '.join(changes)}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite and save the results as JSON")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--scan-rows", nargs="+", default=["1k", "100k", "1M"],
+                        help="file sizes for scan / phone_prep, e.g. 1k 1M 10M")
+    parser.add_argument("--dial-rows", nargs="+", default=["1k"], help="file sizes for the dialing scenarios")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2, help="processes for the sharded scenario")
+    parser.add_argument("--requests", type=int, default=200, help="requests for call_customer")
+    parser.add_argument("--vapi-latency", type=float, default=0.05)
+    parser.add_argument("--vapi-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-latency", type=float, default=0.5)
+    parser.add_argument("--twilio-latency", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="an earlier --out file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="change that counts as a regression")
+    args = parser.parse_args()
+
+    run = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+        "results": [],
+    }
+    print(f"🏁 Benchmark suite @ {run['git_revision']} ({run['cpus']} CPUs, Python {run['python']})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+
+        def carts(rows):
+            if rows not in files:
+                files[rows] = os.path.join(tmp, f"carts_{rows}.csv")
+                write_carts(files[rows], rows, dupes=0.02, invalid=0.01, seed=args.seed)
+            return files[rows]
+
+        for scenario in args.scenarios:
+            if scenario == "call_customer":
+                plan = [None]
+            elif scenario in ("scan", "phone_prep"):
+                plan = [parse_rows(rows) for rows in args.scan_rows]
+            else:
+                plan = [parse_rows(rows) for rows in args.dial_rows]
+
+            for rows in plan:
+                with tempfile.TemporaryDirectory(dir=tmp) as work:
+                    if scenario == "call_customer":
+                        r = run_call_customer(args)
+                    elif scenario == "scan":
+                        r = run_scan(carts(rows), rows, work)
+                    elif scenario == "phone_prep":
+                        r = run_phone_prep(carts(rows), rows, work)
+                    else:
+                        r = run_campaign(scenario, carts(rows), rows, work, args)
+                run["results"].append(r)
+                print(describe(r))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"✓ Results saved to {args.out}")
+
+    if args.compare:
+        regressions = compare(run["results"], args.compare, args.threshold)
+        if regressions:
+            print(f"⚠️ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
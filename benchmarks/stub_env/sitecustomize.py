@@ -0,0 +1,27 @@
+import os
+
+# ----------------------------
+# Redirect Twilio to a Local Stub
+# ----------------------------
+# Loaded automatically when this directory is on PYTHONPATH. The Twilio SDK
+# hardcodes https://api.twilio.com, so swap it for TWILIO_API_BASE_URL. That
+# lets the load test drive any revision of the voice API, old or new,
+# against benchmarks/fake_twilio.py.
+
+_stub_url = os.environ.get("TWILIO_API_BASE_URL")
+
+if _stub_url:
+    try:
+        from twilio.base.domain import Domain
+    except ImportError:
+        Domain = None
+
+    if Domain is not None:
+        _original_init = Domain.__init__
+
+        def _redirected_init(self, twilio, base_url):
+            if base_url == "https://api.twilio.com":
+                base_url = _stub_url
+            _original_init(self, twilio, base_url)
+
+        Domain.__init__ = _redirected_init
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import time
+
+
+# ----------------------------
+# Synthetic Cart Exports
+# ----------------------------
+# python -m benchmarks.synthetic_carts carts_1m.csv --rows 1M
+#
+# Writes an abandoned_cart.csv-shaped file of any size (1k .. 10M rows and
+# beyond) that looks like a real export rather than one repeated row:
+#   - customers in India, the US, the UK, the UAE and Australia, so the
+#     scheduler sees several time zones
+#   - item lists with commas and quotes, totals in $, ₹ and £
+#   - --dupes: share of rows that repeat an earlier customer's phone
+#   - --invalid: share of rows whose phone has no "+" (the reader skips them)
+# The same --seed gives the same file, so results stay comparable.
+
+HEADER = "name,phone,items,total,reason,language\n"
+
+FIRST_NAMES = ("Peter", "Asha", "Rahul", "Maria", "John", "Priya", "Ahmed", "Olivia", "Wei", "Fatima",
+               "Liam", "Sneha", "Noah", "Ananya", "Emma", "Arjun", "Sophia", "Omar", "Isla", "Vikram")
+LAST_NAMES = ("Shah", "Smith", "Patel", "Garcia", "Khan", "Brown", "Iyer", "Wilson", "Chen", "O'Neil")
+# (country code, national number length, currency, language)
+COUNTRIES = (
+    ("91", 10, "₹", "en"), ("91", 10, "₹", "hi"), ("1", 10, "$", "en"),
+    ("44", 10, "£", "en"), ("971", 9, "$", "ar"), ("61", 9, "$", "en"),
+)
+COUNTRY_WEIGHTS = (45, 10, 25, 10, 5, 5)
+ITEMS = ("Shoes x2", "cat food", "Wireless earbuds", "Yoga mat", 'Laptop sleeve 15"', "Coffee beans x3",
+         "Desk lamp", "Running socks x5", "Phone case", "Backpack")
+REASONS = ("Abandoned checkout", "Payment failed", "Shipping cost", "Browsing", "Coupon not applied")
+
+
+def parse_rows(text):
+    """'10000', '10k', '1M' or '2.5m' → row count."""
+    text = str(text).strip().lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def csv_field(value):
+    if any(c in value for c in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def write_carts(path, rows, dupes=0.0, invalid=0.0, seed=7, batch=10_000):
+    """Write `rows` synthetic carts to `path`; returns the file size in bytes."""
+    rng = random.Random(seed)
+    countries = rng.choices(COUNTRIES, COUNTRY_WEIGHTS, k=1024)
+    phones = []  # recent phones, to draw duplicates from
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(HEADER)
+        lines = []
+        for i in range(rows):
+            code, length, currency, language = countries[i & 1023]
+            r = rng.random()
+            if phones and r < dupes:
+                phone = rng.choice(phones)
+            else:
+                phone = f"+{code}{rng.randrange(10 ** (length - 1), 10 ** length)}"
+                if len(phones) < 4096:
+                    phones.append(phone)
+                else:
+                    phones[i & 4095] = phone
+            if r > 1 - invalid:
+                phone = phone[1:]  # national format, no "+": skipped by CartReader
+
+            name = f"{FIRST_NAMES[i % 20]} {LAST_NAMES[(i // 20) % 10]}"
+            items = ", ".join(rng.sample(ITEMS, 1 + (i % 3)))
+            total = f"{currency}{rng.randrange(10, 5000)}"
+            lines.append(f'{csv_field(name)},{phone},{csv_field(items)},"{total}",'
+                         f'"{REASONS[i % 5]}","{language}"\n')
+            if len(lines) == batch:
+                f.write("".join(lines))
+                lines = []
+        f.write("".join(lines))
+    return os.path.getsize(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic abandoned-cart CSV")
+    parser.add_argument("path")
+    parser.add_argument("--rows", default="10k", help="row count, e.g. 1000, 100k, 10M")
+    parser.add_argument("--dupes", type=float, default=0.02, help="share of rows repeating an earlier phone")
+    parser.add_argument("--invalid", type=float, default=0.01, help="share of rows without a '+' phone")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    start = time.perf_counter()
+    size = write_carts(args.path, rows, args.dupes, args.invalid, args.seed)
+    print(f"📄 {rows:,} carts → {args.path} ({size / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
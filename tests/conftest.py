@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The campaign scripts and the API import their helpers as top-level modules
+# (each is run from inside its own directory), so do the same here.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for folder in ("VAPI_AI_AGENT_CALL_FROM_CSV", "AI_Voice"):
+    path = os.path.join(REPO_ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
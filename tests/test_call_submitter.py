@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from call_submitter import CallSubmitter, CircuitBreaker
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def provider(*outcomes):
+    """A calls.create stand-in answering with `outcomes` in turn (a status code raises)."""
+    answers = iter(outcomes)
+    calls = []
+
+    async def create():
+        calls.append(asyncio.get_running_loop().time())
+        answer = next(answers)
+        if isinstance(answer, int):
+            raise ProviderError(answer)
+        return answer
+    return create, calls
+
+
+def submitter(**kwargs):
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    return CallSubmitter(rate=0, max_attempts=6, base_delay=0.001, breaker=breaker, **kwargs)
+
+
+def test_rate_limited_probe_closes_the_breaker():
+    # open -> probe -> 429 -> recovery, with a second caller held by the breaker
+    create, calls = provider(503, 503, 429, "call-1")
+    sub = submitter()
+
+    async def campaign():
+        first = await sub.submit(create)
+        other, _ = provider("call-2")
+        second = await sub.submit(other)
+        return first, second
+
+    first, second = asyncio.run(asyncio.wait_for(campaign(), timeout=5))
+    assert (first, second) == ("call-1", "call-2")
+    assert sub.breaker.trips == 1
+    assert not sub.breaker.probing and sub.breaker.opened_at is None
+    assert calls[2] - calls[1] >= 0.05  # the probe waited out the cooldown
+
+
+def test_failed_probe_reopens_the_breaker():
+    create, calls = provider(503, 503, 503, "call-1")
+    sub = submitter()
+    assert asyncio.run(asyncio.wait_for(sub.submit(create), timeout=5)) == "call-1"
+    assert calls[3] - calls[2] >= 0.05 and calls[2] - calls[1] >= 0.05
+
+
+def test_cancelled_probe_lets_the_next_caller_probe():
+    sub = submitter()
+    sub.breaker.failure()
+    sub.breaker.failure()
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def campaign():
+        probe = asyncio.create_task(sub.submit(hang))
+        await asyncio.sleep(0.1)
+        assert sub.breaker.probing
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        create, _ = provider("call-1")
+        return await sub.submit(create)
+
+    assert asyncio.run(asyncio.wait_for(campaign(), timeout=5)) == "call-1"
+
+
+def test_one_burst_of_429s_halves_a_shared_rate_once():
+    from campaign_runner import SharedTokenBucket
+
+    bucket = SharedTokenBucket(8.0)
+    # Two workers (their own submitters) draw from the same bucket and both get the burst
+    workers = [CallSubmitter(rate=8.0, max_attempts=2, base_delay=0.001, bucket=bucket) for _ in range(2)]
+
+    async def campaign():
+        for sub in workers:
+            create, _ = provider(429, "call")
+            await sub.submit(create)
+
+    asyncio.run(asyncio.wait_for(campaign(), timeout=5))
+    assert bucket.rate == 4.0 + 2 * workers[0].increase
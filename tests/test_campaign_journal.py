@@ -0,0 +1,76 @@
+from campaign_journal import CampaignJournal
+from cart_reader import CartReader
+
+ROWS = (
+    "name,phone,items,total\n"
+    "Peter,+918766642142,Shoes,$450\n"
+    "Asha,+919812345678,Watch,$120\n"
+    "Ravi,+919900011122,Lamp,$35\n"
+    "Meena,+919876500000,Kettle,$60\n"
+)
+
+
+def run(tmp_path, outcomes):
+    """One campaign run: dial every cart the journal hands out, with outcomes by name (default placed)."""
+    csv_path = tmp_path / "carts.csv"
+    csv_path.write_text(ROWS)
+    journal = CampaignJournal(path=str(tmp_path / "journal.db"), campaign="test", source=str(csv_path))
+    dialed = []
+    for cart in journal.track(CartReader(str(csv_path), quiet=True, start=journal.resume_offset)):
+        journal.start(cart)
+        dialed.append(cart.name)
+        journal.finish(cart, outcomes.get(cart.name, True))
+    journal.close()
+    return dialed, journal
+
+
+def test_rerun_retries_failed_and_skipped_calls_only(tmp_path):
+    dialed, _ = run(tmp_path, {"Asha": False, "Meena": None})
+    assert dialed == ["Peter", "Asha", "Ravi", "Meena"]
+
+    # Asha's call failed and Meena's was skipped: neither reached the provider
+    dialed, journal = run(tmp_path, {})
+    assert dialed == ["Asha", "Meena"]
+    assert journal.already_dialed == 1  # Ravi, re-read from Asha's row
+
+    dialed, _ = run(tmp_path, {})
+    assert dialed == []
+
+
+def test_interrupted_call_is_not_redialed(tmp_path):
+    csv_path = tmp_path / "carts.csv"
+    csv_path.write_text(ROWS)
+    journal = CampaignJournal(path=str(tmp_path / "journal.db"), campaign="test", source=str(csv_path))
+    first = next(journal.track(CartReader(str(csv_path), quiet=True)))
+    journal.start(first)  # the run dies before the call's outcome
+    journal.close()
+
+    dialed, journal = run(tmp_path, {})
+    assert dialed == ["Asha", "Ravi", "Meena"]
+    assert journal.interrupted == 1
+
+
+def test_shards_share_dialed_phones_across_runs_and_worker_counts(tmp_path):
+    # Asha is in both halves of the file; the first shard dials her
+    csv_path = tmp_path / "carts.csv"
+    csv_path.write_text(ROWS + "Asha,+919812345678,Watch,$120\n")
+    db = str(tmp_path / "journal.db")
+    header = len(ROWS.split("\n", 1)[0]) + 1
+    middle = len(ROWS)
+    size = csv_path.stat().st_size
+
+    def dial_shard(start, end):
+        journal = CampaignJournal(path=db, campaign="test", source=str(csv_path), shard=(start, end))
+        reader = CartReader(str(csv_path), quiet=True, start=max(start, journal.resume_offset), end=end)
+        dialed = []
+        for cart in journal.track(reader):
+            journal.start(cart)
+            journal.finish(cart, True)
+            dialed.append(cart.name)
+        journal.close()
+        return dialed
+
+    assert dial_shard(header, middle) == ["Peter", "Asha", "Ravi", "Meena"]
+    # Resumed with a different split: the second Asha row lands in a new shard
+    assert dial_shard(middle, size) == []
+    assert dial_shard(header, size) == []
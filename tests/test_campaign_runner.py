@@ -0,0 +1,21 @@
+import multiprocessing
+import os
+
+from campaign_runner import collect_results
+
+
+def test_shard_that_dies_is_reported_and_the_others_are_kept():
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=results.put, args=({"shard": 0, "succeeded": 3},)),
+        # Dies like an OOM-killed worker: no result, non-zero exit code
+        multiprocessing.Process(target=os._exit, args=(9,)),
+    ]
+    for process in processes:
+        process.start()
+    shards, failed = collect_results(processes, results, poll=0.05)
+    for process in processes:
+        process.join()
+
+    assert shards == {0: {"shard": 0, "succeeded": 3}}
+    assert failed == [1]
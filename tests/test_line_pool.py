@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pytest
+
+from line_pool import LinePool, PhoneLine
+
+
+def test_cancelled_dial_releases_its_line():
+    async def scenario():
+        pool = LinePool([PhoneLine("vapi", id="line-1", concurrency=1)])
+        dialing = asyncio.Event()
+
+        async def hang(line):
+            dialing.set()
+            await asyncio.sleep(3600)
+
+        call = asyncio.create_task(pool.call("+15550001111", hang))
+        await dialing.wait()
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+        async def answer(line):
+            return {"line": line.id}
+
+        # With the line still held this would wait forever
+        return await asyncio.wait_for(pool.call("+15550002222", answer), 1), pool.lines[0].held
+
+    result, held = asyncio.run(scenario())
+    assert result == {"line": "line-1"}
+    assert held == 0
+
+
+def test_pool_without_lines_of_a_provider_falls_back_to_its_number(monkeypatch):
+    monkeypatch.setenv("PHONE_LINES", json.dumps([{"provider": "vapi", "id": "vapi-line"}]))
+    monkeypatch.delenv("PHONE_NUMBER_ID", raising=False)
+    monkeypatch.setenv("TWILIO_NUMBER", "+15550000000")
+    assert [line.number for line in LinePool.from_env(providers=("twilio",)).lines] == ["+15550000000"]
+
+    monkeypatch.delenv("TWILIO_NUMBER")
+    with pytest.raises(ValueError):
+        LinePool.from_env(providers=("twilio",))
+    assert [line.id for line in LinePool.from_env().lines] == ["vapi-line"]
+
+
+def test_worker_shares_never_add_up_to_more_than_a_line_allows():
+    from campaign_runner import split_line_limits
+
+    for workers in (1, 2, 3, 4, 7):
+        pool = split_line_limits(LinePool([PhoneLine("vapi", id="a", concurrency=5, per_minute=30),
+                                           PhoneLine("vapi", id="b", concurrency=0, per_minute=0)]), workers)
+        a, b = pool.lines
+        assert 1 <= a.concurrency and a.concurrency * workers <= max(5, workers)
+        assert 1 <= a.per_minute and a.per_minute * workers <= 30
+        assert (b.concurrency, b.per_minute) == (0, 0)
@@ -0,0 +1,29 @@
+import threading
+
+from metrics import Registry
+
+
+def test_snapshot_while_new_label_series_are_added():
+    registry = Registry()
+    stages = registry.histogram("stage_seconds", "", ("stage",))
+    errors = []
+    done = threading.Event()
+
+    def snapshots():
+        while not done.is_set():
+            try:
+                registry.snapshot()
+                registry.render()
+            except RuntimeError as e:  # dictionary changed size during iteration
+                errors.append(e)
+
+    reader = threading.Thread(target=snapshots)
+    reader.start()
+    try:
+        for i in range(20000):
+            stages.labels(f"stage-{i}").observe(0.001)
+    finally:
+        done.set()
+        reader.join()
+    assert errors == []
+    assert len(registry.snapshot()["stage_seconds"]) == 20000
@@ -0,0 +1,31 @@
+from product_index import ProductIndex, build_index
+
+CATALOG = [
+    {"sku": "SKU1", "name": "Wireless Headphones", "category": "audio", "price": "₹2999",
+     "facts": "40-hour battery, free returns within 30 days"},
+    {"sku": "SKU2", "name": "Bluetooth Speaker", "category": "audio", "price": "₹1099",
+     "facts": "waterproof, 2-year warranty"},
+    {"sku": "SKU3", "name": "Yoga Mat", "category": "fitness", "price": "₹799",
+     "facts": "6 mm thick, non-slip"},
+    {"sku": "SKU4", "name": "Coffee Beans", "category": "grocery", "price": "₹499",
+     "facts": "single origin, roasted this week"},
+]
+
+
+def index(tmp_path):
+    build_index(CATALOG, str(tmp_path), lists=1)
+    return ProductIndex(str(tmp_path))
+
+
+def test_known_item_gets_its_facts(tmp_path):
+    facts = index(tmp_path).facts(["Wireless Headphones"], k=1)
+    assert facts == [["Wireless Headphones: 40-hour battery, free returns within 30 days (₹2999)"]]
+
+
+def test_unknown_item_gets_no_facts(tmp_path):
+    products = index(tmp_path)
+    # The nearest product is still returned by search(), just under the floor
+    assert products.search(["Car insurance"], k=1)[0]
+    assert products.facts(["Car insurance", "Yoga Mat"], k=1) == [[], ["Yoga Mat: 6 mm thick, non-slip (₹799)"]]
+    # Cached hits are filtered by the floor of each call
+    assert products.facts(["Car insurance"], k=1, min_score=-1.0) != [[]]
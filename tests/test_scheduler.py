@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+from cart_reader import Cart
+from scheduler import CallScheduler
+
+# 12:00 in India, inside everyone's calling window below
+NOON_IST = datetime(2026, 1, 5, 6, 30, tzinfo=timezone.utc).timestamp()
+
+
+def carts(totals, priorities=None):
+    priorities = priorities or [""] * len(totals)
+    return [Cart(f"Customer {i}", f"+9190000000{i:02d}", "Shoes", total, priority=priority, offset=i)
+            for i, (total, priority) in enumerate(zip(totals, priorities))]
+
+
+def drain(scheduler):
+    order = []
+    while (cart := scheduler.pop_ready(NOON_IST)[0]) is not None:
+        order.append(cart.name)
+    return order
+
+
+def test_priority_column_outranks_cart_value():
+    queued = carts(["$500", "$20", "$90"], priorities=["1", "9", "5"])
+    scheduler = CallScheduler(clock=lambda: NOON_IST, lookahead=0).extend(queued)
+    assert drain(scheduler) == ["Customer 1", "Customer 2", "Customer 0"]
+
+
+def test_cart_value_orders_rows_without_a_priority():
+    scheduler = CallScheduler(clock=lambda: NOON_IST, lookahead=0).extend(carts(["$500", "$20", "$90"]))
+    assert drain(scheduler) == ["Customer 0", "Customer 2", "Customer 1"]
+
+
+def test_feed_reads_at_most_lookahead_carts_ahead():
+    read = []
+
+    def source():
+        for cart in carts([f"${n}" for n in range(10)]):
+            read.append(cart)
+            yield cart
+
+    scheduler = CallScheduler(clock=lambda: NOON_IST, lookahead=3).feed(source())
+    first = scheduler.pop_ready(NOON_IST)[0]
+    assert len(read) == 3 and first.name == "Customer 2"
+    assert len(drain(scheduler)) == 9
+    assert scheduler.peak_queued == 3
@@ -0,0 +1,41 @@
+from script_cache import FIRST_NAME_SLOT, NAME_SLOT, ScriptCache, fill_name, strip_name
+
+CART = {"customer_name": "Rahul Sharma", "items": ["Wireless Earbuds"], "cart_value": 2499}
+SCRIPT = "Hi Rahul Sharma, your Wireless Earbuds are waiting. Rahul, shall I send the link?"
+
+
+def test_strip_name_swaps_whole_words_only():
+    template = strip_name(SCRIPT, "Rahul Sharma")
+    assert template == (f"Hi {NAME_SLOT}, your Wireless Earbuds are waiting. "
+                        f"{FIRST_NAME_SLOT}, shall I send the link?")
+    assert fill_name(template, "Anita Rao") == ("Hi Anita Rao, your Wireless Earbuds are waiting. "
+                                               "Anita, shall I send the link?")
+
+
+def test_strip_name_ignores_the_name_inside_other_words():
+    # "Al" is inside "Rahul" and "also", but not a word of the script
+    assert strip_name("Hi Rahul Sharma, also a discount.", "Al") is None
+    assert strip_name("Hi Al, also a discount.", "Al") == f"Hi {NAME_SLOT}, also a discount."
+
+
+def test_strip_name_refuses_empty_or_missing_names():
+    assert strip_name(SCRIPT, "") is None
+    assert strip_name(SCRIPT, "   ") is None
+    assert strip_name("Hi there, your cart is waiting.", "Rahul Sharma") is None
+
+
+def test_strip_name_refuses_a_leftover_surname():
+    assert strip_name("Hi Rahul, this is for you, Mr. Sharma.", "Rahul Sharma") is None
+
+
+def test_cache_never_serves_another_customers_name():
+    cache = ScriptCache()
+    cache.put(CART, "Hello Mr. Sharma, Rahul here is your cart.")
+    cache.put({**CART, "customer_name": ""}, "Hello there, your cart is waiting.")
+    assert cache.get({**CART, "customer_name": "Anita Rao"}) is None
+    assert cache.stats()["size"] == 0
+
+    cache.put(CART, SCRIPT)
+    script = cache.get({**CART, "customer_name": "Anita Rao"})
+    assert "Rahul" not in script and "Sharma" not in script
+    assert script.startswith("Hi Anita Rao,")